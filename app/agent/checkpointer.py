@@ -0,0 +1,44 @@
+from contextlib import AsyncExitStack
+from typing import Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.mongodb.aio import AsyncMongoDBSaver
+
+from app.core.config import settings
+from app.core.log_config import logger
+
+
+class CheckpointerManager:
+    """
+    Owns the LangGraph checkpointer that persists conversation threads.
+
+    With the default "mongodb" backend, each thread's agent state (including tool
+    calls and their results) is stored in the application database, so a chat turn
+    only needs to carry the new user message. The "memory" backend keeps threads in
+    the process and is meant for local development.
+    """
+    checkpointer: Optional[BaseCheckpointSaver] = None
+    _exit_stack: Optional[AsyncExitStack] = None
+
+checkpointer_manager = CheckpointerManager()
+
+async def open_checkpointer() -> None:
+    """Opens the configured checkpointer. Called by the startup handler in main.py."""
+    if settings.AGENT_CHECKPOINTER == "memory":
+        checkpointer_manager.checkpointer = MemorySaver()
+        logger.info("Conversation threads are kept in memory.")
+        return
+
+    checkpointer_manager._exit_stack = AsyncExitStack()
+    checkpointer_manager.checkpointer = await checkpointer_manager._exit_stack.enter_async_context(
+        AsyncMongoDBSaver.from_conn_string(settings.MONGO_URI, db_name=settings.DATABASE_NAME)
+    )
+    logger.info("Conversation threads are persisted in MongoDB.")
+
+async def close_checkpointer() -> None:
+    """Closes the checkpointer. Called by the shutdown handler in main.py."""
+    if checkpointer_manager._exit_stack is not None:
+        await checkpointer_manager._exit_stack.aclose()
+        checkpointer_manager._exit_stack = None
+    checkpointer_manager.checkpointer = None
@@ -1,13 +1,40 @@
+import asyncio
+import json
 import operator
-from typing import Dict, TypedDict, Annotated, List
+import uuid
+from functools import lru_cache
+from typing import Any, Callable, Dict, NotRequired, Optional, Set, TypedDict, Annotated, List
 
-from langchain_core.messages import BaseMessage, ToolMessage
+import pytz
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.prebuilt import ToolNode
 
-from app.agent.tools import calendar_tools, search_tools
+from app.agent.checkpointer import checkpointer_manager
+from app.agent.prompts.prompt_templates import (
+    SUMMARY_INSTRUCTIONS,
+    get_summary_prompt,
+    with_conversation_summary,
+    with_date_hints,
+)
+from app.agent.utils.context_window import compact_tool_output, find_window_start, message_text
+from app.agent.utils.intent_router import (
+    Intent,
+    classify_intent,
+    render_available_slots,
+    render_delete_confirmation,
+    render_event_list,
+    turn_metrics,
+)
+from app.agent.utils.time_parser import find_time_references
+from app.agent.tools.registry import TOOL_REGISTRY, TOOL_SPECS, ToolSpec
 from app.core.config import settings
+from app.core.log_config import logger
+from app.core.tracing import agent_span
+from app.database.mongodb import get_db
 
 # --- Agent State Definition ---
 class AgentState(TypedDict):
@@ -16,20 +43,18 @@ class AgentState(TypedDict):
     """
     messages: Annotated[List[BaseMessage], operator.add]
     current_user: Dict
+    # Rebuilt on every turn (it contains the current time) and never stored in `messages`.
+    system_prompt: str
+    # Rolling summary of messages[:summarized_count], which are no longer sent to the model.
+    summary: NotRequired[str]
+    summarized_count: NotRequired[int]
+    # An action the intent router asked the user to confirm in its last reply.
+    pending_action: NotRequired[Optional[Dict]]
 
 # --- Tool & Model Definition ---
 
-# Collect all the async tools we've built
-tools = [
-    calendar_tools.confirm_and_book_event,
-    calendar_tools.list_events,
-    calendar_tools.delete_event,
-    calendar_tools.update_user_timezone,
-    calendar_tools.update_event,
-    calendar_tools.find_available_slots,
-    search_tools.search_web,
-    search_tools.search_news,
-]
+# Collect all the async tools we've built (see app/agent/tools/registry.py)
+tools = [spec.tool for spec in TOOL_SPECS]
 
 # The ToolNode will execute tools when called by the agent
 tool_node = ToolNode(tools)
@@ -42,6 +67,94 @@ model_with_tools = llm.bind_tools(tools)
 
 # --- Graph Node Definitions ---
 
+def _router_tool_messages(name: str, args: Dict, result: Any, reply: str) -> List[BaseMessage]:
+    """
+    Records a tool run by the intent router the way the agent would have made it, so
+    the model sees the call, its (compacted) result and the reply in later turns.
+    """
+    spec = TOOL_REGISTRY[name]
+    tool_call = {"name": name, "args": args, "id": f"router_{uuid.uuid4().hex}", "type": "tool_call"}
+    content = spec.compactor(result) if settings.TOOL_OUTPUT_COMPACTION else str(result)
+    return [
+        AIMessage(content="", tool_calls=[tool_call]),
+        ToolMessage(content=content, tool_call_id=tool_call['id'], name=name),
+        AIMessage(content=reply),
+    ]
+
+async def _serve_intent(intent: Intent, state: AgentState) -> Optional[Dict]:
+    """Serves a classified intent with its tool and a templated reply, or returns None to fall back to the agent."""
+    current_user = state['current_user']
+    pending_action = state.get('pending_action')
+
+    if intent.name == "decline":
+        reply = f"Okay, I'll keep '{pending_action['title']}'. Is there anything else I can help you with?"
+        return {"messages": [AIMessage(content=reply)], "pending_action": None}
+
+    if intent.name == "confirm":
+        name, args = pending_action['tool'], pending_action['args']
+        try:
+            result = await _call_tool(TOOL_REGISTRY[name], args, current_user)
+        except asyncio.TimeoutError:
+            # The write is still running; falling back to the agent could repeat it.
+            result = (
+                f"This is taking longer than expected, so I can't confirm yet whether '{pending_action['title']}' "
+                "was changed. Please check your events in a moment before trying again."
+            )
+        return {"messages": _router_tool_messages(name, args, result, str(result)), "pending_action": None}
+
+    if intent.name == "delete_request":
+        # The directives require an explicit confirmation before anything is deleted.
+        event_doc = await get_db().events.find_one({"google_event_id": intent.args['event_id'], "deleted": {"$ne": True}})
+        if not event_doc or str(event_doc['owner_user_id']) != current_user['id']:
+            # Let the agent explain what went wrong.
+            return None
+        user_tz = pytz.timezone(current_user.get('timezone') or 'UTC')
+        return {
+            "messages": [AIMessage(content=render_delete_confirmation(event_doc, user_tz))],
+            "pending_action": {"tool": "delete_event", "args": intent.args, "title": event_doc.get('title')},
+        }
+
+    renderers: Dict[str, Callable[[Any], str]] = {
+        "list_events": lambda result: render_event_list(result, intent.reference),
+        "find_available_slots": lambda result: render_available_slots(
+            result, intent.reference, intent.args['duration_minutes']
+        ),
+    }
+    result = await _call_tool(TOOL_REGISTRY[intent.name], intent.args, current_user)
+    return {"messages": _router_tool_messages(intent.name, intent.args, result, renderers[intent.name](result))}
+
+async def route_intent(state: AgentState, config: RunnableConfig) -> Dict:
+    """
+    The graph entry: serves high-confidence simple requests without the model.
+
+    Recognized intents (see app/agent/utils/intent_router.py) run their tool directly
+    and reply from a template, ending the turn. Everything else, and any request the
+    router fails to serve, goes on to the full agent unchanged.
+    """
+    pending_action = state.get('pending_action')
+    fallback = {"pending_action": None} if pending_action else {}
+    if not settings.AGENT_INTENT_ROUTER:
+        return fallback
+
+    with agent_span("agent.router", config) as span:
+        intent = classify_intent(
+            message_text(state['messages'][-1]), state['current_user'].get('timezone'), pending_action
+        )
+        update = None
+        if intent is not None:
+            try:
+                update = await _serve_intent(intent, state)
+            except Exception as e:
+                logger.warning(f"Intent router failed to serve '{intent.name}', falling back to the agent: {e}")
+        route = intent.name if update is not None else "fallback"
+        span.set_attribute("agent.route", route)
+        turn_metrics.record_route(route)
+    return fallback if update is None else update
+
+def after_routing(state: AgentState) -> str:
+    """Ends the turn if the router replied; otherwise the request continues to the agent."""
+    return "context" if state["messages"][-1].type == "human" else END
+
 def should_continue(state: AgentState) -> str:
     """
     Determines the next step for the agent.
@@ -50,51 +163,207 @@ def should_continue(state: AgentState) -> str:
     """
     return "tools" if state["messages"][-1].tool_calls else END
 
-async def call_model(state: AgentState) -> Dict:
+async def manage_context(state: AgentState, config: RunnableConfig) -> Dict:
+    """
+    Keeps the history sent to the model within AGENT_CONTEXT_TOKEN_BUDGET.
+
+    Runs once at the start of every turn. While the unsummarized turns fit the budget,
+    nothing happens. Once they exceed it, older turns are folded into the rolling summary
+    until the rest fits AGENT_CONTEXT_FOLD_RATIO of the budget, so the following turns
+    have room to grow and the model is asked for a new summary only every few turns.
+    The summary is part of the (checkpointed) state.
+    """
+    messages = state['messages']
+    summarized_count = state.get('summarized_count', 0)
+    budget = settings.AGENT_CONTEXT_TOKEN_BUDGET
+    if find_window_start(messages, budget, floor=summarized_count) == summarized_count:
+        return {}
+    window_start = find_window_start(messages, int(budget * settings.AGENT_CONTEXT_FOLD_RATIO), floor=summarized_count)
+
+    summary_request = [
+        SystemMessage(content=SUMMARY_INSTRUCTIONS.format(max_words=settings.AGENT_SUMMARY_MAX_WORDS)),
+        HumanMessage(content=get_summary_prompt(
+            state.get('summary', ''), messages[summarized_count:window_start], settings.AGENT_STALE_TOOL_OUTPUT_CHARS
+        )),
+    ]
+    try:
+        with agent_span("agent.summarize", config, **{"llm.summarized_messages": window_start - summarized_count}) as span:
+            response = await llm.ainvoke(summary_request)
+            _record_token_usage(span, response)
+    except Exception as e:
+        # Sending a longer history is better than losing context; retry on the next turn.
+        logger.warning(f"Failed to update the conversation summary: {e}")
+        return {}
+    return {"summary": message_text(response), "summarized_count": window_start}
+
+def _record_token_usage(span, response: BaseMessage) -> None:
+    """Adds the model's reported token counts to a span."""
+    usage = getattr(response, 'usage_metadata', None) or {}
+    for key in ("input_tokens", "output_tokens", "total_tokens"):
+        if key in usage:
+            span.set_attribute(f"llm.{key}", usage[key])
+
+async def call_model(state: AgentState, config: RunnableConfig) -> Dict:
     """
     The primary node that calls the LLM.
     It takes the current conversation state and invokes the model.
+
+    Only the messages after the summarized prefix are sent, with the summary appended to
+    the system prompt. Tool outputs of earlier turns have served their purpose and are
+    shortened to AGENT_STALE_TOOL_OUTPUT_CHARS.
     """
+    window = state['messages'][state.get('summarized_count', 0):]
+    current_turn_start = max((i for i, msg in enumerate(window) if msg.type == 'human'), default=0)
+
     # The custom_tool_node injects the user, so we don't pass it to the model directly
     # This prevents the model from trying to hallucinate the user object.
-    messages_for_llm = [msg for msg in state['messages'] if msg.type != 'tool' or 'current_user' not in getattr(msg, 'additional_kwargs', {})]
+    messages_for_llm = [
+        compact_tool_output(msg, settings.AGENT_STALE_TOOL_OUTPUT_CHARS) if msg.type == 'tool' and i < current_turn_start else msg
+        for i, msg in enumerate(window)
+        if msg.type != 'tool' or 'current_user' not in getattr(msg, 'additional_kwargs', {})
+    ]
+    system_prompt = with_conversation_summary(state['system_prompt'], state.get('summary', ''))
+    # Fast path for date resolution: common phrasings in the latest message are resolved by rules,
+    # so the model does not spend reasoning (or a tool call) on them.
+    user_timezone = state['current_user'].get('timezone')
+    if user_timezone and window:
+        system_prompt = with_date_hints(
+            system_prompt, find_time_references(message_text(window[current_turn_start]), user_timezone)
+        )
+    messages_for_llm.insert(0, SystemMessage(content=system_prompt))
     
-    response = await model_with_tools.ainvoke(messages_for_llm)
+    with agent_span("agent.call_model", config, **{"llm.prompt_messages": len(messages_for_llm)}) as span:
+        response = await model_with_tools.ainvoke(messages_for_llm)
+        _record_token_usage(span, response)
+        span.set_attribute("agent.outcome", "tool_calls" if response.tool_calls else "reply")
     return {"messages": [response]}
 
-async def custom_tool_node(state: AgentState):
+def _tool_error(tool_call: Dict, error: str, message: str) -> ToolMessage:
+    """Builds a structured error result the model can recover from."""
+    return ToolMessage(
+        content=json.dumps({"error": error, "message": message}),
+        tool_call_id=tool_call['id'],
+        status="error",
+    )
+
+# Calls of non-cancellable tools that outlived their timeout (or their turn), kept referenced until they finish.
+_detached_tool_calls: Set[asyncio.Task] = set()
+
+def _detach_tool_call(name: str, call: asyncio.Task) -> None:
+    """Lets a tool call finish in the background and logs its eventual outcome."""
+    def _log_outcome(task: asyncio.Task) -> None:
+        _detached_tool_calls.discard(task)
+        if task.cancelled():
+            logger.warning(f"Detached call of '{name}' was cancelled.")
+        elif task.exception() is not None:
+            logger.error(f"Detached call of '{name}' failed: {task.exception()}")
+        else:
+            logger.info(f"Detached call of '{name}' finished: {task.result()}")
+
+    _detached_tool_calls.add(call)
+    call.add_done_callback(_log_outcome)
+
+async def _call_tool(spec: ToolSpec, args: Dict, current_user: Dict) -> Any:
     """
-    A custom tool node that injects the current_user dictionary into
-    every tool call's arguments before execution.
+    Runs a registered tool within its timeout, injecting the current user into a copy of
+    its arguments if the tool needs it. Raises asyncio.TimeoutError if it takes too long.
+
+    Only cancellable (read-only) tools are cancelled at the timeout. Any other call may
+    already have taken effect, so it is left running in the background and its outcome
+    is unknown to the caller.
     """
-    tool_messages = []
-    # LangChain can handle async tool execution concurrently
-    tool_invocation_tasks = []
-    
-    for tool_call in state["messages"][-1].tool_calls:
-        tool_name = tool_call['name']
-        for tool_func in tools:
-            if tool_func.name == tool_name:
-                # Add current_user to the args for the tool to use
-                tool_args = tool_call['args']
-                tool_args['current_user'] = state['current_user']
-                
-                # Invoke the async tool
-                result = await tool_func.ainvoke(tool_args)
-                
-                # Append the result as a ToolMessage
-                tool_messages.append(ToolMessage(content=str(result), tool_call_id=tool_call['id']))
-                break
-                
-    return {"messages": tool_messages}
+    tool_args = dict(args)
+    if spec.needs_user:
+        tool_args['current_user'] = current_user
+    with agent_span("agent.tool", **{"tool.name": spec.name, "tool.side_effect": spec.side_effect.value}) as span:
+        call = asyncio.ensure_future(spec.tool.ainvoke(tool_args))
+        try:
+            result = await asyncio.wait_for(call if spec.cancellable else asyncio.shield(call), timeout=spec.timeout_seconds)
+        except asyncio.TimeoutError:
+            if not spec.cancellable:
+                _detach_tool_call(spec.name, call)
+            span.set_attribute("tool.outcome", "timeout" if spec.cancellable else "unknown")
+            raise
+        except asyncio.CancelledError:
+            if not spec.cancellable:
+                _detach_tool_call(spec.name, call)
+            raise
+        except Exception:
+            span.set_attribute("tool.outcome", "error")
+            raise
+        span.set_attribute("tool.outcome", "ok")
+        return result
+
+async def _invoke_tool_call(tool_call: Dict, current_user: Dict) -> ToolMessage:
+    """Runs a single tool call of the model and renders its result as a ToolMessage."""
+    spec = TOOL_REGISTRY.get(tool_call['name'])
+    if spec is None:
+        return _tool_error(
+            tool_call, "unknown_tool",
+            f"There is no tool named '{tool_call['name']}'. Available tools: {', '.join(TOOL_REGISTRY)}."
+        )
+
+    try:
+        result = await _call_tool(spec, tool_call['args'], current_user)
+    except asyncio.TimeoutError:
+        if spec.cancellable:
+            return _tool_error(tool_call, "tool_timeout", f"'{spec.name}' did not finish within {spec.timeout_seconds:g} seconds.")
+        return _tool_error(
+            tool_call, "tool_outcome_unknown",
+            f"'{spec.name}' is still running after {spec.timeout_seconds:g} seconds, so its outcome is unknown. "
+            "Do not call it again before checking whether it took effect."
+        )
+    content = spec.compactor(result) if settings.TOOL_OUTPUT_COMPACTION else str(result)
+    return ToolMessage(content=content, tool_call_id=tool_call['id'])
+
+async def custom_tool_node(state: AgentState, config: RunnableConfig):
+    """
+    A custom tool node that dispatches every tool call through the tool registry and
+    injects the current_user dictionary into the arguments of the tools that need it.
+
+    Independent tool calls of a turn run concurrently (at most AGENT_MAX_PARALLEL_TOOLS
+    at a time). Serialized tools (those with write side effects) act as barriers: they
+    start after every earlier call has finished, and later calls wait for them. The
+    resulting messages keep the order of the model's tool calls.
+    """
+    tool_calls = state["messages"][-1].tool_calls
+    current_user = state['current_user']
+    semaphore = asyncio.Semaphore(settings.AGENT_MAX_PARALLEL_TOOLS)
+
+    async def run(tool_call: Dict) -> ToolMessage:
+        async with semaphore:
+            return await _invoke_tool_call(tool_call, current_user)
+
+    results: List[ToolMessage] = []
+    pending: List[Dict] = []
+    with agent_span("agent.tools", config, **{"agent.tool_calls": len(tool_calls)}):
+        for tool_call in tool_calls:
+            spec = TOOL_REGISTRY.get(tool_call['name'])
+            if spec is not None and spec.serialized:
+                results.extend(await asyncio.gather(*(run(call) for call in pending)))
+                pending = []
+                results.append(await run(tool_call))
+            else:
+                pending.append(tool_call)
+        results.extend(await asyncio.gather(*(run(call) for call in pending)))
+
+    return {"messages": results}
 
 # --- Graph Assembly ---
 workflow = StateGraph(AgentState)
 
+workflow.add_node("router", route_intent)
+workflow.add_node("context", manage_context)
 workflow.add_node("agent", call_model)
 workflow.add_node("tools", custom_tool_node) # Using our custom node
 
-workflow.set_entry_point("agent")
+workflow.set_entry_point("router")
+workflow.add_conditional_edges(
+    "router",
+    after_routing,
+    {"context": "context", END: END}
+)
+workflow.add_edge("context", "agent")
 workflow.add_conditional_edges(
     "agent",
     should_continue,
@@ -102,5 +371,13 @@ workflow.add_conditional_edges(
 )
 workflow.add_edge("tools", "agent")
 
-# The final, compiled LangGraph application
-agent_app = workflow.compile()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def _compile(checkpointer: Optional[BaseCheckpointSaver]):
+    return workflow.compile(checkpointer=checkpointer)
+
+def get_agent_app():
+    """
+    Returns the final, compiled LangGraph application, bound to the conversation
+    checkpointer opened at startup so that state is persisted per thread.
+    """
+    return _compile(checkpointer_manager.checkpointer)
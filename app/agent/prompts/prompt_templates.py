@@ -1 +1,58 @@
-# Dynamic prompt generation utilities
\ No newline at end of file
+# Dynamic prompt generation utilities
+from typing import List
+
+from langchain_core.messages import BaseMessage
+
+from app.agent.utils.context_window import message_text
+from app.agent.utils.time_parser import TimeReference
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and a scheduling assistant. "
+    "Merge the new messages into the existing summary. Keep every fact that may matter later: "
+    "names, event IDs, titles, dates and times (with timezones), bookings made, changed or deleted, "
+    "and open requests. Drop greetings and small talk. Reply with the updated summary only, in at most "
+    "{max_words} words."
+)
+
+
+def format_transcript(messages: List[BaseMessage], max_tool_output_chars: int) -> str:
+    """Renders messages as a plain-text transcript for summarization, with tool outputs shortened."""
+    lines = []
+    for message in messages:
+        text = message_text(message)
+        if message.type == "human":
+            lines.append(f"User: {text}")
+        elif message.type == "ai":
+            if text:
+                lines.append(f"Assistant: {text}")
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                lines.append(f"Assistant called {tool_call['name']} with {tool_call['args']}")
+        elif message.type == "tool":
+            lines.append(f"Tool result: {text[:max_tool_output_chars]}")
+    return "\n".join(lines)
+
+
+def get_summary_prompt(previous_summary: str, new_messages: List[BaseMessage], max_tool_output_chars: int) -> str:
+    """Builds the user prompt asking the model to fold `new_messages` into the running summary."""
+    return (
+        f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+        f"New messages:\n{format_transcript(new_messages, max_tool_output_chars)}"
+    )
+
+
+def with_conversation_summary(system_prompt: str, summary: str) -> str:
+    """Appends the summary of the turns that are no longer sent verbatim to the system prompt."""
+    if not summary:
+        return system_prompt
+    return f"{system_prompt}\n\n## Summary of the Earlier Conversation:\n{summary}"
+
+
+def with_date_hints(system_prompt: str, references: List[TimeReference]) -> str:
+    """Appends the dates already resolved from the user's latest message to the system prompt."""
+    if not references:
+        return system_prompt
+    lines = "\n".join(f"- {reference.describe()}" for reference in references)
+    return (
+        f"{system_prompt}\n\n## Dates in the User's Latest Message (already resolved in their timezone):\n{lines}\n"
+        "Use these dates directly instead of working them out again."
+    )
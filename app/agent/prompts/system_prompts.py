@@ -1,10 +1,10 @@
 from datetime import datetime
 import pytz
 
-from app.schemas.user import UserInDB
+from app.schemas.user import UserPublic
 from app.core.config import settings
 
-def get_system_prompt(current_user: UserInDB) -> str:
+def get_system_prompt(current_user: UserPublic) -> str:
     """
     Generates the main system prompt for the scheduling agent based on user context.
     """
@@ -49,9 +49,11 @@ def get_system_prompt(current_user: UserInDB) -> str:
             "**Tool-Specific Instructions:**",
             "- **Handling Booking Conflicts:** If a call to `confirm_and_book_event` fails with an error message that the slot was taken or is too close to another meeting, you MUST politely inform the user and ask if they would like you to look for other available slots. You MUST NOT call `find_available_slots` again unless the user explicitly asks for it.",
             
-            "- **`find_available_slots`:** This tool's `date` parameter MUST be a string in `YYYY-MM-DD` format. Based on the user's current local time, you MUST resolve any relative dates like 'today', 'tomorrow', or 'next Friday' into this specific format before calling the tool. You also MUST know the desired meeting duration; if the user hasn't specified it, you must ask.",
+            "- **`find_available_slots`:** This tool's `date` parameter MUST be a string in `YYYY-MM-DD` format. Relative dates like 'today', 'tomorrow', or 'next Friday' in the user's latest message are listed already resolved at the end of these instructions; use those dates. For any other relative date, call `resolve_date_phrase` or resolve it from the user's current local time. You also MUST know the desired meeting duration; if the user hasn't specified it, you must ask.",
+            "- **`find_next_available_slots`:** When the user asks for 'the next opening', 'the earliest time', or availability without naming a specific day, you MUST call this tool once instead of calling `find_available_slots` day by day. Its optional `from_date` parameter follows the same `YYYY-MM-DD` rule.",
+            "- **Slot Results:** Both slot tools report consecutive slots as ranges, e.g. `10:00-13:00 every 30 min` means 10:00, 10:30, ..., 13:00 on that date, in the stated UTC offset. When booking, pass the chosen start as a full ISO timestamp with that offset.",
             "- **`update_event` & `delete_event`:** These tools require a `google_event_id`. If you don't have it, you MUST use `list_events` first to find it.",
-            "- **`create_event`:** When successfully booking a meeting, you MUST always return the Google Calendar meeting link to the user along with the confirmation."
+            "- **`confirm_and_book_event`:** When successfully booking a meeting, you MUST confirm it to the user along with the returned event ID, and let them know it will appear on the team's Google Calendar shortly."
         ])
     else:
         prompt_sections.extend([
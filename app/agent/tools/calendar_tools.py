@@ -1,27 +1,33 @@
 import base64
 import json
 import pytz
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, List, Dict, Tuple
 
 from bson import ObjectId
-from fastapi.concurrency import run_in_threadpool
 
-from googleapiclient.errors import HttpError
 from langchain_core.tools import tool
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo.errors import DuplicateKeyError
 
+from app.agent.utils.availability_bitmap import DayAvailability
+from app.agent.utils.availability_cache import availability_cache
+from app.agent.utils.conflict_detector import merge_busy_blocks
 from app.core.config import settings
 from app.database.mongodb import get_db
-from app.services.calendar_service import calendar_service_instance
+from app.services.calendar_sync_worker import calendar_sync_worker, new_sync_job
+from app.services.slot_reservation_service import SlotReservationService
+from app.services.user_cache import user_cache
+
+# Upper bound on how far ahead find_next_available_slots will look.
+MAX_SLOT_SEARCH_HORIZON_DAYS = 60
 
 async def _internal_create_event(
-    summary: str, start_time: str, end_time: str, current_user: Dict
+    summary: str, start_time: str, end_time: str, current_user: Dict, event_id: ObjectId
 ) -> str:
     """(Internal) Creates the event after all checks and locks have passed."""
     db: AsyncIOMotorDatabase = get_db()
     events_collection = db.get_collection("events")
+    reservations = SlotReservationService(db)
     user_tz = pytz.timezone(current_user.get('timezone', 'UTC'))
 
     start_dt = datetime.fromisoformat(start_time.replace('Z', ''))
@@ -32,51 +38,36 @@ async def _internal_create_event(
 
     start_utc = start_dt.astimezone(pytz.UTC)
     end_utc = end_dt.astimezone(pytz.UTC)
-    # 1. LOCAL BOOKING: Insert the event into our database first to reserve the slot.
+    # 1. LOCAL BOOKING: The insert is the commit point of the booking. The Google Calendar
+    # event id is assigned up front so that the outbox worker's insert is idempotent.
     event_to_db = {
-        "google_event_id": None, 
+        "_id": event_id,
+        "google_event_id": str(event_id), 
         "owner_user_id": ObjectId(current_user['id']), 
         "title": summary,
+        "description": f"Call booked by {current_user.get('email')}",
         "start_time_utc": start_utc, 
         "end_time_utc": end_utc, 
         "original_timezone": current_user.get('timezone'),
         "attendees": [], 
         "created_at": datetime.utcnow(), 
-        "status": "pending"
+        "status": "pending",
+        "slot_locked": True,
+        "sync": new_sync_job("create"),
+        "sync_version": 0
     }
 
     try:
-        result = await events_collection.insert_one(event_to_db)
-        temp_event_id_for_db = result.inserted_id
-    except DuplicateKeyError:
-        return "Error: Apologies, but that exact time slot was booked while we were finalizing. Please try another time."
+        await events_collection.insert_one(event_to_db)
+    except Exception:
+        # The slot locks are the only guard against double bookings; free them if the booking failed.
+        await reservations.release(event_id)
+        raise
+    availability_cache.invalidate_range(start_utc, end_utc)
 
-    try:
-        # 2. EXTERNAL SYNC: After successfully booking locally, sync with Google Calendar.
-        service = await run_in_threadpool(calendar_service_instance.get_client)
-        event_body = {
-            'summary': summary, 
-            'description': f"Call booked by {current_user.get('email')}",
-            'start': {'dateTime': start_time, 'timeZone': current_user.get('timezone')},
-            'end': {'dateTime': end_time, 'timeZone': current_user.get('timezone')},
-        }
-        created_event = service.events().insert(
-            calendarId=settings.CALENDAR_ID, body=event_body
-        ).execute()
-        # 3. FINALIZE: Update our local record with the Google Event ID.
-        await events_collection.update_one(
-            {"_id": temp_event_id_for_db},
-            {"$set": {
-                "google_event_id": created_event['id'], 
-                "status": "confirmed"
-            }}
-        )
-        return f"Event created successfully! Link: {created_event.get('htmlLink')}"
-    except Exception as e:
-        # COMPENSATING ACTION: If any step after the initial insert fails,
-        # ensure the reserved slot is deleted from our database to prevent orphaned records.
-        await events_collection.delete_one({"_id": temp_event_id_for_db})
-        return f"Error: Could not create event on Google Calendar after reserving the slot. Reason: {e}"
+    # 2. EXTERNAL SYNC: Pushing the event to Google Calendar happens in the background.
+    calendar_sync_worker.notify()
+    return f"Event booked successfully! Event ID: {event_to_db['google_event_id']}. It is being added to the team's Google Calendar and will appear there shortly."
 
 @tool
 async def confirm_and_book_event(summary: str, start_time: str, end_time: str, current_user: Dict) -> str:
@@ -98,17 +89,29 @@ async def confirm_and_book_event(summary: str, start_time: str, end_time: str, c
         
         start_utc, end_utc = start_dt.astimezone(pytz.UTC), end_dt.astimezone(pytz.UTC)
         buffer = timedelta(minutes=settings.MEETING_BUFFER_MINUTES)
+        slot_taken_message = "Error: Apologies, but that time slot is no longer available. It may have been booked just now or is too close to another scheduled meeting. Please find another available slot."
         
-        # CONFLICT CHECK: Ensure the proposed slot (including buffer) doesn't overlap with existing events.
+        # ATOMIC RESERVATION: Claim the slot's lock granules (including buffer) in one bulk write.
+        # Concurrent bookings that overlap can never both succeed here.
+        reservations = SlotReservationService(db)
+        event_id = ObjectId()
+        if not await reservations.reserve(event_id, start_utc, end_utc):
+            return slot_taken_message
+        
+        # CONFLICT CHECK: Events that hold no locks (created before reservations existed)
+        # are still checked directly.
         conflicting_event = await events_collection.find_one({
+            "slot_locked": {"$ne": True},
+            "deleted": {"$ne": True},
             "start_time_utc": {"$lt": end_utc + buffer},
             "end_time_utc": {"$gt": start_utc - buffer}
         })
 
         if conflicting_event:
-            return "Error: Apologies, but that time slot is no longer available. It may have been booked just now or is too close to another scheduled meeting. Please find another available slot."
+            await reservations.release(event_id)
+            return slot_taken_message
         
-        return await _internal_create_event(summary, start_time, end_time, current_user)
+        return await _internal_create_event(summary, start_time, end_time, current_user, event_id)
     except Exception as e:
         return f"An unexpected error occurred during the final booking step: {e}"
 
@@ -129,7 +132,7 @@ async def list_events(current_user: Dict, start_time: str = None, end_time: str
     except Exception:
         return [{"error": "Invalid user ID format."}]
 
-    query = {"owner_user_id": user_id}
+    query = {"owner_user_id": user_id, "deleted": {"$ne": True}}
     time_filter = {}
 
     if start_time:
@@ -162,7 +165,8 @@ async def list_events(current_user: Dict, start_time: str = None, end_time: str
             "title": event.get("title"),
             "start_time": start_local.isoformat(), 
             "end_time": end_local.isoformat(),
-            "attendees": event.get("attendees", [])
+            "attendees": event.get("attendees", []),
+            "status": event.get("status")
         }
         serializable_events.append(event_data)
 
@@ -177,7 +181,7 @@ async def delete_event(event_id: str, current_user: Dict) -> str:
     db: AsyncIOMotorDatabase = get_db()
     events_collection = db.get_collection("events")
     
-    event_doc = await events_collection.find_one({"google_event_id": event_id})
+    event_doc = await events_collection.find_one({"google_event_id": event_id, "deleted": {"$ne": True}})
     if not event_doc:
         return f"Error: Event with ID '{event_id}' not found in our records."
     
@@ -185,21 +189,18 @@ async def delete_event(event_id: str, current_user: Dict) -> str:
         return "Error: Permission Denied. You are not the owner of this event."
 
     try:
-        service = await run_in_threadpool(calendar_service_instance.get_client)
-        await run_in_threadpool(
-            service.events().delete(
-                calendarId=settings.CALENDAR_ID, eventId=event_id
-            ).execute
+        # The event is kept as a tombstone carrying the delete job, and frees its slot right away;
+        # the outbox worker removes it from Google Calendar and then from our records.
+        result = await events_collection.update_one(
+            {"_id": event_doc['_id'], "deleted": {"$ne": True}},
+            {"$set": {"deleted": True, "slot_locked": False, "sync": new_sync_job("delete")}, "$inc": {"sync_version": 1}}
         )
-        await events_collection.delete_one({"google_event_id": event_id})
-        return f"Event '{event_doc['title']}' deleted successfully."
-    except HttpError as e:
-        # The event might already be deleted on Google's side, which is fine.
-        # Check if the error is a 404 or 410, and if so, proceed to delete locally.
-        if e.resp.status in [404, 410]:
-             await events_collection.delete_one({"google_event_id": event_id})
-             return f"Event '{event_doc['title']}' was already deleted from the calendar, and has now been removed from our records."
-        return f"An error occurred with Google Calendar API: {e}"
+        if not result.matched_count:
+            return f"Error: Event with ID '{event_id}' not found in our records."
+        await SlotReservationService(db).release(event_doc['_id'])
+        availability_cache.invalidate_range(event_doc['start_time_utc'], event_doc['end_time_utc'])
+        calendar_sync_worker.notify()
+        return f"Event '{event_doc['title']}' deleted successfully. It will be removed from the team's Google Calendar shortly."
     except Exception as e:
         return f"An unexpected error occurred: {e}"
 
@@ -220,6 +221,7 @@ async def update_user_timezone(current_user: Dict, timezone: str) -> str:
             {"_id": ObjectId(current_user["id"])},
             {"$set": {"timezone": timezone}}
         )
+        await user_cache.invalidate(current_user["email"])
         
         now_in_user_tz = datetime.now(user_tz)
         
@@ -252,8 +254,9 @@ async def update_event(event_id: str, current_user: Dict, new_start_time: str =
     """
     db: AsyncIOMotorDatabase = get_db()
     events_collection = db.get_collection("events")
+    reservations = SlotReservationService(db)
 
-    event_doc = await events_collection.find_one({"google_event_id": event_id})
+    event_doc = await events_collection.find_one({"google_event_id": event_id, "deleted": {"$ne": True}})
     if not event_doc:
         return f"Error: Event with ID '{event_id}' not found."
     if str(event_doc['owner_user_id']) != current_user['id']:
@@ -283,51 +286,127 @@ async def update_event(event_id: str, current_user: Dict, new_start_time: str =
         new_end_utc = new_end_dt.astimezone(pytz.UTC)
         
         buffer = timedelta(minutes=settings.MEETING_BUFFER_MINUTES)
+        conflict_message = "Error: The requested new time slot is not available as it conflicts with another scheduled meeting. Please try another time."
+        
+        # ATOMIC RESERVATION: While rescheduling, the event holds both its old and new granules.
+        if not await reservations.reserve(event_doc['_id'], new_start_utc, new_end_utc):
+            return conflict_message
         
         conflicting_event = await events_collection.find_one({
-            "google_event_id": {"$ne": event_id},
+            "_id": {"$ne": event_doc['_id']},
+            "slot_locked": {"$ne": True},
+            "deleted": {"$ne": True},
             "start_time_utc": {"$lt": new_end_utc + buffer},
             "end_time_utc": {"$gt": new_start_utc - buffer}
         })
 
         if conflicting_event:
-            return "Error: The requested new time slot is not available as it conflicts with another scheduled meeting. Please try another time."
+            await reservations.release(event_doc['_id'], original_start_utc, original_end_utc)
+            return conflict_message
         
         db_update_payload['start_time_utc'] = new_start_utc
         db_update_payload['end_time_utc'] = new_end_utc
+        db_update_payload['slot_locked'] = True
 
-    try:
-        await events_collection.update_one({"google_event_id": event_id}, {"$set": db_update_payload})
-    except DuplicateKeyError:
-        return "Error: The requested new time slot is already booked. Please try another time."
-    except Exception as e:
-        return f"Error updating local database: {e}"
+    # An event whose creation has not reached Google yet is still created, with its latest state.
+    current_job = event_doc.get('sync') or {}
+    sync_op = "create" if current_job.get('op') == "create" else "update"
+    db_update_payload['status'] = "pending"
+    db_update_payload['sync'] = new_sync_job(sync_op)
 
     try:
-        service = await run_in_threadpool(calendar_service_instance.get_client)
-        event_on_google = await run_in_threadpool(service.events().get(calendarId=settings.CALENDAR_ID, eventId=event_id).execute)
-        
-        if new_summary: event_on_google['summary'] = new_summary
-        if new_start_time:
-            event_on_google['start']['dateTime'] = new_start_dt.isoformat()
-            event_on_google['end']['dateTime'] = new_end_dt.isoformat()
-        
-        updated_event = await run_in_threadpool(
-            service.events().update(calendarId=settings.CALENDAR_ID, eventId=event_id, body=event_on_google).execute
+        result = await events_collection.update_one(
+            {"google_event_id": event_id, "deleted": {"$ne": True}},
+            {"$set": db_update_payload, "$inc": {"sync_version": 1}}
         )
-        start = updated_event['start'].get('dateTime', updated_event['start'].get('date'))
-        return f"Event '{updated_event['summary']}' updated successfully. It is now scheduled for {start}."
     except Exception as e:
-        # COMPENSATING ACTION: If Google fails, revert the change in our database
-        await events_collection.update_one(
-            {"google_event_id": event_id},
-            {"$set": {
-                "start_time_utc": original_start_utc,
-                "end_time_utc": original_end_utc,
-                "title": event_doc.get("title") 
-            }}
+        if new_start_time:
+            await reservations.release(event_doc['_id'], original_start_utc, original_end_utc)
+        return f"Error updating local database: {e}"
+    if not result.matched_count:
+        # Deleted in the meantime: its slot was freed, including any granules reserved above.
+        await reservations.release(event_doc['_id'])
+        return f"Error: Event with ID '{event_id}' not found."
+
+    calendar_sync_worker.notify()
+    title = new_summary or event_doc.get('title')
+    if new_start_time:
+        await reservations.release(event_doc['_id'], new_start_utc, new_end_utc)
+        availability_cache.invalidate_range(original_start_utc, original_end_utc)
+        availability_cache.invalidate_range(new_start_utc, new_end_utc)
+        return f"Event '{title}' updated successfully. It is now scheduled for {new_start_dt.isoformat()}. The change will appear on the team's Google Calendar shortly."
+    return f"Event '{title}' updated successfully. The change will appear on the team's Google Calendar shortly."
+
+async def _load_busy_blocks(
+    events_collection, window_start_utc: datetime, window_end_utc: datetime, buffer: timedelta
+) -> List[Tuple[datetime, datetime]]:
+    """(Internal) Fetches every event near the window in one query and returns the merged, buffered busy blocks."""
+    cursor = events_collection.find({
+        "deleted": {"$ne": True},
+        "start_time_utc": {"$lt": window_end_utc + buffer},
+        "end_time_utc": {"$gt": window_start_utc - buffer}
+    }).sort("start_time_utc", 1)
+
+    return merge_busy_blocks([
+        (
+            e['start_time_utc'].replace(tzinfo=pytz.UTC) - buffer,
+            e['end_time_utc'].replace(tzinfo=pytz.UTC) + buffer
         )
-        return f"Error: Failed to update Google Calendar after reserving the slot. All changes have been reverted. Reason: {e}"
+        async for e in cursor
+    ])
+
+def _company_working_window(company_day: date) -> Tuple[datetime, datetime]:
+    """(Internal) Returns the UTC start and end of the company's working hours on a company-local day."""
+    company_tz = pytz.timezone(settings.COMPANY_TIMEZONE)
+    day_start = company_tz.localize(datetime.combine(company_day, time(hour=settings.COMPANY_WORKING_START_HOUR)))
+    day_end = company_tz.localize(datetime.combine(company_day, time(hour=settings.COMPANY_WORKING_END_HOUR)))
+    return day_start.astimezone(pytz.UTC), day_end.astimezone(pytz.UTC)
+
+def _company_days_for_user_dates(first_user_date: date, last_user_date: date, user_tz) -> List[date]:
+    """(Internal) Lists the company-local days that overlap a range of the user's local days."""
+    company_tz = pytz.timezone(settings.COMPANY_TIMEZONE)
+    range_start = user_tz.localize(datetime.combine(first_user_date, time.min)).astimezone(company_tz).date()
+    range_end = user_tz.localize(datetime.combine(last_user_date, time.max)).astimezone(company_tz).date()
+    return [range_start + timedelta(days=i) for i in range((range_end - range_start).days + 1)]
+
+def _build_day_availability(busy_blocks_utc: List[Tuple[datetime, datetime]], company_day: date) -> DayAvailability:
+    """(Internal) Builds the availability bitmap of one company working day."""
+    day_start_utc, day_end_utc = _company_working_window(company_day)
+    return DayAvailability.from_busy_blocks(
+        busy_blocks_utc, day_start_utc, day_end_utc,
+        timedelta(minutes=settings.AVAILABILITY_RESOLUTION_MINUTES)
+    )
+
+async def _iter_available_slots(
+    events_collection, company_days: List[date], duration: timedelta, buffer: timedelta
+) -> AsyncIterator[datetime]:
+    """
+    (Internal) Yields free slot starts (UTC) day by day, so callers can stop as soon as they have enough.
+    Days are served from the availability cache when possible; on the first miss, a single range
+    query loads the busy blocks for every remaining day.
+    """
+    step = timedelta(minutes=settings.SLOT_CHECK_DURATION_MINUTES)
+    duration_minutes = int(duration.total_seconds() // 60)
+    buffer_minutes = int(buffer.total_seconds() // 60)
+    busy_blocks_utc = None
+    versions = {}
+
+    for index, company_day in enumerate(company_days):
+        slot_starts = availability_cache.get(company_day, duration_minutes, buffer_minutes)
+        if slot_starts is None:
+            if busy_blocks_utc is None:
+                remaining_days = company_days[index:]
+                versions = {day: availability_cache.version(day) for day in remaining_days}
+                busy_blocks_utc = await _load_busy_blocks(
+                    events_collection,
+                    _company_working_window(remaining_days[0])[0],
+                    _company_working_window(remaining_days[-1])[1],
+                    buffer
+                )
+            slot_starts = tuple(_build_day_availability(busy_blocks_utc, company_day).slot_starts(duration, step))
+            availability_cache.set(company_day, duration_minutes, buffer_minutes, slot_starts, versions[company_day])
+        for slot_start_utc in slot_starts:
+            yield slot_start_utc
 
 @tool
 async def find_available_slots(date: str, user_timezone: str, duration_minutes: float = 30.0, current_user: Dict = None) -> List[str]:
@@ -346,47 +425,77 @@ async def find_available_slots(date: str, user_timezone: str, duration_minutes:
         
         duration = timedelta(minutes=int(duration_minutes))
         buffer = timedelta(minutes=settings.MEETING_BUFFER_MINUTES)
-        company_tz = pytz.timezone(settings.COMPANY_TIMEZONE)
         user_tz = pytz.timezone(user_timezone)
         
         now_in_user_tz = datetime.now(user_tz)
-        user_req_date_aware = user_tz.localize(datetime.combine(target_date_obj, datetime.min.time()))
-
-        if user_req_date_aware.date() < now_in_user_tz.date(): 
+        if target_date_obj < now_in_user_tz.date(): 
             return ["The date you selected is in the past."]
         
-        search_start_utc = (user_req_date_aware - timedelta(days=1)).astimezone(pytz.UTC)
-        search_end_utc = (user_req_date_aware + timedelta(days=2)).astimezone(pytz.UTC)
-        
-        cursor = events_collection.find({"start_time_utc": {"$gte": search_start_utc, "$lt": search_end_utc}})
+        company_days = _company_days_for_user_dates(target_date_obj, target_date_obj, user_tz)
         
+        available_slots_in_user_tz = []
+        async for slot_start_utc in _iter_available_slots(events_collection, company_days, duration, buffer):
+            slot_in_user_tz = slot_start_utc.astimezone(user_tz)
+            if slot_in_user_tz > now_in_user_tz and slot_in_user_tz.date() == target_date_obj:
+                available_slots_in_user_tz.append(slot_in_user_tz.isoformat())
+        return available_slots_in_user_tz
+    except Exception as e:
+        return [f"An unexpected error occurred in find_available_slots: {e}"]
 
-        busy_blocks_utc = [
-            {
-                "start": e['start_time_utc'].replace(tzinfo=pytz.UTC) - buffer,
-                "end": e['end_time_utc'].replace(tzinfo=pytz.UTC) + buffer
-            }
-            async for e in cursor
-        ]
+@tool
+async def find_next_available_slots(
+    user_timezone: str,
+    duration_minutes: float = 30.0,
+    from_date: str = None,
+    max_results: int = 5,
+    horizon_days: int = 14,
+    current_user: Dict = None
+) -> List[str]:
+    """
+    Finds the next available meeting slots across several days in a single call, ensuring a buffer around existing meetings.
+    Use this when the user asks for 'the next opening' or 'the earliest time' instead of calling find_available_slots day by day.
+    The optional 'from_date' parameter MUST be a string in 'YYYY-MM-DD' format; it defaults to today.
+    Returns at most 'max_results' slots within 'horizon_days' days, converted into the user's local timezone.
+    """
+    db: AsyncIOMotorDatabase = get_db()
+    events_collection = db.get_collection("events")
+    try:
+        user_tz = pytz.timezone(user_timezone)
+        now_in_user_tz = datetime.now(user_tz)
+        
+        if from_date:
+            try:
+                first_date_obj = datetime.strptime(from_date, '%Y-%m-%d').date()
+            except ValueError:
+                return ["Error: The from_date provided was not in the required YYYY-MM-DD format."]
+        else:
+            first_date_obj = now_in_user_tz.date()
+        first_date_obj = max(first_date_obj, now_in_user_tz.date())
+        
+        horizon_days = max(1, min(int(horizon_days), MAX_SLOT_SEARCH_HORIZON_DAYS))
+        max_results = max(1, int(max_results))
+        last_date_obj = first_date_obj + timedelta(days=horizon_days - 1)
+        
+        duration = timedelta(minutes=int(duration_minutes))
+        buffer = timedelta(minutes=settings.MEETING_BUFFER_MINUTES)
+        
+        # At most one range query covers the whole horizon; the day-by-day sweep below stops early.
+        company_days = _company_days_for_user_dates(first_date_obj, last_date_obj, user_tz)
         
         available_slots_in_user_tz = []
-        for day_offset in range(2):
-            day_to_check = (user_req_date_aware + timedelta(days=day_offset)).astimezone(company_tz)
-            slot_runner = day_to_check.replace(hour=settings.COMPANY_WORKING_START_HOUR, minute=0, second=0, microsecond=0)
-            day_end = slot_runner.replace(hour=settings.COMPANY_WORKING_END_HOUR)
-            
-            while (slot_runner + duration) <= day_end:
-                slot_start_utc = slot_runner.astimezone(pytz.UTC)
-                slot_end_utc = (slot_runner + duration).astimezone(pytz.UTC)
-                
-                if not any(slot_start_utc < block['end'] and slot_end_utc > block['start'] for block in busy_blocks_utc):
-                    slot_in_user_tz = slot_start_utc.astimezone(user_tz)
-                    if slot_in_user_tz > now_in_user_tz and slot_in_user_tz.date() == user_req_date_aware.date():
-                        available_slots_in_user_tz.append(slot_in_user_tz.isoformat())
-                slot_runner += timedelta(minutes=settings.SLOT_CHECK_DURATION_MINUTES)
-        return sorted(list(set(available_slots_in_user_tz)))
+        async for slot_start_utc in _iter_available_slots(events_collection, company_days, duration, buffer):
+            slot_in_user_tz = slot_start_utc.astimezone(user_tz)
+            if slot_in_user_tz <= now_in_user_tz or not (first_date_obj <= slot_in_user_tz.date() <= last_date_obj):
+                continue
+            available_slots_in_user_tz.append(slot_in_user_tz.isoformat())
+            if len(available_slots_in_user_tz) >= max_results:
+                break
+        
+        if not available_slots_in_user_tz:
+            return [f"No available slots were found between {first_date_obj.isoformat()} and {last_date_obj.isoformat()}."]
+        return available_slots_in_user_tz
     except Exception as e:
-        return [f"An unexpected error occurred in find_available_slots: {e}"]
+        return [f"An unexpected error occurred in find_next_available_slots: {e}"]
 
 @tool
 def propose_event(summary: str, start_time: str, end_time: str) -> Dict:
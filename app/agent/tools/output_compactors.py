@@ -0,0 +1,100 @@
+# Compact, model-friendly renderings of tool results
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from app.core.config import settings
+
+
+def _truncate(text: str) -> str:
+    """Cuts text to TOOL_OUTPUT_MAX_CHARS, saying how much was left out."""
+    if len(text) <= settings.TOOL_OUTPUT_MAX_CHARS:
+        return text
+    omitted = len(text) - settings.TOOL_OUTPUT_MAX_CHARS
+    return f"{text[:settings.TOOL_OUTPUT_MAX_CHARS]}... [{omitted} more characters]"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _limit_items(items: List[Any]) -> List[Any]:
+    """Keeps the first TOOL_OUTPUT_MAX_ITEMS items and appends an "N more" marker for the rest."""
+    if len(items) <= settings.TOOL_OUTPUT_MAX_ITEMS:
+        return items
+    return items[:settings.TOOL_OUTPUT_MAX_ITEMS] + [{"more": len(items) - settings.TOOL_OUTPUT_MAX_ITEMS}]
+
+
+def _prune(record: Dict, fields: List[str]) -> Dict:
+    """Keeps the given fields of a record, dropping empty values. Error records are kept as they are."""
+    if "error" in record:
+        return record
+    return {field: record[field] for field in fields if record.get(field) not in (None, "", [], {})}
+
+
+def compact_json(result: Any) -> str:
+    """The default: compact JSON for structured results, plain text for strings."""
+    if isinstance(result, str):
+        return _truncate(result)
+    return _truncate(_dumps(result))
+
+
+def compact_event_list(result: Any) -> str:
+    """Renders `list_events` results with empty fields pruned and the list capped."""
+    if not isinstance(result, list):
+        return compact_json(result)
+    fields = ["google_event_id", "title", "start_time", "end_time", "status", "attendees"]
+    return compact_json(_limit_items([_prune(e, fields) if isinstance(e, dict) else e for e in result]))
+
+
+def compact_search_results(result: Any) -> str:
+    """Renders search results with shortened snippets and the list capped."""
+    if not isinstance(result, list):
+        return compact_json(result)
+    fields = ["title", "source", "date", "link", "snippet"]
+    compacted = []
+    for item in result:
+        if isinstance(item, dict):
+            item = _prune(item, fields)
+            snippet = item.get("snippet")
+            if snippet and len(snippet) > settings.TOOL_OUTPUT_SNIPPET_CHARS:
+                item["snippet"] = snippet[:settings.TOOL_OUTPUT_SNIPPET_CHARS] + "..."
+        compacted.append(item)
+    return compact_json(_limit_items(compacted))
+
+
+def compact_slot_list(result: Any) -> str:
+    """
+    Collapses slot start times into ranges per day, e.g.
+    "2025-07-01 (UTC+05:30): 10:00-13:30 every 30 min, 15:00".
+
+    Results that are not ISO timestamps (errors, "no slots" notices) are passed through.
+    """
+    if not isinstance(result, list) or not result:
+        return compact_json(result)
+    try:
+        starts = [datetime.fromisoformat(value) for value in result]
+    except (TypeError, ValueError):
+        return compact_json(result)
+
+    step = timedelta(minutes=settings.SLOT_CHECK_DURATION_MINUTES)
+    days: "OrderedDict[tuple, List[datetime]]" = OrderedDict()
+    for start in starts:
+        days.setdefault((start.date(), start.strftime("%z")), []).append(start)
+
+    lines = []
+    for (day, offset), day_starts in days.items():
+        runs: List[List[datetime]] = []
+        for start in day_starts:
+            if runs and start - runs[-1][-1] == step:
+                runs[-1].append(start)
+            else:
+                runs.append([start])
+        parts = [
+            f"{run[0]:%H:%M}-{run[-1]:%H:%M} every {int(step.total_seconds() // 60)} min" if len(run) > 1 else f"{run[0]:%H:%M}"
+            for run in runs
+        ]
+        tz_label = f"UTC{offset[:3]}:{offset[3:]}" if offset else "local"
+        lines.append(f"{day.isoformat()} ({tz_label}): {', '.join(parts)}")
+    return _truncate("Available slot start times:\n" + "\n".join(lines))
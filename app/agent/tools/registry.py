@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List
+
+from langchain_core.tools import BaseTool
+
+from app.agent.tools import calendar_tools, search_tools, time_tools
+from app.agent.tools.output_compactors import (
+    compact_event_list,
+    compact_json,
+    compact_search_results,
+    compact_slot_list,
+)
+
+
+class SideEffect(str, Enum):
+    """What a tool may change when it runs."""
+    READ = "read"          # Only reads local data.
+    EXTERNAL = "external"  # Calls a third-party service; changes nothing locally.
+    WRITE = "write"        # Changes bookings or the user's profile.
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """A tool exposed to the agent, together with the policies the tool node applies to it."""
+    tool: BaseTool
+    side_effect: SideEffect
+    timeout_seconds: float
+    # Whether the tool node must inject `current_user` into the arguments.
+    needs_user: bool = True
+    # Renders the result as the ToolMessage content the model sees.
+    compactor: Callable[[Any], str] = compact_json
+
+    @property
+    def name(self) -> str:
+        return self.tool.name
+
+    @property
+    def serialized(self) -> bool:
+        """Writes never run concurrently with other calls of the same turn."""
+        return self.side_effect is SideEffect.WRITE
+
+    @property
+    def cancellable(self) -> bool:
+        """Only reads are cancelled at their timeout; other calls may already have taken effect."""
+        return self.side_effect is SideEffect.READ
+
+
+TOOL_SPECS: List[ToolSpec] = [
+    ToolSpec(calendar_tools.confirm_and_book_event, SideEffect.WRITE, timeout_seconds=30),
+    ToolSpec(calendar_tools.list_events, SideEffect.READ, timeout_seconds=10, compactor=compact_event_list),
+    ToolSpec(calendar_tools.delete_event, SideEffect.WRITE, timeout_seconds=30),
+    ToolSpec(calendar_tools.update_user_timezone, SideEffect.WRITE, timeout_seconds=10),
+    ToolSpec(calendar_tools.update_event, SideEffect.WRITE, timeout_seconds=30),
+    ToolSpec(calendar_tools.find_available_slots, SideEffect.READ, timeout_seconds=10, compactor=compact_slot_list),
+    ToolSpec(calendar_tools.find_next_available_slots, SideEffect.READ, timeout_seconds=15, compactor=compact_slot_list),
+    ToolSpec(time_tools.resolve_date_phrase, SideEffect.READ, timeout_seconds=2),
+    ToolSpec(
+        search_tools.search_web, SideEffect.EXTERNAL, timeout_seconds=15, needs_user=False,
+        compactor=compact_search_results,
+    ),
+    ToolSpec(
+        search_tools.search_news, SideEffect.EXTERNAL, timeout_seconds=15, needs_user=False,
+        compactor=compact_search_results,
+    ),
+]
+
+# Built once at import; tool calls are dispatched by name in constant time.
+TOOL_REGISTRY: Dict[str, ToolSpec] = {spec.name: spec for spec in TOOL_SPECS}
+
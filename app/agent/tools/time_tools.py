@@ -0,0 +1,27 @@
+from typing import Dict
+
+from langchain_core.tools import tool
+
+from app.agent.utils.time_parser import resolve_time_phrase
+
+@tool
+def resolve_date_phrase(phrase: str, current_user: Dict) -> Dict:
+    """
+    Resolves a relative date phrase such as 'tomorrow', 'next Friday afternoon' or 'in 2 weeks'
+    into a 'YYYY-MM-DD' date in the user's timezone, plus the local time window for parts of the day.
+    Use it instead of working out dates yourself when they are not already resolved in your instructions.
+    """
+    timezone = current_user.get('timezone')
+    if not timezone:
+        return {"error": "The user's timezone is not set."}
+    reference = resolve_time_phrase(phrase, timezone)
+    if reference is None:
+        return {"error": f"Could not resolve '{phrase}'. Please resolve it from the user's current local time."}
+    result = {"date": reference.date.isoformat(), "weekday": reference.date.strftime("%A")}
+    if reference.part_of_day:
+        result.update({
+            "part_of_day": reference.part_of_day,
+            "window_start": reference.window_start.isoformat(),
+            "window_end": reference.window_end.isoformat(),
+        })
+    return result
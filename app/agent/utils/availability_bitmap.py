@@ -0,0 +1,103 @@
+# Fixed-resolution bitmap representation of a working day's availability
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+
+@lru_cache(maxsize=64)
+def _grid_mask(size: int, step_granules: int) -> int:
+    """Returns a mask with one bit set for every slot start on the step grid."""
+    mask = 0
+    for i in range(0, size, step_granules):
+        mask |= 1 << i
+    return mask
+
+
+class DayAvailability:
+    """
+    Busy/free state of one company working day, stored as a single integer bitmap.
+
+    Bit `i` covers the granule `[day_start + i * resolution, day_start + (i + 1) * resolution)`
+    and is set when any part of that granule is busy. Busy blocks are therefore rounded
+    outwards to whole granules, which is exact for slots aligned to the resolution and
+    conservative otherwise.
+    """
+
+    __slots__ = ("day_start_utc", "day_end_utc", "resolution", "size", "busy")
+
+    def __init__(self, day_start_utc: datetime, day_end_utc: datetime, resolution: timedelta, busy: int = 0):
+        self.day_start_utc = day_start_utc
+        self.day_end_utc = day_end_utc
+        self.resolution = resolution
+        self.size = -((day_start_utc - day_end_utc) // resolution)
+        self.busy = busy
+
+    @classmethod
+    def from_busy_blocks(
+        cls,
+        merged_blocks: List[Interval],
+        day_start_utc: datetime,
+        day_end_utc: datetime,
+        resolution: timedelta,
+    ) -> "DayAvailability":
+        """
+        Builds the bitmap for one day from merged busy blocks (see `conflict_detector.merge_busy_blocks`).
+
+        Args:
+            merged_blocks (List[Interval]): Sorted, disjoint busy blocks, already widened by the meeting buffer.
+            day_start_utc (datetime): Start of working hours.
+            day_end_utc (datetime): End of working hours.
+            resolution (timedelta): Length of time covered by one bit.
+
+        Returns:
+            DayAvailability: The day's availability bitmap.
+        """
+        availability = cls(day_start_utc, day_end_utc, resolution)
+        first = bisect_right(merged_blocks, (day_start_utc, day_start_utc))
+        if first and merged_blocks[first - 1][1] > day_start_utc:
+            first -= 1
+
+        busy = 0
+        for start, end in merged_blocks[first:]:
+            if start >= day_end_utc:
+                break
+            busy |= availability._granule_mask(start, end)
+        availability.busy = busy
+        return availability
+
+    def _granule_mask(self, start: datetime, end: datetime) -> int:
+        """Returns the bits of every granule touched by `[start, end)`, clipped to the day."""
+        first = max((start - self.day_start_utc) // self.resolution, 0)
+        last = min(-((self.day_start_utc - end) // self.resolution), self.size)
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def slot_starts(self, duration: timedelta, step: timedelta) -> List[datetime]:
+        """
+        Returns every slot start on the `step` grid whose full `duration` is free.
+
+        A slot of `n` granules starting at bit `i` fits when bits `i..i+n-1` are all free;
+        the free mask is AND-ed with shifted copies of itself (doubling the run length each
+        time), so the cost is O(log n) big-integer operations rather than per-slot datetime math.
+        """
+        needed = max(-(-duration // self.resolution), 1)
+        step_granules = max(step // self.resolution, 1)
+        fits = ~self.busy & ((1 << self.size) - 1)
+
+        run_length = 1
+        while run_length < needed and fits:
+            shift = min(run_length, needed - run_length)
+            fits &= fits >> shift
+            run_length += shift
+
+        fits &= _grid_mask(self.size, step_granules)
+        slot_starts: List[datetime] = []
+        while fits:
+            lowest = fits & -fits
+            slot_starts.append(self.day_start_utc + (lowest.bit_length() - 1) * self.resolution)
+            fits ^= lowest
+        return slot_starts
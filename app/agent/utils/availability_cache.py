@@ -0,0 +1,115 @@
+# Materialized per-day availability with write-through invalidation
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+import pytz
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+CacheKey = Tuple[date, int, int]
+
+
+class AvailabilityCache:
+    """
+    Caches the free slot starts (UTC) of a company working day, keyed by
+    (company day, duration in minutes, buffer in minutes).
+
+    Every write to the `events` collection must call `invalidate_range` with the
+    event's time range, which drops every entry for the company days it touches.
+    Each day also carries a version number so that a result computed from a
+    database read that raced with a write is never stored.
+
+    The cache is per process; the TTL bounds how long another worker's writes
+    can go unnoticed.
+
+    Both indexes stay bounded: a day's key set is dropped with its last entry, and
+    only the most recent `max_entries` invalidations are remembered. A forgotten
+    day reports the newest forgotten sequence number, so a version captured before
+    any invalidation that has since been forgotten never matches again.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._cache = TTLCache(max_entries, ttl_seconds, on_evict=self._forget_key)
+        self._keys_by_day: Dict[date, Set[CacheKey]] = {}
+        # Sequence number of each day's latest invalidation, oldest first.
+        self._versions: "OrderedDict[date, int]" = OrderedDict()
+        self._max_versions = max_entries
+        self._sequence = 0
+        self._forgotten_sequence = 0
+        self._epoch = 0
+
+    def _forget_key(self, key: CacheKey) -> None:
+        """Drops an expired or evicted entry from the per-day index."""
+        keys = self._keys_by_day.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_day[key[0]]
+
+    def version(self, company_day: date) -> Tuple[int, int]:
+        """Returns the invalidation counter of a day; capture it before reading the database."""
+        return self._epoch, self._versions.get(company_day, self._forgotten_sequence)
+
+    def get(self, company_day: date, duration_minutes: int, buffer_minutes: int) -> Optional[Tuple[datetime, ...]]:
+        """Returns the cached slot starts for a day, or None on a miss."""
+        return self._cache.get((company_day, duration_minutes, buffer_minutes))
+
+    def set(
+        self,
+        company_day: date,
+        duration_minutes: int,
+        buffer_minutes: int,
+        slot_starts: Tuple[datetime, ...],
+        version: Tuple[int, int],
+    ) -> None:
+        """Stores slot starts unless the day was invalidated since `version` was captured."""
+        if self.version(company_day) != version:
+            return
+        key = (company_day, duration_minutes, buffer_minutes)
+        # Indexed before storing, so that an eviction caused by this very write finds the key.
+        self._keys_by_day.setdefault(company_day, set()).add(key)
+        self._cache.set(key, slot_starts)
+
+    def invalidate_day(self, company_day: date) -> None:
+        """Drops every cached entry for a company day."""
+        self._sequence += 1
+        self._versions[company_day] = self._sequence
+        self._versions.move_to_end(company_day)
+        while len(self._versions) > self._max_versions:
+            _, sequence = self._versions.popitem(last=False)
+            self._forgotten_sequence = max(self._forgotten_sequence, sequence)
+        for key in self._keys_by_day.pop(company_day, set()):
+            self._cache.pop(key)
+
+    def invalidate_range(self, start_utc: datetime, end_utc: datetime) -> None:
+        """
+        Drops the cached days affected by an event occupying `[start_utc, end_utc]`,
+        including the meeting buffer on either side.
+        """
+        company_tz = pytz.timezone(settings.COMPANY_TIMEZONE)
+        buffer = timedelta(minutes=settings.MEETING_BUFFER_MINUTES)
+        if start_utc.tzinfo is None: start_utc = start_utc.replace(tzinfo=pytz.UTC)
+        if end_utc.tzinfo is None: end_utc = end_utc.replace(tzinfo=pytz.UTC)
+
+        first_day = (start_utc - buffer).astimezone(company_tz).date()
+        last_day = (end_utc + buffer).astimezone(company_tz).date()
+        for offset in range((last_day - first_day).days + 1):
+            self.invalidate_day(first_day + timedelta(days=offset))
+
+    def clear(self) -> None:
+        """Drops everything, e.g. after an external bulk change."""
+        self._epoch += 1
+        self._keys_by_day.clear()
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the current size."""
+        return self._cache.stats()
+
+
+availability_cache = AvailabilityCache(
+    max_entries=settings.AVAILABILITY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+)
@@ -1 +1,84 @@
-# Meeting overlap detection logic
\ No newline at end of file
+# Meeting overlap detection logic
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+
+def merge_busy_blocks(blocks: Iterable[Interval]) -> List[Interval]:
+    """
+    Sorts busy blocks by start time and coalesces any that overlap or touch.
+
+    Args:
+        blocks (Iterable[Interval]): (start, end) pairs, already widened by any meeting buffer.
+
+    Returns:
+        List[Interval]: Disjoint, sorted intervals covering the same busy time.
+    """
+    merged: List[Interval] = []
+    for start, end in sorted(blocks):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_free_windows(merged_blocks: List[Interval], window_start: datetime, window_end: datetime) -> List[Interval]:
+    """
+    Sweeps the merged busy blocks once and returns the gaps inside a window.
+
+    Args:
+        merged_blocks (List[Interval]): Output of `merge_busy_blocks`.
+        window_start (datetime): Start of the window to search (e.g. start of working hours).
+        window_end (datetime): End of the window to search.
+
+    Returns:
+        List[Interval]: Free (start, end) windows in chronological order.
+    """
+    free: List[Interval] = []
+    cursor = window_start
+    # Jump straight to the first block that could end inside the window.
+    first = bisect_right(merged_blocks, (window_start, window_start))
+    if first and merged_blocks[first - 1][1] > window_start:
+        first -= 1
+
+    for start, end in merged_blocks[first:]:
+        if start >= window_end:
+            break
+        if start > cursor:
+            free.append((cursor, start))
+        if end > cursor:
+            cursor = end
+    if cursor < window_end:
+        free.append((cursor, window_end))
+    return free
+
+
+def find_slot_starts(
+    merged_blocks: List[Interval],
+    window_start: datetime,
+    window_end: datetime,
+    duration: timedelta,
+    step: timedelta,
+) -> List[datetime]:
+    """
+    Returns every slot start on the `step` grid (anchored at `window_start`) whose
+    full `duration` fits inside a free window.
+
+    The cost is linear in the number of busy blocks plus the number of slots emitted,
+    instead of checking every candidate slot against every block. find_available_slots
+    reads slot starts from `DayAvailability` bitmaps instead; this exact sweep is the
+    reference they are tested and benchmarked against.
+    """
+    slot_starts: List[datetime] = []
+    for free_start, free_end in find_free_windows(merged_blocks, window_start, window_end):
+        # Round the free window's start up to the next grid point.
+        steps_in = -((window_start - free_start) // step)
+        slot_start = window_start + steps_in * step
+        while slot_start + duration <= free_end:
+            slot_starts.append(slot_start)
+            slot_start += step
+    return slot_starts
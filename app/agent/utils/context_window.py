@@ -0,0 +1,73 @@
+# Token-budgeted selection of the conversation history sent to the model
+import json
+from typing import List, Sequence, Union
+
+from langchain_core.messages import BaseMessage, ToolMessage
+
+# Rough characters-per-token ratio; good enough for budgeting without a tokenizer round trip.
+_CHARS_PER_TOKEN = 4
+
+
+def message_text(message: Union[BaseMessage, str, List]) -> str:
+    """
+    Returns the text of a message (or message chunk), or of a message content, which is
+    either a string or a list of parts.
+    """
+    content = message.content if isinstance(message, BaseMessage) else message
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content or [])
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Estimates the prompt tokens of a message, including any tool calls it carries."""
+    chars = len(message_text(message))
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        chars += len(json.dumps([{"name": c["name"], "args": c["args"]} for c in tool_calls], default=str))
+    return chars // _CHARS_PER_TOKEN + 1
+
+
+def turn_starts(messages: Sequence[BaseMessage]) -> List[int]:
+    """Returns the index of every human message, i.e. the first message of each turn."""
+    return [i for i, message in enumerate(messages) if message.type == "human"]
+
+
+def find_window_start(messages: Sequence[BaseMessage], token_budget: int, floor: int = 0) -> int:
+    """
+    Returns the index of the oldest message to send so that the most recent turns fit
+    within `token_budget`.
+
+    The window always starts at a turn boundary, so tool results are never separated
+    from the call that produced them, and the current turn is always kept in full, even
+    if it alone exceeds the budget. The window never starts before `floor`.
+
+    Args:
+        messages (Sequence[BaseMessage]): The full conversation.
+        token_budget (int): The number of tokens the kept turns may use.
+        floor (int): The index of the first message not yet folded into the summary.
+
+    Returns:
+        int: The start index of the window.
+    """
+    starts = [start for start in turn_starts(messages) if start >= floor]
+    if not starts:
+        return floor
+
+    window_start = starts[-1]
+    used = sum(estimate_tokens(m) for m in messages[window_start:])
+    for start in reversed(starts[:-1]):
+        used += sum(estimate_tokens(m) for m in messages[start:window_start])
+        if used > token_budget:
+            break
+        window_start = start
+    return window_start
+
+
+def compact_tool_output(message: ToolMessage, max_chars: int) -> ToolMessage:
+    """Returns the tool message with its output shortened to `max_chars` characters."""
+    text = message_text(message)
+    if len(text) <= max_chars:
+        return message
+    omitted = len(text) - max_chars
+    return message.model_copy(update={"content": f"{text[:max_chars]}... [{omitted} characters omitted]"})
@@ -0,0 +1,228 @@
+# Rule-based fast path for simple requests that do not need the model
+import re
+import statistics
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import pytz
+
+from app.agent.utils.time_parser import TimeReference, find_time_references
+
+# Anything that hints at a compound or state-changing request goes to the model.
+_COMPLEX_WORDS = re.compile(
+    r"\b(?:book|schedule|reschedul\w*|move|change|update|delete|cancel|remove|and|then|also|except|but|not|"
+    r"search|news|why|how|who|which)\b",
+    re.IGNORECASE,
+)
+_CLOCK_TIME = re.compile(r"\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b|\b\d{1,2}:\d{2}\b|\bnoon\b", re.IGNORECASE)
+_FILLER_WORDS = {"for", "on", "in", "the", "of", "please", "thanks", "thank", "you", "me", "i", "have", "do", "any", "a", "slots", "slot", "times"}
+# Words that may also surround an availability question about the user's own calendar.
+_AVAILABILITY_FILLER_WORDS = _FILLER_WORDS | {"am", "is", "are", "there", "my", "calendar", "time", "what", "when"}
+# The time parser resolves "next week" to its Monday; the router only serves single days.
+_WEEK_RANGE = re.compile(r"\b(?:this|next|coming)\s+week\b", re.IGNORECASE)
+
+_LIST_EVENTS = re.compile(
+    r"^\s*(?:(?:can|could)\s+you\s+)?(?:please\s+)?"
+    r"(?:list|show(?:\s+me)?|get|what\s+are|what(?:'s|\s+is)\s+on|whats\s+on)\s+"
+    r"(?:all\s+)?my\s+(?:upcoming\s+)?(?:events|meetings|calendar|schedule|bookings|appointments)\b(?P<rest>.*)$",
+    re.IGNORECASE,
+)
+_WHAT_DO_I_HAVE = re.compile(r"^\s*what\s+do\s+i\s+have\b(?P<rest>.*)$", re.IGNORECASE)
+_AVAILABILITY = re.compile(r"\b(?:free|available|availability|openings?|open)\b", re.IGNORECASE)
+_DURATION = re.compile(
+    r"\b(?:(?P<number>\d+)\s*-?\s*(?P<unit>minutes?|mins?|hours?|hrs?)|(?P<half>half\s+an\s+hour)|(?P<one>an\s+hour|one\s+hour))\b",
+    re.IGNORECASE,
+)
+_DELETE_EVENT = re.compile(
+    r"^\s*(?:please\s+)?(?:delete|cancel|remove)\s+(?:the\s+|my\s+)?(?:event|meeting|booking|appointment)\s+"
+    # Event ids contain a digit, which tells them apart from words such as "tomorrow".
+    r"(?:with\s+)?(?:id\s*:?\s*)?(?P<event_id>(?=[A-Za-z_-]*\d)[A-Za-z0-9_-]{8,})\s*[.!]?\s*$",
+    re.IGNORECASE,
+)
+_CONFIRM = re.compile(
+    r"^\s*(?:yes|yep|yeah|yup|confirm(?:ed)?|sure|go\s+ahead|do\s+it|please\s+do|ok(?:ay)?)"
+    r"(?:\s*,?\s*(?:please|go\s+ahead|delete\s+it|do\s+it|thanks|thank\s+you))*\s*[.!]*\s*$",
+    re.IGNORECASE,
+)
+_DECLINE = re.compile(
+    r"^\s*(?:no|nope|don'?t|do\s+not|never\s*mind|keep\s+it)(?:\s*,?\s*(?:thanks|thank\s+you|keep\s+it|don'?t\s+delete\s+it))*\s*[.!]*\s*$",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A request the router can serve without the model."""
+    name: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    reference: Optional[TimeReference] = None
+
+
+def _only_filler(text: str, references: List[TimeReference], filler_words: Set[str] = _FILLER_WORDS) -> bool:
+    """True if nothing but the given date references and filler words remain in the text."""
+    for reference in references:
+        text = re.sub(re.escape(reference.text), " ", text, flags=re.IGNORECASE)
+    words = re.findall(r"[a-z']+", text.lower())
+    return all(word in filler_words for word in words)
+
+
+def _duration_minutes(text: str) -> Optional[int]:
+    """Returns the duration mentioned in the text, or None unless exactly one is."""
+    matches = list(_DURATION.finditer(text))
+    if len(matches) != 1:
+        return None
+    match = matches[0]
+    if match.group("half"):
+        return 30
+    if match.group("one"):
+        return 60
+    number = int(match.group("number"))
+    return number * 60 if match.group("unit").lower().startswith("h") else number
+
+
+def classify_intent(
+    text: str, timezone: Optional[str], pending_action: Optional[Dict] = None, now: Optional[datetime] = None
+) -> Optional[Intent]:
+    """
+    Recognizes high-confidence simple requests.
+
+    Returns None whenever the request is not clearly one of them, so it goes to the
+    full agent instead: misrouting a request costs more than an extra model call.
+
+    Args:
+        text (str): The user's message.
+        timezone (Optional[str]): The user's IANA timezone; date-based intents need it.
+        pending_action (Optional[Dict]): An action the previous reply asked the user to confirm.
+        now (Optional[datetime]): The current time, for reproducible results. Defaults to the clock.
+    """
+    if pending_action:
+        if _CONFIRM.match(text):
+            return Intent("confirm")
+        if _DECLINE.match(text):
+            return Intent("decline")
+        return None
+
+    delete_match = _DELETE_EVENT.match(text)
+    if delete_match:
+        return Intent("delete_request", {"event_id": delete_match.group("event_id")})
+
+    if (
+        not timezone or _COMPLEX_WORDS.search(text) or _CLOCK_TIME.search(text) or _WEEK_RANGE.search(text)
+        or len(text.split()) > 15
+    ):
+        return None
+    references = find_time_references(text, timezone, now)
+    if len(references) > 1:
+        return None
+    reference = references[0] if references else None
+
+    list_match = _LIST_EVENTS.match(text) or _WHAT_DO_I_HAVE.match(text)
+    if list_match:
+        if list_match.re is _WHAT_DO_I_HAVE and reference is None:
+            return None
+        if not _only_filler(list_match.group("rest"), references):
+            return None
+        args = {}
+        if reference is not None:
+            args = {
+                "start_time": reference.window_start.replace(tzinfo=None).isoformat(),
+                "end_time": reference.window_end.replace(tzinfo=None).isoformat(),
+            }
+        return Intent("list_events", args, reference)
+
+    duration = _duration_minutes(text)
+    if _AVAILABILITY.search(text) and reference is not None and duration:
+        # "is John free tomorrow for 1 hour" asks about someone else's calendar.
+        rest = _DURATION.sub(" ", _AVAILABILITY.sub(" ", text))
+        if not _only_filler(rest, references, _AVAILABILITY_FILLER_WORDS):
+            return None
+        return Intent(
+            "find_available_slots",
+            {"date": reference.date.isoformat(), "user_timezone": timezone, "duration_minutes": duration},
+            reference,
+        )
+    return None
+
+
+def render_event_list(events: List[Dict], reference: Optional[TimeReference]) -> str:
+    """Templated reply for `list_events`."""
+    if events and "error" in events[0]:
+        return f"I'm sorry, I couldn't retrieve your events: {events[0]['error']}"
+    scope = f"for {reference.text}" if reference else "coming up"
+    if not events:
+        return f"You have no events {scope}. Would you like me to find a time for a new meeting?"
+
+    lines = [f"Here are your events {scope}:"]
+    for event in events:
+        start, end = datetime.fromisoformat(event["start_time"]), datetime.fromisoformat(event["end_time"])
+        status = " (being added to the team calendar)" if event.get("status") == "pending" else ""
+        lines.append(
+            f"- **{event.get('title')}**: {start:%a, %b %d}, {start:%I:%M %p} - {end:%I:%M %p}{status} (ID: {event.get('google_event_id')})"
+        )
+    return "\n".join(lines)
+
+
+def render_available_slots(slots: List[str], reference: TimeReference, duration_minutes: int) -> str:
+    """Templated reply for `find_available_slots`, keeping only slots inside the requested part of the day."""
+    try:
+        starts = [datetime.fromisoformat(slot) for slot in slots]
+    except ValueError:
+        # Not timestamps: the tool returned a notice such as "The date you selected is in the past."
+        return " ".join(slots)
+
+    if reference.part_of_day:
+        starts = [start for start in starts if reference.window_start <= start < reference.window_end]
+    if not starts:
+        return (
+            f"Unfortunately there are no {duration_minutes}-minute slots available {reference.text}. "
+            "Would you like me to look for the next available opening?"
+        )
+    times = ", ".join(f"{start:%I:%M %p}".lstrip("0") for start in starts)
+    return (
+        f"Here are the available {duration_minutes}-minute slots {reference.text} "
+        f"({reference.date:%A, %B %d}, your local time): {times}. Would you like me to book one of them?"
+    )
+
+
+def render_delete_confirmation(event_doc: Dict, user_tz) -> str:
+    """Asks the user to confirm a deletion, as the agent's directives require."""
+    start_local = event_doc["start_time_utc"].replace(tzinfo=pytz.UTC).astimezone(user_tz)
+    return (
+        f"Just to confirm, you'd like to delete '{event_doc.get('title')}' on "
+        f"{start_local:%A, %B %d at %I:%M %p}? Please reply yes to delete it, or no to keep it."
+    )
+
+
+class TurnMetrics:
+    """
+    Counts agent turns by route and keeps recent turn latencies, to measure how many
+    turns the intent router serves without the model and how much faster they are.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.routes: Dict[str, int] = defaultdict(int)
+        self._latencies: Dict[str, Deque[float]] = {"fast_path": deque(maxlen=window), "llm": deque(maxlen=window)}
+
+    def record_route(self, route: str) -> None:
+        """Counts a routing decision: an intent name, or "fallback"."""
+        self.routes[route] += 1
+
+    def record_turn(self, elapsed: float, used_llm: bool) -> None:
+        self._latencies["llm" if used_llm else "fast_path"].append(elapsed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the route counts, the share of turns served without the model and p50 latencies."""
+        fast, llm = len(self._latencies["fast_path"]), len(self._latencies["llm"])
+        return {
+            "routes": dict(self.routes),
+            "zero_llm_share": fast / (fast + llm) if fast + llm else 0.0,
+            "p50_seconds": {
+                path: statistics.median(latencies) if latencies else None
+                for path, latencies in self._latencies.items()
+            },
+        }
+
+
+turn_metrics = TurnMetrics()
@@ -1 +1,179 @@
-# Natural language time parsing utilities
\ No newline at end of file
+# Natural language time parsing utilities
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+
+import pytz
+
+# Local-time windows of the parts of the day, as [start hour, end hour).
+PARTS_OF_DAY = {
+    "morning": (9, 12),
+    "afternoon": (12, 17),
+    "evening": (17, 21),
+    "night": (19, 23),
+}
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7}
+
+_MONTH_NAME = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+_PART = r"(?:morning|afternoon|evening|night)"
+# A number followed by one of these is a quantity ("may 15 minutes"), not a day of the month.
+_QUANTITY_UNIT = r"(?:min(?:ute)?s?|h(?:ou)?rs?|days?|weeks?|months?|years?|people|persons?|times?)"
+
+_DATE_PATTERN = re.compile(
+    r"\b(?:"
+    r"(?P<iso>\d{4}-\d{2}-\d{2})"
+    r"|(?P<after_tomorrow>(?:the\s+)?day\s+after\s+tomorrow)"
+    r"|(?P<relative>today|tonight|tomorrow)"
+    r"|this\s+(?P<this_part>morning|afternoon|evening)"
+    r"|in\s+(?P<count>\d+|an?|one|two|three|four|five|six|seven)\s+(?P<unit>days?|weeks?)"
+    r"|(?P<next_week>next\s+week)"
+    r"|(?:(?P<modifier>this|next|coming)\s+)?(?P<weekday>monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+    r"|(?P<month_first>" + _MONTH_NAME + r")\.?\s+(?P<day_after>\d{1,2})(?:st|nd|rd|th)?(?!\d)(?!\s*" + _QUANTITY_UNIT + r"\b)"
+    r"|(?P<day_first>\d{1,2})(?P<ordinal>st|nd|rd|th)?\s+(?P<of>of\s+)?(?P<month_after>" + _MONTH_NAME + r")"
+    r")\b",
+    re.IGNORECASE,
+)
+_PART_AFTER = re.compile(r"\s*(?:in\s+the\s+|at\s+)?(" + _PART + r")\b", re.IGNORECASE)
+_PART_BEFORE = re.compile(r"\b(" + _PART + r")\s+(?:on\s+|of\s+)?$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class TimeReference:
+    """A date (and optional part of the day) mentioned in a message, resolved in the user's timezone."""
+    text: str
+    date: date
+    part_of_day: Optional[str] = None
+    # Aware local datetimes bounding the part of the day, or the whole day if none was given.
+    window_start: Optional[datetime] = None
+    window_end: Optional[datetime] = None
+
+    def describe(self) -> str:
+        """Renders the reference for the model, e.g. "'tomorrow afternoon' = 2025-07-02 (Wednesday) 12:00-17:00 +0530"."""
+        if self.part_of_day is None:
+            return f"'{self.text}' = {self.date.isoformat()} ({self.date:%A})"
+        return (
+            f"'{self.text}' = {self.date.isoformat()} ({self.date:%A}) "
+            f"{self.window_start:%H:%M}-{self.window_end:%H:%M} {self.window_start:%z}"
+        )
+
+
+def _local_window(day: date, tz, part_of_day: Optional[str]) -> Tuple[datetime, datetime]:
+    """Returns the aware bounds of a day or part of it; pytz normalizes times that fall in a DST transition."""
+    if part_of_day is None:
+        start = tz.localize(datetime.combine(day, time.min))
+        end = tz.localize(datetime.combine(day + timedelta(days=1), time.min))
+    else:
+        start_hour, end_hour = PARTS_OF_DAY[part_of_day]
+        start = tz.localize(datetime.combine(day, time(start_hour)))
+        end = tz.localize(datetime.combine(day, time(end_hour)))
+    return tz.normalize(start), tz.normalize(end)
+
+
+def _month_day(today: date, month_name: str, day_number: int) -> Optional[date]:
+    """Resolves "July 4" to its next occurrence, today included."""
+    month = _MONTHS.index(month_name[:3].lower()) + 1
+    for year in (today.year, today.year + 1):
+        try:
+            candidate = date(year, month, day_number)
+        except ValueError:
+            return None
+        if candidate >= today:
+            return candidate
+    return None
+
+
+def _resolve_match(match: re.Match, today: date) -> Tuple[Optional[date], Optional[str]]:
+    """Resolves a single date match to (date, implied part of the day)."""
+    groups = match.groupdict()
+    if groups["iso"]:
+        try:
+            return date.fromisoformat(groups["iso"]), None
+        except ValueError:
+            return None, None
+    if groups["after_tomorrow"]:
+        return today + timedelta(days=2), None
+    if groups["relative"]:
+        word = groups["relative"].lower()
+        if word == "tomorrow":
+            return today + timedelta(days=1), None
+        return today, "evening" if word == "tonight" else None
+    if groups["this_part"]:
+        return today, groups["this_part"].lower()
+    if groups["count"]:
+        count = groups["count"].lower()
+        count = int(count) if count.isdigit() else _NUMBER_WORDS[count]
+        days = count * 7 if groups["unit"].lower().startswith("week") else count
+        return today + timedelta(days=days), None
+    if groups["next_week"]:
+        return today + timedelta(days=7 - today.weekday()), None
+    if groups["weekday"]:
+        weekday = _WEEKDAYS.index(groups["weekday"].lower())
+        days_ahead = (weekday - today.weekday()) % 7
+        modifier = (groups["modifier"] or "").lower()
+        if modifier == "this":
+            # "this friday" is within the current week, which may be today.
+            return today + timedelta(days=days_ahead), None
+        if modifier == "next":
+            # "next friday" is the Friday of next week, even if this week's is still ahead.
+            return today + timedelta(days=7 - today.weekday() + weekday), None
+        # A bare or "coming" weekday is its first occurrence after today.
+        return today + timedelta(days=days_ahead or 7), None
+    if groups["month_first"]:
+        return _month_day(today, groups["month_first"], int(groups["day_after"])), None
+    if groups["day_first"]:
+        if groups["month_after"].lower() == "may" and not (groups["ordinal"] or groups["of"]):
+            # "those 2 may work": only "2nd May" or "2 of May" are dates.
+            return None, None
+        return _month_day(today, groups["month_after"], int(groups["day_first"])), None
+    return None, None
+
+
+def find_time_references(text: str, timezone: str, now: Optional[datetime] = None) -> List[TimeReference]:
+    """
+    Finds and resolves the relative and absolute dates mentioned in a message.
+
+    Recognizes "today", "tomorrow", "tonight", "day after tomorrow", "this afternoon",
+    weekdays (optionally with "this"/"coming", or "next" for next week's), "next week"
+    (its Monday), "in N days/weeks", ISO dates and month-day dates such as "July 4th"
+    or "4 July".
+    A part of the day directly before or after a date ("Friday afternoon",
+    "morning of May 3") narrows its window.
+
+    Args:
+        text (str): The user's message.
+        timezone (str): The user's IANA timezone; "today" is the current date there.
+        now (Optional[datetime]): The current time, for reproducible results. Defaults to the clock.
+
+    Returns:
+        List[TimeReference]: The references in the order they appear.
+    """
+    tz = pytz.timezone(timezone)
+    now = now.astimezone(tz) if now is not None else datetime.now(tz)
+    today = now.date()
+
+    references = []
+    for match in _DATE_PATTERN.finditer(text):
+        day, part_of_day = _resolve_match(match, today)
+        if day is None:
+            continue
+        start, end = match.start(), match.end()
+        if part_of_day is None:
+            after = _PART_AFTER.match(text, end)
+            before = _PART_BEFORE.search(text, 0, start)
+            if after:
+                part_of_day, end = after.group(1).lower(), after.end()
+            elif before:
+                part_of_day, start = before.group(1).lower(), before.start()
+        window_start, window_end = _local_window(day, tz, part_of_day)
+        references.append(TimeReference(text[start:end].strip(), day, part_of_day, window_start, window_end))
+    return references
+
+
+def resolve_time_phrase(phrase: str, timezone: str, now: Optional[datetime] = None) -> Optional[TimeReference]:
+    """Resolves a single date phrase such as "next friday afternoon", or returns None if it is not recognized."""
+    references = find_time_references(phrase, timezone, now)
+    return references[0] if references else None
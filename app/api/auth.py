@@ -4,7 +4,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from app.dependencies.service_dependencies import ServiceProvider
 from app.dependencies.auth_dependencies import get_current_user
 from app.schemas.auth import Token
-from app.schemas.user import UserCreate, UserPublic, UserInDB
+from app.schemas.user import UserCreate, UserPublic
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -39,7 +39,7 @@ async def login(
 
 @router.get("/me", response_model=UserPublic)
 async def read_users_me(
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: UserPublic = Depends(get_current_user)
 ):
     """
     Fetches the details of the currently authenticated user.
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header
+
+from app.services.calendar_watch_service import calendar_watch_service
+
+router = APIRouter(prefix="/calendar", tags=["Calendar"])
+
+@router.post("/notifications")
+async def receive_calendar_notification(
+    x_goog_channel_id: str = Header(...),
+    x_goog_resource_state: str = Header(...),
+    x_goog_channel_token: Optional[str] = Header(None),
+):
+    """
+    Receives Google Calendar push notifications for the watched calendar.
+
+    The notification body is empty; the headers identify the channel and what
+    happened. The changes themselves are fetched by an incremental sync that runs
+    in the background, so Google always gets a fast acknowledgement.
+    """
+    sync_requested = await calendar_watch_service.handle_notification(
+        channel_id=x_goog_channel_id,
+        channel_token=x_goog_channel_token,
+        resource_state=x_goog_resource_state,
+    )
+    return {"status": "accepted" if sync_requested else "ignored"}
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 
 from app.schemas.chat import ChatRequest
-from app.schemas.user import UserInDB
+from app.schemas.user import UserPublic
 from app.dependencies.auth_dependencies import get_current_user
 from app.dependencies.service_dependencies import ServiceProvider
 
@@ -11,7 +11,7 @@ router = APIRouter(prefix="/chat", tags=["Chat Agent"])
 @router.post("/stream")
 async def stream_chat(
     request: ChatRequest,
-    current_user: UserInDB = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user),
     services: ServiceProvider = Depends(ServiceProvider)
 ):
     """
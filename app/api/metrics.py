@@ -0,0 +1,63 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.agent.utils.intent_router import turn_metrics
+from app.core.metrics import http_metrics, render_metric
+from app.core.security import password_hasher
+from app.services.user_cache import user_cache
+
+router = APIRouter(tags=["Metrics"])
+
+def _component_metrics() -> str:
+    """Renders the statistics kept by the password hasher, the intent router and the user cache."""
+    hasher = password_hasher.snapshot()
+    operations = hasher["operations"]
+    turns = turn_metrics.snapshot()
+    cache = user_cache.stats()
+    return "".join([
+        render_metric("password_hash_pending", "gauge", "bcrypt calls running or queued.", [({}, hasher["pending"])]),
+        render_metric(
+            "password_hash_max_pending", "gauge", "Queue depth beyond which bcrypt calls are rejected.",
+            [({}, hasher["max_pending"])],
+        ),
+        render_metric(
+            "password_hash_rejected_total", "counter", "bcrypt calls rejected because the queue was full.",
+            [({}, hasher["rejected"])],
+        ),
+        render_metric(
+            "password_hash_calls_total", "counter", "Completed bcrypt calls.",
+            [({"operation": name}, stats["count"]) for name, stats in operations.items()],
+        ),
+        render_metric(
+            "password_hash_wait_seconds_total", "counter", "Time bcrypt calls spent queued for a worker.",
+            [({"operation": name}, stats["total_wait_seconds"]) for name, stats in operations.items()],
+        ),
+        render_metric(
+            "password_hash_run_seconds_total", "counter", "Time bcrypt calls spent running.",
+            [({"operation": name}, stats["total_run_seconds"]) for name, stats in operations.items()],
+        ),
+        render_metric(
+            "agent_turn_routes_total", "counter", "Agent turns by intent router decision.",
+            [({"route": route}, count) for route, count in sorted(turns["routes"].items())],
+        ),
+        render_metric(
+            "agent_turn_zero_llm_share", "gauge", "Share of recent turns served without the model.",
+            [({}, turns["zero_llm_share"])],
+        ),
+        render_metric(
+            "agent_turn_p50_seconds", "gauge", "Median latency of recent turns, with and without the model.",
+            [({"path": path}, p50) for path, p50 in turns["p50_seconds"].items() if p50 is not None],
+        ),
+        render_metric("user_cache_hits_total", "counter", "In-process user cache hits.", [({}, cache["hits"])]),
+        render_metric("user_cache_misses_total", "counter", "In-process user cache misses.", [({}, cache["misses"])]),
+        render_metric("user_cache_entries", "gauge", "Users held in the in-process cache.", [({}, cache["size"])]),
+    ])
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """
+    Exports the per-route request latency and size histograms, and the password
+    hasher, intent router and user cache statistics, in the Prometheus text format,
+    for scraping.
+    """
+    return PlainTextResponse(http_metrics.render() + _component_metrics(), media_type="text/plain; version=0.0.4")
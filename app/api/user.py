@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends
 from app.dependencies.auth_dependencies import get_current_user
 from app.dependencies.service_dependencies import ServiceProvider
-from app.schemas.user import UserPublic, UserUpdate, UserInDB
+from app.schemas.user import UserPublic, UserUpdate
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.put("/me", response_model=UserPublic)
 async def update_current_user_profile(
     user_update: UserUpdate,
-    current_user: UserInDB = Depends(get_current_user),
+    current_user: UserPublic = Depends(get_current_user),
     services: ServiceProvider = Depends(ServiceProvider)
 ):
     """
@@ -1,20 +1,90 @@
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     MONGO_URI: str
     DATABASE_NAME: str
+    # Optional shared cache for multi-worker deployments, e.g. "redis://localhost:6379/0".
+    REDIS_URL: Optional[str] = None
 
     CALENDAR_ID: str
     GOOGLE_CALENDAR_SCOPES: List[str] = ["https://www.googleapis.com/auth/calendar"]
     GOOGLE_CREDENTIALS_BASE64: str
     GOOGLE_API_KEY: str
+    CALENDAR_MAX_WORKERS: int = 8
+    CALENDAR_HTTP_TIMEOUT_SECONDS: int = 30
+    # Concurrent writes issued within this window are sent as one batch request; 0 disables batching.
+    CALENDAR_BATCH_WINDOW_MS: int = 10
+    CALENDAR_BATCH_MAX_SIZE: int = 50
+    # Base URL of a local fake Calendar API (e.g. "http://localhost:8085/calendar/v3/"); requests are sent unauthenticated.
+    GOOGLE_CALENDAR_API_ENDPOINT: Optional[str] = None
+
+    CALENDAR_SYNC_POLL_INTERVAL_SECONDS: float = 5.0
+    CALENDAR_SYNC_BATCH_SIZE: int = 10
+    CALENDAR_SYNC_MAX_ATTEMPTS: int = 8
+    CALENDAR_SYNC_BACKOFF_BASE_SECONDS: float = 2.0
+    CALENDAR_SYNC_BACKOFF_MAX_SECONDS: float = 300.0
+    CALENDAR_SYNC_LEASE_SECONDS: int = 60
+
+    CALENDAR_MIRROR_INTERVAL_SECONDS: float = 300.0
+    # How far back a full resync reaches; incremental syncs then follow every change.
+    CALENDAR_MIRROR_LOOKBACK_DAYS: int = 30
+    CALENDAR_MIRROR_PAGE_SIZE: int = 250
+
+    # Public HTTPS address of the push-notification endpoint, e.g. "https://example.com/api/calendar/notifications".
+    # Push notifications are disabled when unset.
+    CALENDAR_WEBHOOK_URL: Optional[str] = None
+    CALENDAR_WEBHOOK_TOKEN: Optional[str] = None
+    CALENDAR_WATCH_TTL_SECONDS: int = 7 * 24 * 3600
+    CALENDAR_WATCH_RENEW_BEFORE_SECONDS: int = 3600
 
     SERPER_API_KEY: str
 
+    # Where conversation threads are stored: "mongodb" or "memory" (local development only).
+    AGENT_CHECKPOINTER: str = "mongodb"
+    # Prompt tokens (estimated) available for the verbatim recent turns; older turns are summarized.
+    AGENT_CONTEXT_TOKEN_BUDGET: int = 8000
+    # Once over the budget, older turns are summarized until the rest fits this share of it.
+    AGENT_CONTEXT_FOLD_RATIO: float = 0.5
+    AGENT_SUMMARY_MAX_WORDS: int = 250
+    # Tool outputs of earlier turns are shortened to this many characters.
+    AGENT_STALE_TOOL_OUTPUT_CHARS: int = 500
+    # Per-tool compaction of tool results before they reach the model (see output_compactors.py).
+    TOOL_OUTPUT_COMPACTION: bool = True
+    TOOL_OUTPUT_MAX_ITEMS: int = 20
+    TOOL_OUTPUT_MAX_CHARS: int = 4000
+    TOOL_OUTPUT_SNIPPET_CHARS: int = 200
+    # Stream the model's reply token by token; when disabled, each message is sent once complete.
+    CHAT_STREAM_TOKENS: bool = True
+    # OpenTelemetry span exporter for agent turns: "console", "memory" or unset (no tracing).
+    TRACING_EXPORTER: Optional[str] = None
+    # Debug only: end every chat stream with a `trace` event summarizing where the turn's time went.
+    CHAT_TRACE_EVENTS: bool = False
+    # Upper bound on tool calls of a single agent turn that run concurrently.
+    AGENT_MAX_PARALLEL_TOOLS: int = 4
+    # Serve simple requests ("list my events", "delete event X") with rules and templates instead of the model.
+    AGENT_INTENT_ROUTER: bool = True
+
+    # Logs are written by a background thread from a bounded queue; records are dropped when it is full.
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000
+    # Rotating log file; empty to log to stdout only.
+    LOG_FILE: str = "logs/app_logs.log"
+    # Share of successful requests logged by TimingMiddleware; 4xx/5xx responses are always logged.
+    LOG_REQUEST_SAMPLE_RATE: float = 0.1
+
     JWT_SECRET_KEY: str 
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Authenticated users are cached by token subject; profile updates invalidate the entry.
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 300
+    # With Redis, the in-process copy bounds how long another worker's profile update goes unnoticed.
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 15
+    # bcrypt runs on its own thread pool; beyond this many queued or running calls, logins get a 503.
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
 
     COMPANY_TIMEZONE: str = "Asia/Kolkata"
     COMPANY_WORKING_HOURS: str = "10:00 AM to 6:00 PM"
@@ -23,6 +93,15 @@ class Settings(BaseSettings):
     COMPANY_WORKING_START_HOUR: int = 10
     COMPANY_WORKING_END_HOUR: int = 18
     SLOT_CHECK_DURATION_MINUTES: int = 30
+    AVAILABILITY_RESOLUTION_MINUTES: int = 5
+    AVAILABILITY_CACHE_MAX_ENTRIES: int = 1024
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 300
+
+    # Changing the granule size requires clearing the `slot_locks` collection.
+    SLOT_LOCK_GRANULE_MINUTES: int = 5
+    SLOT_LOCK_ORPHAN_GRACE_SECONDS: int = 60
+    SLOT_LOCK_MAX_ATTEMPTS: int = 4
+    SLOT_LOCK_RETRY_BACKOFF_SECONDS: float = 0.01
 
     ALLOWED_FRONTEND_URLS: List[str]
 
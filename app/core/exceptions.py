@@ -30,6 +30,15 @@ class InvalidTokenException(BaseAPIException):
         )
         self.headers = {"WWW-Authenticate": "Bearer"}
 
+class AuthenticationBusyException(BaseAPIException):
+    """Raised when too many password checks are already queued, e.g. during a login storm."""
+    def __init__(self, detail="Too many login attempts are being processed. Please try again shortly."):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+        )
+        self.headers = {"Retry-After": "1"}
+
 
 # --- User & Profile Exceptions (4xx) ---
 
@@ -54,4 +63,9 @@ class InvalidDateException(BaseAPIException):
 class GoogleCalendarAPIError(BaseAPIException):
     """Raised for errors communicating with the Google Calendar API."""
     def __init__(self, detail="An error occurred with the Google Calendar service"):
-        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
\ No newline at end of file
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+
+class InvalidCalendarNotificationException(BaseAPIException):
+    """Raised when a Google Calendar push notification does not carry the expected channel token."""
+    def __init__(self, detail="Invalid calendar notification"):
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
@@ -1,24 +1,94 @@
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List
+
+from pythonjsonlogger.json import JsonFormatter
+
+from app.core.config import settings
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Puts records on a bounded queue without ever blocking the caller. When the queue
+    is full (the listener cannot keep up with the disk or stdout), records are dropped
+    and counted instead.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merges the arguments (and any traceback) into the message, so the listener never
+        # touches objects owned by the caller. The queue handler is the logger's only
+        # handler, so the record is updated in place rather than copied.
+        record.msg = record.message = self.format(record)
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """A QueueListener whose stop waits for room in a full queue instead of failing, and may be called twice."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            super().stop()
 
-log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
 
 logger = logging.getLogger("app_logger")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(settings.LOG_LEVEL.upper())
+# Records are handled once, by the listener thread; the root logger must not handle them again.
+logger.propagate = False
+
+if settings.LOG_FORMAT == "json":
+    formatter = JsonFormatter(
+        "%(asctime)s %(name)s %(levelname)s %(message)s",
+        rename_fields={"asctime": "timestamp", "levelname": "level"},
+    )
+else:
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
 
-file_handler = RotatingFileHandler("logs/app_logs.log", maxBytes=10**6, backupCount=3)
-file_handler.setLevel(logging.DEBUG)
+def build_handlers() -> List[logging.Handler]:
+    """
+    Creates the handlers the listener writes to: stdout and, unless LOG_FILE is
+    empty, a rotating log file (creating its directory).
 
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.DEBUG)
+    Returns:
+        List[logging.Handler]: The formatted handlers.
+    """
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if settings.LOG_FILE:
+        log_dir = os.path.dirname(settings.LOG_FILE)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        handlers.append(RotatingFileHandler(settings.LOG_FILE, maxBytes=10**6, backupCount=3))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
 
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
+# Logging calls on the event loop only put the record on this queue; formatting and the
+# blocking file and stdout writes happen on the listener's thread.
+log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+queue_handler = DroppingQueueHandler(log_queue)
+logger.addHandler(queue_handler)
 
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
\ No newline at end of file
+log_listener = DrainingQueueListener(log_queue, *build_handlers(), respect_handler_level=True)
+log_listener.start()
+# Flushes the records still queued when the process exits.
+atexit.register(log_listener.stop)
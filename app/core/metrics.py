@@ -0,0 +1,111 @@
+# In-process request metrics, exported in the Prometheus text format
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple, Union
+
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS_BYTES = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    """A fixed-bucket histogram; each bucket counts the observations up to its upper bound."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        # One count per bucket, plus the implicit +Inf bucket.
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        """Returns (upper bound, observations <= bound) pairs, ending with "+Inf"."""
+        pairs, total = [], 0
+        for bound, count in zip([*(f"{b:g}" for b in self.buckets), "+Inf"], self._counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+SeriesKey = Tuple[str, str, str]
+
+
+class HttpMetrics:
+    """
+    Per-route histograms of HTTP requests, keyed by (method, route template, status):
+    time to the first response byte, total duration (until the last byte of a stream)
+    and response size.
+
+    Routes are labelled by their template (e.g. "/api/chat/stream"), never by the raw
+    path, so the number of series stays bounded.
+    """
+
+    _HISTOGRAMS = {
+        "http_request_ttfb_seconds": ("Time from receiving the request to the first response body byte.", LATENCY_BUCKETS_SECONDS),
+        "http_request_duration_seconds": ("Time from receiving the request to the last response byte.", LATENCY_BUCKETS_SECONDS),
+        "http_response_size_bytes": ("Response body size.", SIZE_BUCKETS_BYTES),
+    }
+
+    def __init__(self):
+        self._series: Dict[SeriesKey, Dict[str, Histogram]] = {}
+
+    def observe(self, method: str, route: str, status: int, ttfb: float, duration: float, bytes_sent: int) -> None:
+        key = (method, route, str(status))
+        histograms = self._series.get(key)
+        if histograms is None:
+            histograms = {name: Histogram(buckets) for name, (_, buckets) in self._HISTOGRAMS.items()}
+            self._series[key] = histograms
+        histograms["http_request_ttfb_seconds"].observe(ttfb)
+        histograms["http_request_duration_seconds"].observe(duration)
+        histograms["http_response_size_bytes"].observe(bytes_sent)
+
+    def render(self) -> str:
+        """Renders every histogram in the Prometheus text exposition format."""
+        lines = []
+        for name, (help_text, _) in self._HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route, status), histograms in sorted(self._series.items()):
+                histogram = histograms[name]
+                labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+                for bound, count in histogram.cumulative_counts():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+# A sample of a counter or gauge: its labels and its value.
+Sample = Tuple[Dict[str, str], Union[int, float]]
+
+
+def render_metric(name: str, metric_type: str, help_text: str, samples: Sequence[Sample]) -> str:
+    """
+    Renders a counter or gauge in the Prometheus text exposition format, for the
+    statistics other components keep themselves (e.g. the password hasher's queue).
+
+    Args:
+        name (str): The metric name; counters end in "_total".
+        metric_type (str): "counter" or "gauge".
+        help_text (str): The metric's description.
+        samples (Sequence[Sample]): One (labels, value) pair per series.
+
+    Returns:
+        str: The rendered lines, ending with a newline.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        series = f"{name}{{{label_text}}}" if label_text else name
+        lines.append(f"{series} {value if isinstance(value, int) else repr(float(value))}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+http_metrics = HttpMetrics()
@@ -1,10 +1,14 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable, Dict
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.exceptions import AuthenticationBusyException
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -20,6 +24,83 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a dedicated thread pool, so that each
+    100-300 ms of bcrypt work does not stall the event loop (and every open chat
+    stream with it). bcrypt releases the GIL while it hashes, so threads run it in
+    parallel without the cost of a process pool.
+
+    At most `max_pending` calls may be running or queued; further calls are rejected
+    with AuthenticationBusyException instead of piling up behind a login storm.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password")
+        self._pending = 0
+        self._rejected = 0
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise AuthenticationBusyException()
+
+        submitted = time.perf_counter()
+
+        def _timed() -> tuple:
+            started = time.perf_counter()
+            return func(*args), started - submitted, time.perf_counter() - started
+
+        self._pending += 1
+        try:
+            result, waited, ran = await asyncio.get_running_loop().run_in_executor(self._executor, _timed)
+        finally:
+            self._pending -= 1
+
+        stats = self._stats.setdefault(
+            operation, {"count": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0, "total_run_seconds": 0.0}
+        )
+        stats["count"] += 1
+        stats["total_wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+        stats["total_run_seconds"] += ran
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hashes a plain-text password off the event loop."""
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verifies a plain-text password against a hash off the event loop."""
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the current queue depth, rejected calls and per-operation wait and run times."""
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rejected": self._rejected,
+            "operations": {
+                operation: {
+                    **stats,
+                    "mean_wait_seconds": stats["total_wait_seconds"] / stats["count"],
+                    "mean_run_seconds": stats["total_run_seconds"] / stats["count"],
+                }
+                for operation, stats in self._stats.items()
+            },
+        }
+
+    def shutdown(self) -> None:
+        """Stops the thread pool, waiting for in-flight calls."""
+        self._executor.shutdown(wait=True)
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
 def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
     """
     Creates a new JWT access token.
@@ -0,0 +1,176 @@
+# OpenTelemetry tracing of agent turns
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Span
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+from app.core.config import settings
+from app.core.log_config import logger
+
+# Until configure_tracing installs a provider, this tracer hands out non-recording spans at no cost.
+tracer = trace.get_tracer("app.agent")
+
+_propagator = TraceContextTextMapPropagator()
+# The turn being served by the current task, so that nested spans (tools, calendar calls) carry its id.
+_current_turn_id: ContextVar[Optional[str]] = ContextVar("agent_turn_id", default=None)
+
+# Span attributes copied into the `trace` SSE event.
+_SUMMARY_ATTRIBUTE_PREFIXES = ("agent.", "tool.", "llm.", "calendar.")
+
+
+class TurnSpanCollector(SpanProcessor):
+    """Keeps the finished spans of the turns being watched, for the debug `trace` SSE event."""
+
+    def __init__(self):
+        self._spans: Dict[int, List[ReadableSpan]] = {}
+        self._lock = Lock()
+
+    def watch(self, trace_id: int) -> None:
+        with self._lock:
+            self._spans[trace_id] = []
+
+    def pop(self, trace_id: int) -> List[ReadableSpan]:
+        """Returns the finished spans of a turn and stops watching it."""
+        with self._lock:
+            return self._spans.pop(trace_id, [])
+
+    def on_end(self, span: ReadableSpan) -> None:
+        with self._lock:
+            spans = self._spans.get(span.context.trace_id)
+            if spans is not None:
+                spans.append(span)
+
+
+class TracingManager:
+    """Owns the tracer provider installed at startup, if tracing is enabled."""
+    provider: Optional[TracerProvider] = None
+    # Set with TRACING_EXPORTER="memory"; holds every finished span (local use only).
+    memory_exporter: Optional[InMemorySpanExporter] = None
+    collector: Optional[TurnSpanCollector] = None
+
+tracing_manager = TracingManager()
+
+def configure_tracing() -> None:
+    """
+    Installs the OpenTelemetry tracer provider. Called by the startup handler in main.py.
+
+    Spans are exported to stdout with TRACING_EXPORTER="console" and kept in memory
+    with "memory". CHAT_TRACE_EVENTS also records spans, for the `trace` SSE event.
+    With neither, tracing stays off.
+    """
+    exporter = settings.TRACING_EXPORTER
+    if not exporter and not settings.CHAT_TRACE_EVENTS:
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "booking-agent"}))
+    if exporter == "console":
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+    elif exporter == "memory":
+        tracing_manager.memory_exporter = InMemorySpanExporter()
+        provider.add_span_processor(SimpleSpanProcessor(tracing_manager.memory_exporter))
+    elif exporter:
+        logger.warning(f"Unknown TRACING_EXPORTER '{exporter}'; spans are not exported.")
+    if settings.CHAT_TRACE_EVENTS:
+        tracing_manager.collector = TurnSpanCollector()
+        provider.add_span_processor(tracing_manager.collector)
+
+    trace.set_tracer_provider(provider)
+    tracing_manager.provider = provider
+    logger.info(f"Tracing enabled (exporter: {exporter or 'none'}, trace events: {settings.CHAT_TRACE_EVENTS}).")
+
+def shutdown_tracing() -> None:
+    """Flushes and shuts down the tracer provider. Called by the shutdown handler in main.py."""
+    if tracing_manager.provider is not None:
+        tracing_manager.provider.shutdown()
+
+def turn_trace_context(turn_span: Span, turn_id: str) -> Dict[str, str]:
+    """
+    Returns the run-config entries that make the graph's node spans children of the
+    turn span: the turn id and the span's W3C `traceparent`.
+    """
+    carrier = {"turn_id": turn_id}
+    _propagator.inject(carrier, context=trace.set_span_in_context(turn_span))
+    return carrier
+
+@contextmanager
+def agent_span(name: str, config: Optional[Dict] = None, **attributes: Any) -> Iterator[Span]:
+    """
+    Starts a span for a graph node, a tool or an external call, tagged with the turn id.
+
+    A node passes its run config, whose `traceparent` makes the span a child of the
+    turn span; other spans nest under the current span. Attributes set to None are
+    left out. Exceptions are recorded on the span and re-raised.
+
+    Args:
+        name (str): The span name, e.g. "agent.call_model".
+        config (Optional[Dict]): The node's run config.
+        **attributes: Span attributes.
+    """
+    if tracing_manager.provider is None:
+        # Tracing is off: skip the context bookkeeping of a non-recording span.
+        yield trace.INVALID_SPAN
+        return
+
+    configurable = (config or {}).get("configurable", {})
+    parent = _propagator.extract(configurable) if "traceparent" in configurable else None
+    turn_id = configurable.get("turn_id") or _current_turn_id.get()
+
+    span_attributes = {key: value for key, value in attributes.items() if value is not None}
+    if turn_id:
+        span_attributes["agent.turn_id"] = turn_id
+    token = _current_turn_id.set(turn_id)
+    try:
+        with tracer.start_as_current_span(name, context=parent, attributes=span_attributes) as span:
+            yield span
+    finally:
+        _current_turn_id.reset(token)
+
+def summarize_turn(spans: List[ReadableSpan]) -> Dict[str, Any]:
+    """
+    Summarizes the finished spans of a turn: where the time went (model, tools and
+    Google Calendar) and every span in start order. Totals are summed over spans, so
+    tools that ran concurrently can add up to more than the turn's wall time.
+
+    Args:
+        spans (List[ReadableSpan]): The spans of the turn.
+
+    Returns:
+        Dict[str, Any]: Totals in milliseconds and the individual spans.
+    """
+    def duration_ms(span: ReadableSpan) -> float:
+        return round((span.end_time - span.start_time) / 1e6, 2)
+
+    calendar_ids = {span.context.span_id for span in spans if span.name.startswith("calendar.")}
+    totals = {"model_ms": 0.0, "tools_ms": 0.0, "calendar_ms": 0.0}
+    for span in spans:
+        if span.name in ("agent.call_model", "agent.summarize"):
+            totals["model_ms"] += duration_ms(span)
+        elif span.name == "agent.tool":
+            totals["tools_ms"] += duration_ms(span)
+        elif span.name.startswith("calendar.") and (span.parent is None or span.parent.span_id not in calendar_ids):
+            # Nested calendar spans (a batched call's request) are already covered by their parent.
+            totals["calendar_ms"] += duration_ms(span)
+
+    return {
+        **{key: round(value, 2) for key, value in totals.items()},
+        "spans": [
+            {
+                "name": span.name,
+                "duration_ms": duration_ms(span),
+                "status": span.status.status_code.name.lower(),
+                "attributes": {
+                    key: value for key, value in (span.attributes or {}).items()
+                    if key.startswith(_SUMMARY_ATTRIBUTE_PREFIXES)
+                },
+            }
+            for span in sorted(spans, key=lambda span: span.start_time)
+        ],
+    }
@@ -1,4 +1,8 @@
+from typing import Dict
+
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
 from app.core.config import settings
 import logging
 
@@ -12,9 +16,66 @@ class MongoManager:
     """
     client: AsyncIOMotorClient = None
     database: AsyncIOMotorDatabase = None
+    index_status: Dict[str, str] = {}
 
 db_manager = MongoManager()
 
+# Indexes the application relies on, per collection. `create_indexes` is a no-op
+# for indexes that already exist with the same specification.
+REQUIRED_INDEXES: Dict[str, list] = {
+    "events": [
+        # The range predicates of the conflict checks and availability queries. Not unique:
+        # double bookings are prevented by the slot locks, and events mirrored from Google
+        # may legitimately share their exact times with another event.
+        IndexModel([("start_time_utc", ASCENDING), ("end_time_utc", ASCENDING)], name="start_end"),
+        # list_events filters by owner and sorts by start time.
+        IndexModel([("owner_user_id", ASCENDING), ("start_time_utc", ASCENDING)], name="owner_start"),
+        # Bookings written before ids were assigned up front may still hold a null
+        # google_event_id. A sparse index still indexes explicit nulls, so uniqueness
+        # is scoped to string ids with a partial filter.
+        IndexModel(
+            [("google_event_id", ASCENDING)], name="google_event_id_unique", unique=True,
+            partialFilterExpression={"google_event_id": {"$type": "string"}},
+        ),
+        # The Google Calendar outbox worker polls for due sync jobs.
+        IndexModel(
+            [("sync.next_attempt_at", ASCENDING)], name="sync_due",
+            partialFilterExpression={"sync": {"$exists": True}},
+        ),
+    ],
+    "slot_locks": [
+        # Granule locks are looked up and released by their owning event.
+        IndexModel([("event_id", ASCENDING)], name="event_id"),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+}
+
+async def ensure_indexes(database: AsyncIOMotorDatabase) -> Dict[str, str]:
+    """
+    Idempotently creates the indexes listed in REQUIRED_INDEXES.
+
+    A failure on one index (e.g. existing duplicate data blocking a unique
+    index) is logged and reported instead of aborting startup.
+
+    Returns:
+        Dict[str, str]: The build status of each index, keyed by "collection.index_name".
+    """
+    status: Dict[str, str] = {}
+    for collection_name, index_models in REQUIRED_INDEXES.items():
+        collection = database.get_collection(collection_name)
+        for model in index_models:
+            name = f"{collection_name}.{model.document['name']}"
+            try:
+                await collection.create_indexes([model])
+                status[name] = "ready"
+                log.info(f"Index {name} is ready.")
+            except PyMongoError as e:
+                status[name] = f"failed: {e}"
+                log.error(f"Failed to ensure index {name}: {e}")
+    return status
+
 async def connect_to_mongo():
     """
     Connects to the MongoDB instance at application startup.
@@ -24,6 +85,7 @@ async def connect_to_mongo():
     db_manager.client = AsyncIOMotorClient(settings.MONGO_URI)
     db_manager.database = db_manager.client.get_database(settings.DATABASE_NAME)
     log.info("Successfully connected to MongoDB.")
+    db_manager.index_status = await ensure_indexes(db_manager.database)
 
 async def close_mongo_connection():
     """
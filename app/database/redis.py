@@ -1 +1,36 @@
-# Redis for caching/sessions (optional)
\ No newline at end of file
+# Redis for caching/sessions (optional)
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.log_config import logger
+
+
+class RedisManager:
+    """
+    Holds the shared Redis client. It stays None unless REDIS_URL is set, and every
+    user of Redis must then fall back to working without it.
+    """
+    client: Optional[aioredis.Redis] = None
+
+redis_manager = RedisManager()
+
+async def connect_to_redis():
+    """Connects to Redis at application startup, if REDIS_URL is configured."""
+    if not settings.REDIS_URL:
+        return
+    logger.info("Connecting to Redis...")
+    redis_manager.client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    logger.info("Successfully connected to Redis.")
+
+async def close_redis_connection():
+    """Closes the Redis connection at application shutdown."""
+    if redis_manager.client is not None:
+        logger.info("Closing Redis connection...")
+        await redis_manager.client.aclose()
+        redis_manager.client = None
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """Returns the shared Redis client, or None if Redis is not configured."""
+    return redis_manager.client
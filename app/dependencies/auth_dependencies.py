@@ -7,7 +7,8 @@ from datetime import datetime
 from app.core.config import settings
 from app.core.exceptions import InvalidTokenException, UserNotFoundException
 from app.database.mongodb import get_db
-from app.schemas.user import UserInDB, UserBase
+from app.schemas.user import UserPublic, UserBase
+from app.services.user_cache import user_cache
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -15,12 +16,12 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncIOMotorClient = Depends(get_db)
-) -> UserInDB:
+) -> UserPublic:
     """
     Dependency to get the current user from a JWT token.
 
     Verifies the token, decodes its payload, and retrieves the user
-    from the database.
+    from the user cache, or from the database on a miss.
 
     Raises:
         InvalidTokenException: If the token is invalid or expired.
@@ -37,11 +38,18 @@ async def get_current_user(
     except JWTError:
         raise InvalidTokenException()
 
-    user_doc = await db.users.find_one({"email": email})
+    user = await user_cache.get(email)
+    if user is not None:
+        return user
+
+    cache_version = user_cache.version()
+    user_doc = await db.users.find_one({"email": email}, {"hashed_password": 0})
 
     if user_doc is None:
         raise UserNotFoundException(detail="User from token not found")
 
-    return UserInDB(**user_doc)
+    user = UserPublic(**user_doc)
+    await user_cache.set(user, cache_version)
+    return user
 
 
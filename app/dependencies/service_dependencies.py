@@ -4,7 +4,7 @@ from functools import lru_cache
 
 from app.database.mongodb import get_db
 from app.services.auth_service import AuthService
-from app.services.calendar_service import CalendarService
+from app.services.calendar_service import CalendarService, calendar_service_instance
 from app.services.chat_service import ChatService
 from app.services.user_service import UserService
 
@@ -43,5 +43,8 @@ class ServiceProvider:
     
     @lru_cache(maxsize=None)
     def get_calendar_service(self) -> CalendarService:
-        """Returns a singleton instance of the CalendarService for the current request."""
-        return CalendarService()
\ No newline at end of file
+        """
+        Returns the process-wide CalendarService, which owns the calendar thread pool
+        and must not be re-created per request.
+        """
+        return calendar_service_instance
\ No newline at end of file
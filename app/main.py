@@ -4,31 +4,58 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.agent.checkpointer import close_checkpointer, open_checkpointer
 from app.core.config import settings
 from app.core.error_handler import custom_exception_handler
 from app.core.exceptions import BaseAPIException
 from app.core.log_config import logger
+from app.core.security import password_hasher
+from app.core.tracing import configure_tracing, shutdown_tracing
 
 from app.database.mongodb import connect_to_mongo, close_mongo_connection
+from app.database.redis import connect_to_redis, close_redis_connection
 from app.middleware.timing_middleware import TimingMiddleware
+from app.services.calendar_mirror import calendar_mirror
+from app.services.calendar_service import calendar_service_instance
+from app.services.calendar_sync_worker import calendar_sync_worker
+from app.services.calendar_watch_service import calendar_watch_service
 
 from app.api import auth as auth_router
 from app.api import user as user_router
 from app.api import chat as chat_router
+from app.api import calendar_webhook as calendar_webhook_router
+from app.api import metrics as metrics_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Manages application startup and shutdown events.
-    - Connects to MongoDB on startup.
-    - Closes MongoDB connection on shutdown.
+    - Enables tracing (if configured), connects to MongoDB (and Redis, if configured), opens the
+      conversation checkpointer and starts the Google Calendar sync worker, mirror and
+      push-notification channel renewal on startup.
+    - Stops them, closes the checkpointer, the MongoDB and Redis connections and the calendar
+      and password hashing thread pools, and flushes pending spans on shutdown.
     """
     logger.info("Application startup...") 
+    configure_tracing()
     await connect_to_mongo()
+    await connect_to_redis()
+    await open_checkpointer()
+    calendar_sync_worker.start()
+    calendar_mirror.start()
+    calendar_watch_service.start()
     yield
     logger.info("Application shutdown...")
+    await calendar_watch_service.stop()
+    await calendar_mirror.stop()
+    await calendar_sync_worker.stop()
+    await close_checkpointer()
     await close_mongo_connection()
+    await close_redis_connection()
+    calendar_service_instance.shutdown()
+    password_hasher.shutdown()
+    shutdown_tracing()
 
 app = FastAPI(
     title="AI Booking Agent API",
@@ -53,6 +80,9 @@ logger.info("Attaching API routers...")
 app.include_router(auth_router.router, prefix="/api")
 app.include_router(user_router.router, prefix="/api")
 app.include_router(chat_router.router, prefix="/api")
+app.include_router(calendar_webhook_router.router, prefix="/api")
+# Served at the root, where Prometheus scrapes by default.
+app.include_router(metrics_router.router)
 
 @app.get("/", tags=["Health Check"])
 async def read_root():
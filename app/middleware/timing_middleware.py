@@ -1,27 +1,81 @@
+import random
 import time
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
 from app.core.log_config import logger
+from app.core.metrics import http_metrics
+
+# Clients can send any token as the method; anything else shares one label so it cannot grow the metrics.
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"})
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware that measures every HTTP request: the time to the first
+    response body byte, the total duration until the response (or stream) is
+    complete, and the number of body bytes sent.
+
+    Unlike a BaseHTTPMiddleware it does not wrap the response in another task and
+    stream, so streaming responses such as `/api/chat/stream` pass through untouched.
 
-class TimingMiddleware(BaseHTTPMiddleware):
-    """Middleware to measure the time taken for each request."""
+    Every request is recorded in the metrics; only a LOG_REQUEST_SAMPLE_RATE share of
+    successful requests is logged, while failed ones are always logged.
+    """
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Intercepts the request to measure the elapsed time and logs it.
+        Forwards the request, observing the response messages as they are sent.
 
         Args:
-            request (Request): The incoming HTTP request.
-            call_next: The next middleware or endpoint to call.
-
-        Returns:
-            Response: The HTTP response.
+            scope (Scope): The ASGI connection scope.
+            receive (Receive): The ASGI receive channel.
+            send (Send): The ASGI send channel.
         """
-        start_time = time.time()
-        
-        response = await call_next(request)
-        
-        elapsed_time = time.time() - start_time
-        logger.info(f"Request to {request.url.path} took {elapsed_time:.4f} seconds.")
-        
-        return response
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        first_byte_time = None
+        status_code = 500
+        bytes_sent = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal first_byte_time, status_code, bytes_sent
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if body and first_byte_time is None:
+                    first_byte_time = time.perf_counter()
+                bytes_sent += len(body)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_time = time.perf_counter()
+            elapsed_time = end_time - start_time
+            ttfb = (first_byte_time or end_time) - start_time
+            # The router stores the matched route in the scope; unmatched paths share one label.
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+            http_metrics.observe(method, route, status_code, ttfb, elapsed_time, bytes_sent)
+            if status_code >= 400 or random.random() < settings.LOG_REQUEST_SAMPLE_RATE:
+                logger.info(
+                    f"Request to {scope['path']} took {elapsed_time:.4f} seconds "
+                    f"(first byte after {ttfb:.4f} seconds, {bytes_sent} bytes, status {status_code}).",
+                    extra={
+                        "method": scope["method"],
+                        "route": route,
+                        "status": status_code,
+                        "duration_seconds": round(elapsed_time, 6),
+                        "ttfb_seconds": round(ttfb, 6),
+                        "bytes_sent": bytes_sent,
+                    },
+                )
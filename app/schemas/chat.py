@@ -1,9 +1,12 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class ChatRequest(BaseModel):
     """Schema for an incoming chat message."""
     input: str
+    # Continues a server-side conversation; omit it to start a new one.
+    thread_id: Optional[str] = None
+    # Only used to seed a new thread; ignored when `thread_id` is given.
     history: List[Dict] = []
 
 class ChatResponse(BaseModel):
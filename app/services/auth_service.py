@@ -2,7 +2,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo.errors import DuplicateKeyError
 
 from app.core.exceptions import InvalidCredentialsException, UserAlreadyExistsException
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import create_access_token, password_hasher
 from app.schemas.user import UserCreate, UserInDB
 
 class AuthService:
@@ -24,8 +24,9 @@ class AuthService:
 
         Raises:
             UserAlreadyExistsException: If a user with the same email already exists.
+            AuthenticationBusyException: If too many password hashes are already queued.
         """
-        hashed_password = get_password_hash(user_create.password)
+        hashed_password = await password_hasher.hash(user_create.password)
         user_doc = user_create.model_dump(exclude={"password"})
         user_doc["hashed_password"] = hashed_password
         
@@ -50,13 +51,14 @@ class AuthService:
 
         Raises:
             InvalidCredentialsException: If the email or password is incorrect.
+            AuthenticationBusyException: If too many password checks are already queued.
         """
         user_doc = await self.collection.find_one({"email": email})
         if not user_doc:
             raise InvalidCredentialsException()
 
         user = UserInDB(**user_doc)
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             raise InvalidCredentialsException()
             
         return user
@@ -0,0 +1,236 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Set
+
+import pytz
+from googleapiclient.errors import HttpError
+from pymongo.errors import DuplicateKeyError
+
+from app.agent.utils.availability_cache import availability_cache
+from app.core.config import settings
+from app.core.log_config import logger
+from app.database.mongodb import get_db
+from app.services.calendar_service import CalendarService, calendar_service_instance
+from app.services.slot_reservation_service import SlotReservationService
+
+
+def _parse_event_time(value: Dict) -> datetime:
+    """Converts a Google Calendar start/end object to an aware UTC datetime."""
+    if "dateTime" in value:
+        return datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00")).astimezone(pytz.UTC)
+    # All-day events block the whole day in their own timezone.
+    event_tz = pytz.timezone(value.get("timeZone") or settings.COMPANY_TIMEZONE)
+    midnight = datetime.combine(date.fromisoformat(value["date"]), datetime.min.time())
+    return event_tz.localize(midnight).astimezone(pytz.UTC)
+
+
+class CalendarMirror:
+    """
+    Keeps the `events` collection in step with the Google Calendar.
+
+    A full sync lists every event from CALENDAR_MIRROR_LOOKBACK_DAYS ago onwards and
+    stores the `nextSyncToken` Google returns in the `sync_state` collection. Each
+    following sync only pulls the changes made since that token (including deletions),
+    so steady-state syncs cost a single, usually empty, `events.list` call. An expired
+    token (410 Gone) falls back to a full sync.
+
+    Events created outside the app are stored with `owner_user_id: None`, so they block
+    availability but cannot be changed through the agent. Events with a pending outbox
+    job are skipped: the local state is newer and will be pushed to Google.
+    """
+
+    def __init__(self, calendar_service: CalendarService):
+        self.calendar_service = calendar_service
+        self._wakeup = asyncio.Event()
+        self._sync_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts the periodic sync loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the periodic sync loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self) -> None:
+        """Requests a sync as soon as possible instead of waiting for the next interval."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        logger.info("Calendar mirror started.")
+        while True:
+            # Cleared before syncing, so a notification that arrives mid-sync triggers another one.
+            self._wakeup.clear()
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Calendar mirror sync failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.CALENDAR_MIRROR_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def _state_id(self) -> str:
+        return f"calendar_mirror:{settings.CALENDAR_ID}"
+
+    async def sync(self) -> Dict[str, int]:
+        """
+        Pulls the changes since the last sync into the `events` collection.
+
+        Returns:
+            Dict[str, int]: How many events were updated, deleted or left unchanged.
+        """
+        async with self._sync_lock:
+            state = await get_db().get_collection("sync_state").find_one({"_id": self._state_id()})
+            sync_token = (state or {}).get("sync_token")
+            if sync_token:
+                try:
+                    return await self._pull(sync_token)
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    logger.warning("Calendar sync token expired, running a full resync.")
+            return await self._pull(None)
+
+    async def _pull(self, sync_token: Optional[str]) -> Dict[str, int]:
+        full_sync = sync_token is None
+        time_min = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(days=settings.CALENDAR_MIRROR_LOOKBACK_DAYS)
+        # Incremental requests must repeat the parameters of the full sync, except the time bound.
+        params = {"singleEvents": True, "showDeleted": True, "maxResults": settings.CALENDAR_MIRROR_PAGE_SIZE}
+        if full_sync:
+            params["timeMin"] = time_min.isoformat()
+        else:
+            params["syncToken"] = sync_token
+
+        counts = {"updated": 0, "deleted": 0, "unchanged": 0}
+        seen: Set[str] = set()
+        page_token = None
+        while True:
+            page = await self.calendar_service.list_events(**params, **({"pageToken": page_token} if page_token else {}))
+            for item in page.get("items", []):
+                seen.add(item["id"])
+                counts[await self._apply(item)] += 1
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+
+        if full_sync:
+            counts["deleted"] += await self._remove_unseen(seen, time_min)
+
+        await get_db().get_collection("sync_state").update_one(
+            {"_id": self._state_id()},
+            {"$set": {"sync_token": page.get("nextSyncToken"), "synced_at": datetime.utcnow(), "full_sync": full_sync}},
+            upsert=True,
+        )
+        logger.info(f"Calendar mirror {'full' if full_sync else 'incremental'} sync: {counts}")
+        return counts
+
+    async def _apply(self, item: Dict) -> str:
+        """Applies one changed Google event to the local collection and returns what happened to it."""
+        db = get_db()
+        events_collection = db.get_collection("events")
+        existing = await events_collection.find_one({"google_event_id": item["id"]})
+        if existing is not None and "sync" in existing:
+            return "unchanged"
+
+        if item.get("status") == "cancelled":
+            if existing is None:
+                return "unchanged"
+            return "deleted" if await self._remove(existing) else "unchanged"
+
+        if existing is not None and existing.get("google_updated") and existing["google_updated"] >= item.get("updated", ""):
+            return "unchanged"
+
+        start_utc = _parse_event_time(item["start"])
+        end_utc = _parse_event_time(item["end"])
+        fields = {
+            "title": item.get("summary"),
+            "description": item.get("description"),
+            "start_time_utc": start_utc,
+            "end_time_utc": end_utc,
+            "attendees": [attendee["email"] for attendee in item.get("attendees", []) if "email" in attendee],
+            "status": "confirmed",
+            "google_updated": item.get("updated"),
+            "mirrored_at": datetime.utcnow(),
+        }
+
+        if existing is None:
+            try:
+                await events_collection.insert_one({
+                    **fields,
+                    "google_event_id": item["id"],
+                    "owner_user_id": None,
+                    "original_timezone": item["start"].get("timeZone") or settings.COMPANY_TIMEZONE,
+                    "created_at": datetime.utcnow(),
+                    "source": "google",
+                    "sync_version": 0,
+                })
+            except DuplicateKeyError as e:
+                # Only a google_event_id collision (e.g. a concurrent sync inserted it first) gets here.
+                logger.warning(f"Skipping Google event {item['id']}: it collides with a local event ({e}).")
+                return "unchanged"
+            availability_cache.invalidate_range(start_utc, end_utc)
+            return "updated"
+
+        original_start_utc = existing["start_time_utc"]
+        original_end_utc = existing["end_time_utc"]
+        moved = (start_utc, end_utc) != (original_start_utc.replace(tzinfo=pytz.UTC), original_end_utc.replace(tzinfo=pytz.UTC))
+        reservations = SlotReservationService(db)
+        if moved and existing.get("slot_locked"):
+            # The event was moved on Google. If its new time overlaps another booking it can no
+            # longer hold locks, and the query-based conflict checks cover it instead.
+            if not await reservations.reserve(existing["_id"], start_utc, end_utc):
+                fields["slot_locked"] = False
+
+        result = await events_collection.update_one(
+            {"_id": existing["_id"], "sync": {"$exists": False}, "sync_version": existing.get("sync_version", 0)},
+            {"$set": fields},
+        )
+        if moved and existing.get("slot_locked"):
+            if not result.matched_count:
+                await reservations.release(existing["_id"], original_start_utc, original_end_utc)
+            elif fields.get("slot_locked") is False:
+                await reservations.release(existing["_id"])
+            else:
+                await reservations.release(existing["_id"], start_utc, end_utc)
+        if not result.matched_count:
+            return "unchanged"
+
+        availability_cache.invalidate_range(original_start_utc, original_end_utc)
+        availability_cache.invalidate_range(start_utc, end_utc)
+        return "updated"
+
+    async def _remove(self, event_doc: Dict) -> bool:
+        """Deletes an event that no longer exists on Google, unless it has a pending outbox job."""
+        db = get_db()
+        result = await db.get_collection("events").delete_one({"_id": event_doc["_id"], "sync": {"$exists": False}})
+        if not result.deleted_count:
+            return False
+        await SlotReservationService(db).release(event_doc["_id"])
+        availability_cache.invalidate_range(event_doc["start_time_utc"], event_doc["end_time_utc"])
+        return True
+
+    async def _remove_unseen(self, seen: Set[str], time_min: datetime) -> int:
+        """After a full sync, deletes synced local events within the synced range that Google no longer has."""
+        cursor = get_db().get_collection("events").find({
+            "google_event_id": {"$type": "string", "$nin": list(seen)},
+            "sync": {"$exists": False},
+            "start_time_utc": {"$gte": time_min},
+        })
+        removed = 0
+        async for event_doc in cursor:
+            removed += await self._remove(event_doc)
+        return removed
+
+
+calendar_mirror = CalendarMirror(calendar_service_instance)
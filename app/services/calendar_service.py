@@ -1,22 +1,194 @@
 # in app/services/calendar_service.py
 
+import asyncio
 import base64
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin
 
+import httplib2
 from google.oauth2 import service_account
-from googleapiclient.discovery import build, Resource
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document, Resource
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import BatchHttpRequest, HttpRequest
 
 from app.core.config import settings
+from app.core.log_config import logger
+from app.core.tracing import agent_span
+
+
+class CalendarCallMetrics:
+    """Per-operation latency counters for Google Calendar calls."""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, operation: str, elapsed: float, ok: bool) -> None:
+        stats = self._stats.setdefault(
+            operation, {"count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        stats["count"] += 1
+        stats["total_seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+        if not ok:
+            stats["errors"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Returns a copy of the counters, including the mean latency per operation."""
+        return {
+            operation: {**stats, "mean_seconds": stats["total_seconds"] / stats["count"]}
+            for operation, stats in self._stats.items()
+        }
+
+
+RequestBuilder = Callable[[Resource], HttpRequest]
+
+
+class CalendarBatcher:
+    """
+    Coalesces concurrent Google Calendar calls into batch HTTP requests.
+
+    The first call submitted opens a window of `window_seconds`; every call submitted
+    before it closes (or until `max_size` calls are queued) is sent in a single
+    multipart batch request on the calendar thread pool, and each caller gets back
+    its own response or error. A window holding a single call is executed as a plain
+    request, so batching never costs more than the window itself.
+    """
+
+    def __init__(self, calendar_service: "CalendarService", window_seconds: float, max_size: int):
+        self.calendar_service = calendar_service
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._pending: List[Tuple[str, RequestBuilder, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    async def submit(self, operation: str, build_request: RequestBuilder) -> Any:
+        """Queues a call for the current batch window and waits for its result."""
+        if self.window_seconds <= 0:
+            return await self.calendar_service.execute(operation, build_request)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with agent_span("calendar.batched_request", **{"calendar.operation": operation}):
+            self._pending.append((operation, build_request, future))
+            if len(self._pending) >= self.max_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window_seconds, self._flush)
+            return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        calls, self._pending = self._pending, []
+        if calls:
+            task = asyncio.create_task(self._send(calls))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, calls: List[Tuple[str, RequestBuilder, asyncio.Future]]) -> None:
+        if len(calls) == 1:
+            operation, build_request, future = calls[0]
+            try:
+                result = await self.calendar_service.execute(operation, build_request)
+            except Exception as e:
+                _resolve(future, None, e)
+            else:
+                _resolve(future, result, None)
+            return
+
+        loop = asyncio.get_running_loop()
+        start_time = time.perf_counter()
+        try:
+            outcomes = await loop.run_in_executor(
+                self.calendar_service._executor, self._execute_batch, [build for _, build, _ in calls]
+            )
+        except Exception as e:
+            outcomes = [(None, e) for _ in calls]
+        elapsed = time.perf_counter() - start_time
+
+        metrics = self.calendar_service.metrics
+        metrics.record("batch", elapsed, all(error is None for _, error in outcomes))
+        for (operation, _, future), (response, error) in zip(calls, outcomes):
+            metrics.record(operation, elapsed, error is None)
+            _resolve(future, response, error)
+        logger.debug(f"Google Calendar batch of {len(calls)} call(s) took {elapsed:.4f} seconds.")
+
+    def _execute_batch(self, builders: List[RequestBuilder]) -> List[Tuple[Any, Optional[Exception]]]:
+        """Runs on a calendar worker thread: sends one batch request and collects each part's outcome."""
+        client = self.calendar_service.get_client()
+        outcomes: List[Tuple[Any, Optional[Exception]]] = [
+            (None, RuntimeError("No response for this request in the batch reply.")) for _ in builders
+        ]
+
+        def _on_response(request_id: str, response: Any, exception: Optional[Exception]) -> None:
+            outcomes[int(request_id)] = (response, exception)
+
+        batch = self.calendar_service.new_batch_request(client, _on_response)
+        for index, build_request in enumerate(builders):
+            batch.add(build_request(client), request_id=str(index))
+        batch.execute()
+        return outcomes
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[Exception]) -> None:
+    """Completes a caller's future unless the caller has already given up on it."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
 
 class CalendarService:
-    """A service to manage interactions with the Google Calendar API."""
+    """
+    A service to manage interactions with the Google Calendar API.
+
+    The Google client library is synchronous, so every call is executed on a
+    dedicated, bounded thread pool (one client per worker thread) and awaited
+    from the event loop. All calendar I/O should go through the async methods
+    below rather than calling `.execute()` directly.
+
+    Writes (insert, update, patch, delete) go through a `CalendarBatcher`, so
+    concurrent writes share a single HTTP round trip.
+    """
+
+    def __init__(self, max_workers: int = settings.CALENDAR_MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="calendar")
+        self._thread_clients = threading.local()
+        self.metrics = CalendarCallMetrics()
+        self.batcher = CalendarBatcher(
+            self, window_seconds=settings.CALENDAR_BATCH_WINDOW_MS / 1000, max_size=settings.CALENDAR_BATCH_MAX_SIZE
+        )
 
     @lru_cache(maxsize=1)
+    def _credentials_info(self) -> Dict:
+        """Decodes the service account credentials once per process."""
+        return json.loads(base64.b64decode(settings.GOOGLE_CREDENTIALS_BASE64))
+
+    @lru_cache(maxsize=1)
+    def _discovery_document(self) -> str:
+        """Loads the bundled Calendar v3 discovery document once per process."""
+        document = get_static_doc("calendar", "v3")
+        if document is None:
+            raise ConnectionError("The Google Calendar v3 discovery document is not bundled with googleapiclient.")
+        return document
+
     def get_client(self) -> Resource:
         """
-        Initializes and returns a singleton instance of the Google Calendar service client.
-        The client is cached to avoid re-creating it multiple times.
+        Returns the Google Calendar client owned by the calling thread, building it on first use.
+
+        httplib2 connections are not thread-safe, so each calendar worker thread gets its own
+        authorized HTTP session (with its own credentials, refreshed automatically before they
+        expire) and keeps reusing its TLS connection. The pool is therefore bounded by
+        CALENDAR_MAX_WORKERS, and the discovery document is parsed from memory, not re-fetched.
 
         Returns:
             Resource: The Google Calendar service client.
@@ -24,15 +196,127 @@ class CalendarService:
         Raises:
             ConnectionError: If the service client cannot be initialized.
         """
+        client = getattr(self._thread_clients, "client", None)
+        if client is not None:
+            return client
         try:
-            creds_info = json.loads(base64.b64decode(settings.GOOGLE_CREDENTIALS_BASE64))
-            creds = service_account.Credentials.from_service_account_info(
-                creds_info, scopes=settings.GOOGLE_CALENDAR_SCOPES
-            )
-            return build('calendar', 'v3', credentials=creds)
+            http = httplib2.Http(timeout=settings.CALENDAR_HTTP_TIMEOUT_SECONDS)
+            if settings.GOOGLE_CALENDAR_API_ENDPOINT:
+                client = build_from_document(
+                    self._discovery_document(),
+                    http=http,
+                    client_options={"api_endpoint": settings.GOOGLE_CALENDAR_API_ENDPOINT},
+                )
+            else:
+                creds = service_account.Credentials.from_service_account_info(
+                    self._credentials_info(), scopes=settings.GOOGLE_CALENDAR_SCOPES
+                )
+                client = build_from_document(self._discovery_document(), http=AuthorizedHttp(creds, http=http))
         except Exception as e:
             raise ConnectionError(f"Failed to build Google Calendar service: {e}")
+        self._thread_clients.client = client
+        return client
+
+    def new_batch_request(self, client: Resource, callback: Callable[[str, Any, Optional[Exception]], None]) -> BatchHttpRequest:
+        """
+        Returns an empty batch request for the given client.
+
+        The client's own batch URI always points at Google, so it is derived from
+        GOOGLE_CALENDAR_API_ENDPOINT when a local fake server is configured.
+        """
+        if settings.GOOGLE_CALENDAR_API_ENDPOINT:
+            return BatchHttpRequest(
+                callback=callback, batch_uri=urljoin(settings.GOOGLE_CALENDAR_API_ENDPOINT, "/batch/calendar/v3")
+            )
+        return client.new_batch_http_request(callback=callback)
+
+    async def execute(self, operation: str, build_request: RequestBuilder) -> Any:
+        """
+        Builds and executes a Google Calendar request on the calendar thread pool.
+
+        Args:
+            operation (str): Name used for latency metrics and logs (e.g. "events.insert").
+            build_request (RequestBuilder): Builds the request from a client.
+
+        Returns:
+            Any: The decoded API response.
+        """
+        def _run() -> Any:
+            return build_request(self.get_client()).execute()
+
+        loop = asyncio.get_running_loop()
+        start_time = time.perf_counter()
+        ok = False
+        try:
+            with agent_span("calendar.request", **{"calendar.operation": operation}):
+                result = await loop.run_in_executor(self._executor, _run)
+            ok = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self.metrics.record(operation, elapsed, ok)
+            logger.debug(f"Google Calendar {operation} took {elapsed:.4f} seconds (ok={ok}).")
+
+    async def insert_event(self, body: Dict) -> Dict:
+        """Creates an event on the configured calendar."""
+        return await self.batcher.submit(
+            "events.insert",
+            lambda client: client.events().insert(calendarId=settings.CALENDAR_ID, body=body)
+        )
+
+    async def get_event(self, event_id: str) -> Dict:
+        """Fetches a single event from the configured calendar."""
+        return await self.execute(
+            "events.get",
+            lambda client: client.events().get(calendarId=settings.CALENDAR_ID, eventId=event_id)
+        )
+
+    async def list_events(self, **params: Any) -> Dict:
+        """Fetches one page of events from the configured calendar (see `events.list` for the parameters)."""
+        return await self.execute(
+            "events.list",
+            lambda client: client.events().list(calendarId=settings.CALENDAR_ID, **params)
+        )
+
+    async def watch_events(self, body: Dict) -> Dict:
+        """Opens a push-notification channel for changes to the configured calendar's events."""
+        return await self.execute(
+            "events.watch",
+            lambda client: client.events().watch(calendarId=settings.CALENDAR_ID, body=body)
+        )
+
+    async def stop_channel(self, channel_id: str, resource_id: str) -> None:
+        """Closes a push-notification channel."""
+        await self.execute(
+            "channels.stop",
+            lambda client: client.channels().stop(body={"id": channel_id, "resourceId": resource_id})
+        )
+
+    async def update_event(self, event_id: str, body: Dict) -> Dict:
+        """Replaces an event on the configured calendar."""
+        return await self.batcher.submit(
+            "events.update",
+            lambda client: client.events().update(calendarId=settings.CALENDAR_ID, eventId=event_id, body=body)
+        )
+
+    async def patch_event(self, event_id: str, body: Dict) -> Dict:
+        """Updates only the given fields of an event on the configured calendar."""
+        return await self.batcher.submit(
+            "events.patch",
+            lambda client: client.events().patch(calendarId=settings.CALENDAR_ID, eventId=event_id, body=body)
+        )
+
+    async def delete_event(self, event_id: str) -> None:
+        """Deletes an event from the configured calendar."""
+        await self.batcher.submit(
+            "events.delete",
+            lambda client: client.events().delete(calendarId=settings.CALENDAR_ID, eventId=event_id)
+        )
+
+    def shutdown(self) -> None:
+        """Stops the calendar thread pool, waiting for in-flight calls."""
+        self._executor.shutdown(wait=True)
 
 # We can keep a singleton instance available for easy use if needed,
 # but the primary access should be through the ServiceProvider.
-calendar_service_instance = CalendarService()
\ No newline at end of file
+calendar_service_instance = CalendarService()
@@ -0,0 +1,248 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import pytz
+from googleapiclient.errors import HttpError
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.core.log_config import logger
+from app.database.mongodb import get_db
+from app.services.calendar_service import CalendarService, calendar_service_instance
+
+
+def new_sync_job(op: str) -> Dict:
+    """
+    Returns the outbox fields for an event that must be pushed to Google Calendar.
+
+    Args:
+        op (str): "create" for events that do not exist on Google yet, "delete" for deleted
+            bookings, otherwise "update".
+    """
+    return {"op": op, "attempts": 0, "next_attempt_at": datetime.utcnow(), "locked_until": None, "last_error": None}
+
+
+def build_google_event_body(event_doc: Dict) -> Dict:
+    """Builds the Google Calendar representation of a local event document."""
+    event_tz = pytz.timezone(event_doc.get("original_timezone") or "UTC")
+    start_local = event_doc["start_time_utc"].replace(tzinfo=pytz.UTC).astimezone(event_tz)
+    end_local = event_doc["end_time_utc"].replace(tzinfo=pytz.UTC).astimezone(event_tz)
+    return {
+        "summary": event_doc.get("title"),
+        "description": event_doc.get("description"),
+        "start": {"dateTime": start_local.isoformat(), "timeZone": event_tz.zone},
+        "end": {"dateTime": end_local.isoformat(), "timeZone": event_tz.zone},
+    }
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Rate limits, server errors and transport failures are retried; other API errors are not."""
+    if isinstance(error, HttpError):
+        return error.resp.status == 429 or error.resp.status >= 500
+    return True
+
+
+class CalendarSyncWorker:
+    """
+    Drains the Google Calendar outbox stored on the `events` collection.
+
+    The local write is the commit point of a booking: the booking tools store the event
+    with a `sync` sub-document describing the pending Google operation and return
+    immediately. This worker claims due jobs with a lease, pushes the event's current
+    state to Google and clears the job. Failures are retried with exponential backoff
+    and jitter; jobs that fail permanently are marked `status: "sync_failed"` and keep
+    their local booking.
+
+    Deleted bookings stay in the collection as `deleted: True` tombstones carrying a
+    "delete" job (every availability and listing query skips them); the document is
+    removed once the event is gone from Google.
+
+    Pushes are idempotent: new events are inserted under their pre-assigned
+    `google_event_id` (an insert that hits 409 is turned into a patch), and updates
+    always send the full current state rather than a diff. Every local write bumps
+    `sync_version`, so a job is only cleared if the event did not change while it was
+    being pushed.
+    """
+
+    def __init__(self, calendar_service: CalendarService):
+        self.calendar_service = calendar_service
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts the background drain loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the drain loop. Unfinished jobs stay in the outbox for the next start."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self) -> None:
+        """Wakes the worker up after a new job was written."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        logger.info("Calendar sync worker started.")
+        while True:
+            try:
+                processed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Calendar sync worker iteration failed: {e}")
+                processed = 0
+
+            if not processed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.CALENDAR_SYNC_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def drain_once(self) -> int:
+        """
+        Claims up to CALENDAR_SYNC_BATCH_SIZE due jobs and pushes them concurrently.
+
+        Returns:
+            int: The number of jobs processed.
+        """
+        jobs = []
+        for _ in range(settings.CALENDAR_SYNC_BATCH_SIZE):
+            job = await self._claim_next()
+            if job is None:
+                break
+            jobs.append(job)
+        if jobs:
+            await asyncio.gather(*(self._process(job) for job in jobs))
+        return len(jobs)
+
+    async def _claim_next(self) -> Optional[Dict]:
+        """Atomically leases the most overdue job, so concurrent workers never push the same event twice."""
+        now = datetime.utcnow()
+        return await get_db().get_collection("events").find_one_and_update(
+            {
+                "sync": {"$exists": True},
+                "status": {"$ne": "sync_failed"},
+                "sync.next_attempt_at": {"$lte": now},
+                "$or": [{"sync.locked_until": None}, {"sync.locked_until": {"$lt": now}}],
+            },
+            {"$set": {"sync.locked_until": now + timedelta(seconds=settings.CALENDAR_SYNC_LEASE_SECONDS)}},
+            sort=[("sync.next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _process(self, event_doc: Dict) -> None:
+        events_collection = get_db().get_collection("events")
+        job = event_doc["sync"]
+        google_event_id = event_doc["google_event_id"]
+        body = build_google_event_body(event_doc)
+
+        try:
+            if job["op"] == "delete":
+                try:
+                    await self.calendar_service.delete_event(google_event_id)
+                except HttpError as e:
+                    # Never created, or already deleted on Google's side.
+                    if e.resp.status not in [404, 410]:
+                        raise
+            elif job["op"] == "create":
+                try:
+                    await self.calendar_service.insert_event({**body, "id": google_event_id})
+                except HttpError as e:
+                    # Already created by an earlier attempt whose acknowledgement was lost.
+                    if e.resp.status != 409:
+                        raise
+                    await self.calendar_service.patch_event(google_event_id, body)
+            else:
+                await self.calendar_service.patch_event(google_event_id, body)
+        except Exception as e:
+            await self._record_failure(event_doc, e)
+            return
+
+        if job["op"] == "delete":
+            # A tombstone is never written again, so the version cannot have changed.
+            await events_collection.delete_one({"_id": event_doc["_id"], "deleted": True})
+            return
+
+        result = await events_collection.update_one(
+            {"_id": event_doc["_id"], "sync_version": event_doc.get("sync_version", 0)},
+            {"$set": {"status": "confirmed", "synced_at": datetime.utcnow()}, "$unset": {"sync": ""}},
+        )
+        if result.matched_count:
+            return
+
+        if await events_collection.find_one({"_id": event_doc["_id"]}, {"_id": 1}) is None:
+            # The booking was deleted, and its delete job already ran, while it was being pushed; remove what we just created.
+            try:
+                await self.calendar_service.delete_event(google_event_id)
+            except HttpError as e:
+                if e.resp.status not in [404, 410]:
+                    logger.error(f"Failed to remove calendar event {google_event_id} of a deleted booking: {e}")
+            return
+
+        # The event changed while it was being pushed: it now exists on Google, so push the newer state as an
+        # update. A booking deleted meanwhile already carries its delete job, which must not be replaced.
+        await events_collection.update_one(
+            {"_id": event_doc["_id"], "deleted": {"$ne": True}},
+            {"$set": {
+                "status": "confirmed",
+                "sync.op": "update",
+                "sync.attempts": 0,
+                "sync.next_attempt_at": datetime.utcnow(),
+                "sync.locked_until": None,
+            }},
+        )
+        self.notify()
+
+    async def _record_failure(self, event_doc: Dict, error: Exception) -> None:
+        events_collection = get_db().get_collection("events")
+        attempts = event_doc["sync"].get("attempts", 0) + 1
+        unchanged = {"_id": event_doc["_id"], "sync_version": event_doc.get("sync_version", 0)}
+
+        if not _is_retryable(error) or attempts >= settings.CALENDAR_SYNC_MAX_ATTEMPTS:
+            logger.error(f"Giving up syncing event {event_doc['_id']} to Google Calendar after {attempts} attempt(s): {error}")
+            result = await events_collection.update_one(
+                unchanged,
+                {"$set": {"status": "sync_failed", "sync.attempts": attempts, "sync.last_error": str(error), "sync.locked_until": None}},
+            )
+            if not result.matched_count:
+                await self._release_lease(event_doc)
+            return
+
+        backoff = min(
+            settings.CALENDAR_SYNC_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1),
+            settings.CALENDAR_SYNC_BACKOFF_MAX_SECONDS,
+        )
+        backoff *= random.uniform(0.5, 1.0)
+        logger.warning(f"Syncing event {event_doc['_id']} failed (attempt {attempts}), retrying in {backoff:.1f}s: {error}")
+        result = await events_collection.update_one(
+            unchanged,
+            {"$set": {
+                "sync.attempts": attempts,
+                "sync.last_error": str(error),
+                "sync.next_attempt_at": datetime.utcnow() + timedelta(seconds=backoff),
+                "sync.locked_until": None,
+            }},
+        )
+        if not result.matched_count:
+            await self._release_lease(event_doc)
+
+    async def _release_lease(self, event_doc: Dict) -> None:
+        """Makes a job that was rewritten during its push claimable again right away."""
+        await get_db().get_collection("events").update_one(
+            {"_id": event_doc["_id"], "sync": {"$exists": True}},
+            {"$set": {"sync.locked_until": None}},
+        )
+        self.notify()
+
+
+calendar_sync_worker = CalendarSyncWorker(calendar_service_instance)
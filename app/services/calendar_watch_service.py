@@ -0,0 +1,184 @@
+import asyncio
+import hmac
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from googleapiclient.errors import HttpError
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.exceptions import InvalidCalendarNotificationException
+from app.core.log_config import logger
+from app.database.mongodb import get_db
+from app.services.calendar_mirror import CalendarMirror, calendar_mirror
+from app.services.calendar_service import CalendarService, calendar_service_instance
+
+# Retry delay after a failed renewal, and the lease a process holds while renewing.
+_RENEW_RETRY_SECONDS = 60
+_RENEW_LEASE = timedelta(minutes=5)
+
+
+class CalendarWatchService:
+    """
+    Keeps a Google Calendar push-notification channel open and turns its notifications
+    into incremental mirror syncs.
+
+    Channels expire after CALENDAR_WATCH_TTL_SECONDS (or earlier, at Google's discretion).
+    The renewal loop opens a replacement CALENDAR_WATCH_RENEW_BEFORE_SECONDS before the
+    current channel expires and only then closes the old one, so changes are never left
+    unnotified. The channel is stored in the `sync_state` collection so that every app
+    process and the webhook agree on it, and a lease on that document ensures only one
+    process renews it.
+    """
+
+    def __init__(self, calendar_service: CalendarService, mirror: CalendarMirror):
+        self.calendar_service = calendar_service
+        self.mirror = mirror
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts the channel renewal loop if a webhook URL and token are configured."""
+        if not settings.CALENDAR_WEBHOOK_URL:
+            logger.info("CALENDAR_WEBHOOK_URL is not set; calendar push notifications are disabled.")
+            return
+        if not settings.CALENDAR_WEBHOOK_TOKEN:
+            # The webhook rejects notifications without the channel token, so a channel opened
+            # without one would only deliver notifications that are thrown away.
+            logger.error("CALENDAR_WEBHOOK_URL is set but CALENDAR_WEBHOOK_TOKEN is not; calendar push notifications are disabled.")
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the renewal loop. The open channel is kept, so it keeps working across restarts."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _state_id(self) -> str:
+        return f"calendar_watch:{settings.CALENDAR_ID}"
+
+    async def _run(self) -> None:
+        logger.info("Calendar watch renewal started.")
+        while True:
+            try:
+                delay = await self.renew_if_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to renew the calendar watch channel: {e}")
+                delay = _RENEW_RETRY_SECONDS
+            await asyncio.sleep(delay)
+
+    async def renew_if_due(self) -> float:
+        """
+        Opens a new channel if the current one is missing or about to expire.
+
+        Returns:
+            float: Seconds until the channel should be checked again.
+        """
+        state_collection = get_db().get_collection("sync_state")
+        now = datetime.utcnow()
+        renew_before = timedelta(seconds=settings.CALENDAR_WATCH_RENEW_BEFORE_SECONDS)
+        try:
+            previous = await state_collection.find_one_and_update(
+                {
+                    "_id": self._state_id(),
+                    "$and": [
+                        {"$or": [{"expiration": {"$exists": False}}, {"expiration": {"$lte": now + renew_before}}]},
+                        {"$or": [{"lease_until": {"$exists": False}}, {"lease_until": {"$lt": now}}]},
+                    ],
+                },
+                {"$set": {"lease_until": now + _RENEW_LEASE}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # Not due yet, or another process is renewing it right now.
+            current = await state_collection.find_one({"_id": self._state_id()}) or {}
+            return self._seconds_until_renewal(current.get("expiration"))
+
+        channel_id = uuid.uuid4().hex
+        try:
+            response = await self.calendar_service.watch_events({
+                "id": channel_id,
+                "type": "web_hook",
+                "address": settings.CALENDAR_WEBHOOK_URL,
+                "token": settings.CALENDAR_WEBHOOK_TOKEN,
+                "params": {"ttl": str(settings.CALENDAR_WATCH_TTL_SECONDS)},
+            })
+        except Exception:
+            await state_collection.update_one({"_id": self._state_id()}, {"$unset": {"lease_until": ""}})
+            raise
+
+        expiration = datetime.utcfromtimestamp(int(response["expiration"]) / 1000)
+        previous = previous or {}
+        await state_collection.update_one(
+            {"_id": self._state_id()},
+            {
+                "$set": {
+                    "channel_id": channel_id,
+                    "resource_id": response["resourceId"],
+                    "expiration": expiration,
+                    "previous_channel_id": previous.get("channel_id"),
+                },
+                "$unset": {"lease_until": ""},
+            },
+        )
+        logger.info(f"Opened calendar watch channel {channel_id}, expiring at {expiration.isoformat()}Z.")
+
+        if previous.get("channel_id"):
+            try:
+                await self.calendar_service.stop_channel(previous["channel_id"], previous["resource_id"])
+            except HttpError as e:
+                if e.resp.status != 404:
+                    logger.warning(f"Failed to stop calendar watch channel {previous['channel_id']}: {e}")
+
+        # Catch up on changes made while no channel was open.
+        self.mirror.notify()
+        return self._seconds_until_renewal(expiration)
+
+    def _seconds_until_renewal(self, expiration: Optional[datetime]) -> float:
+        if expiration is None:
+            return _RENEW_RETRY_SECONDS
+        renew_at = expiration - timedelta(seconds=settings.CALENDAR_WATCH_RENEW_BEFORE_SECONDS)
+        return max((renew_at - datetime.utcnow()).total_seconds(), _RENEW_RETRY_SECONDS)
+
+    async def handle_notification(self, channel_id: str, channel_token: Optional[str], resource_state: str) -> bool:
+        """
+        Handles a push notification from Google.
+
+        Notifications only say that something changed, so any change triggers an
+        incremental mirror sync, which also invalidates the affected availability.
+        Bursts of notifications are coalesced into one sync by the mirror.
+
+        Returns:
+            bool: True if a sync was requested.
+
+        Raises:
+            InvalidCalendarNotificationException: If the channel token does not match.
+        """
+        expected_token = settings.CALENDAR_WEBHOOK_TOKEN
+        if not expected_token or not hmac.compare_digest((channel_token or "").encode(), expected_token.encode()):
+            raise InvalidCalendarNotificationException()
+
+        state = await get_db().get_collection("sync_state").find_one({"_id": self._state_id()})
+        if state and channel_id not in (state.get("channel_id"), state.get("previous_channel_id")):
+            logger.debug(f"Ignoring notification from unknown calendar watch channel {channel_id}.")
+            return False
+
+        # "sync" is the handshake sent when a channel is opened; it carries no change.
+        if resource_state == "sync":
+            return False
+
+        self.mirror.notify()
+        return True
+
+
+calendar_watch_service = CalendarWatchService(calendar_service_instance, calendar_mirror)
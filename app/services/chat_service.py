@@ -1,18 +1,24 @@
 import json
+import time
+import uuid
 from typing import AsyncGenerator, Dict, Any, List, Set
 
 from langchain_core.messages import (
     BaseMessage,
-    SystemMessage,
     HumanMessage,
     AIMessage,
     ToolMessage
 )
+from opentelemetry.trace import StatusCode
 
-from app.agent.graph import agent_app, AgentState
+from app.agent.graph import get_agent_app, AgentState
 from app.agent.prompts.system_prompts import get_system_prompt
+from app.agent.utils.context_window import message_text
+from app.agent.utils.intent_router import turn_metrics
+from app.core.config import settings
+from app.core.tracing import summarize_turn, tracer, tracing_manager, turn_trace_context
 from app.schemas.chat import ChatRequest
-from app.schemas.user import UserInDB
+from app.schemas.user import UserPublic
 from app.utils.message_utils import parse_history
 
 
@@ -20,20 +26,31 @@ class ChatService:
     """Service to manage and orchestrate chat interactions with the AI agent."""
 
     def __init__(self):
-        self.agent_app = agent_app
+        self.agent_app = get_agent_app()
         self.get_system_prompt = get_system_prompt
 
     async def stream_agent_response(
-        self, request: ChatRequest, current_user: UserInDB
+        self, request: ChatRequest, current_user: UserPublic
     ) -> AsyncGenerator[str, None]:
         """
         Processes a chat request and streams the agent's formatted response.
+
+        The conversation state lives on the server, keyed by the request's thread id, so
+        only the new message is sent to the agent. A request without a thread id starts a
+        new thread (seeded with `history`, if any); its id is sent first as a `thread` event.
+
+        The turn is traced as an `agent.turn` span whose children are the graph's node,
+        tool and calendar spans. With CHAT_TRACE_EVENTS, a `trace` event summarizing them
+        is sent before the stream ends.
         """
-        system_prompt = self.get_system_prompt(current_user)
-        history = parse_history(request.history)
-        
-        messages: List[BaseMessage] = [SystemMessage(content=system_prompt)]
-        messages.extend(history)
+        thread_id = request.thread_id or uuid.uuid4().hex
+        config = {
+            "recursion_limit": 25,
+            # Scoped to the user, so a thread id cannot be used to read another user's conversation.
+            "configurable": {"thread_id": f"{current_user.id}:{thread_id}"},
+        }
+
+        messages: List[BaseMessage] = [] if request.thread_id else parse_history(request.history)
         messages.append(HumanMessage(content=request.input))
         
         initial_state: AgentState = {
@@ -43,17 +60,131 @@ class ChatService:
                 "email": current_user.email,
                 "timezone": current_user.timezone,
             },
+            "system_prompt": self.get_system_prompt(current_user),
         }
 
+        yield f"data: {json.dumps({'type': 'thread', 'thread_id': thread_id})}\n\n"
+
         seen_tool_calls: Set[str] = set()
+        started = time.perf_counter()
+        used_llm = False
+
+        turn_id = uuid.uuid4().hex
+        turn_span = tracer.start_span(
+            "agent.turn", attributes={"agent.turn_id": turn_id, "agent.thread_id": thread_id}
+        )
+        config["configurable"].update(turn_trace_context(turn_span, turn_id))
+        collector = tracing_manager.collector
+        trace_id = turn_span.get_span_context().trace_id
+        if collector is not None:
+            collector.watch(trace_id)
 
-        async for event in self.agent_app.astream(initial_state, {"recursion_limit": 25}):
-            formatted_event = self._format_stream_event(event, seen_tool_calls)
-            if formatted_event:
-                yield formatted_event
+        try:
+            if settings.CHAT_STREAM_TOKENS:
+                async for event in self.agent_app.astream_events(initial_state, config, version="v2"):
+                    used_llm = used_llm or event["event"].startswith("on_chat_model")
+                    for formatted_event in self._format_graph_event(event, seen_tool_calls):
+                        yield formatted_event
+            else:
+                async for event in self.agent_app.astream(initial_state, config):
+                    used_llm = used_llm or "agent" in event
+                    formatted_event = self._format_stream_event(event, seen_tool_calls)
+                    if formatted_event:
+                        yield formatted_event
+            turn_span.set_attribute("agent.used_llm", used_llm)
+        except Exception as e:
+            turn_span.record_exception(e)
+            turn_span.set_status(StatusCode.ERROR)
+            raise
+        finally:
+            turn_span.end()
+            turn_spans = collector.pop(trace_id) if collector is not None else None
 
+        turn_metrics.record_turn(time.perf_counter() - started, used_llm)
+        if turn_spans is not None:
+            chunk = {"type": "trace", "turn_id": turn_id, **summarize_turn(turn_spans)}
+            yield f"data: {json.dumps(chunk, default=str)}\n\n"
         yield "data: [DONE]\n\n"
 
+    def _format_graph_event(self, event: Dict[str, Any], seen_tool_calls: Set[str]) -> List[str]:
+        """
+        Formats a LangGraph `astream_events` event into SSE-compatible strings.
+
+        Text is forwarded as `token` chunks while the model is still generating.
+        Tool calls are announced with `tool_start` once the model message is complete,
+        and every result of the tools node is sent as `tool_end`. A reply of the intent
+        router is sent the same way once the router node has finished.
+
+        Args:
+            event (Dict[str, Any]): The event emitted by the graph.
+            seen_tool_calls (Set[str]): A set of tool call IDs that have already been processed.
+
+        Returns:
+            List[str]: The formatted SSE strings (empty if the event should be ignored).
+        """
+        node = event.get("metadata", {}).get("langgraph_node")
+        kind = event["event"]
+
+        if kind == "on_chat_model_stream" and node == "agent":
+            text = message_text(event["data"]["chunk"])
+            if text:
+                return [f"data: {json.dumps({'type': 'token', 'content': text})}\n\n"]
+
+        elif kind == "on_chat_model_end" and node == "agent":
+            chunks = []
+            for tool_call in getattr(event["data"]["output"], "tool_calls", None) or []:
+                tool_call_id = tool_call.get('id')
+                if tool_call_id and tool_call_id not in seen_tool_calls:
+                    seen_tool_calls.add(tool_call_id)
+                    chunk = {
+                        "type": "tool_start",
+                        "id": tool_call_id,
+                        "name": tool_call.get('name', 'unknown'),
+                        "args": tool_call.get('args', {})
+                    }
+                    chunks.append(f"data: {json.dumps(chunk)}\n\n")
+            return chunks
+
+        elif kind == "on_chain_end" and event.get("name") == "tools":
+            output = event["data"].get("output")
+            messages = output.get("messages", []) if isinstance(output, dict) else []
+            return [
+                self._format_tool_message({"messages": [message]})
+                for message in messages
+                if isinstance(message, ToolMessage)
+            ]
+
+        elif kind == "on_chain_end" and event.get("name") == "router":
+            output = event["data"].get("output")
+            return self._format_router_messages(output, seen_tool_calls)
+
+        return []
+
+    def _format_router_messages(self, value: Dict[str, Any] | None, seen_tool_calls: Set[str]) -> List[str]:
+        """
+        Formats the messages added by the intent router node: the tool call it made,
+        the tool's result and the templated reply.
+
+        Args:
+            value (Dict[str, Any] | None): The state update of the router node.
+            seen_tool_calls (Set[str]): A set of tool call IDs that have already been processed.
+
+        Returns:
+            List[str]: The formatted SSE strings (empty if the request went to the agent).
+        """
+        messages = value.get("messages", []) if isinstance(value, dict) else []
+        chunks = []
+        for message in messages:
+            if isinstance(message, ToolMessage):
+                formatted = self._format_tool_message({"messages": [message]})
+            elif isinstance(message, AIMessage):
+                formatted = self._format_ai_message({"messages": [message]}, seen_tool_calls)
+            else:
+                formatted = None
+            if formatted:
+                chunks.append(formatted)
+        return chunks
+
     def _format_stream_event(self, event: Dict[str, Any], seen_tool_calls: Set[str]) -> str | None:
         """
         Formats a single event chunk from the agent into an SSE-compatible string.
@@ -68,6 +199,8 @@ class ChatService:
         for key, value in event.items():
             if key == "agent":
                 return self._format_ai_message(value, seen_tool_calls)
+            elif key == "router":
+                return "".join(self._format_router_messages(value, seen_tool_calls)) or None
             elif key == "tools":
                 return self._format_tool_message(value)
         return None
@@ -85,8 +218,9 @@ class ChatService:
         """
         ai_message = value.get("messages", [])[-1]
         if isinstance(ai_message, AIMessage):
-            if ai_message.content:
-                chunk = {"type": "token", "content": ai_message.content}
+            text = message_text(ai_message)
+            if text:
+                chunk = {"type": "token", "content": text}
                 return f"data: {json.dumps(chunk)}\n\n"
             if hasattr(ai_message, 'tool_calls') and ai_message.tool_calls:
                 tool_call = ai_message.tool_calls[0]
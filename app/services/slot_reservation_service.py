@@ -0,0 +1,120 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class SlotReservationService:
+    """
+    Reserves calendar time atomically using per-granule lock documents.
+
+    Each booked event owns one document in the `slot_locks` collection for every
+    granule (SLOT_LOCK_GRANULE_MINUTES long) of `[start, end + buffer)`. The granule's
+    start time is the document's `_id`, so MongoDB's built-in unique `_id` index makes
+    two bookings that would violate the meeting buffer impossible: they need at least
+    one common granule, and only one insert of it can succeed. No global lock is taken;
+    bookings of unrelated slots never touch the same documents.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = self.db.get_collection("slot_locks")
+        self.events_collection = self.db.get_collection("events")
+
+    def granules_for(self, start_utc: datetime, end_utc: datetime) -> List[datetime]:
+        """
+        Returns the lock granules covering an event plus its trailing buffer.
+
+        Two events A and B are within the buffer of each other exactly when
+        `[start_A, end_A + buffer)` and `[start_B, end_B + buffer)` overlap, so only
+        the trailing side needs to be widened.
+        """
+        granule = timedelta(minutes=settings.SLOT_LOCK_GRANULE_MINUTES)
+        buffer = timedelta(minutes=settings.MEETING_BUFFER_MINUTES)
+        if start_utc.tzinfo is None: start_utc = start_utc.replace(tzinfo=timezone.utc)
+        if end_utc.tzinfo is None: end_utc = end_utc.replace(tzinfo=timezone.utc)
+
+        first = (start_utc - _EPOCH) // granule
+        last = -((_EPOCH - (end_utc + buffer)) // granule)
+        return [_EPOCH + i * granule for i in range(first, last)]
+
+    async def reserve(self, event_id: ObjectId, start_utc: datetime, end_utc: datetime) -> bool:
+        """
+        Atomically claims every granule of the range that `event_id` does not already hold.
+
+        All missing granules are inserted in a single ordered bulk write, in ascending time
+        order. The server stops at the first granule held by another event, and the granules
+        inserted by this call are removed again. Because every booking claims granules in the
+        same order, two overlapping bookings meet at their first common granule.
+
+        A failed attempt is only final if the blocking granule belongs to an event that
+        exists. If its holder is another reservation still in flight, the attempt is retried
+        after a short jittered backoff; if the holder is an orphan, its locks are reaped.
+
+        Returns:
+            bool: True if the event now holds the whole range, False if it conflicts.
+        """
+        granules = self.granules_for(start_utc, end_utc)
+        held = {
+            doc["_id"].replace(tzinfo=timezone.utc)
+            async for doc in self.collection.find({"event_id": event_id, "_id": {"$in": granules}}, {"_id": 1})
+        }
+        missing = [g for g in granules if g not in held]
+        if not missing:
+            return True
+
+        for attempt in range(settings.SLOT_LOCK_MAX_ATTEMPTS):
+            try:
+                await self.collection.insert_many(
+                    [{"_id": g, "event_id": event_id, "created_at": datetime.utcnow()} for g in missing],
+                    ordered=True
+                )
+                return True
+            except BulkWriteError as e:
+                blocked_at = missing[e.details["writeErrors"][0]["index"]]
+                await self.collection.delete_many({"event_id": event_id, "_id": {"$in": missing}})
+
+            holder = await self.collection.find_one({"_id": blocked_at})
+            if holder is None:
+                continue
+            if await self.events_collection.find_one({"_id": holder["event_id"]}, {"_id": 1}):
+                return False
+            if await self._reap_if_orphaned(holder):
+                continue
+            await asyncio.sleep(random.uniform(0, settings.SLOT_LOCK_RETRY_BACKOFF_SECONDS * 2 ** attempt))
+        return False
+
+    async def release(
+        self, event_id: ObjectId, keep_start_utc: Optional[datetime] = None, keep_end_utc: Optional[datetime] = None
+    ) -> None:
+        """
+        Releases the granules held by an event, except those covering the optional range to keep
+        (used when a reschedule is committed or rolled back).
+        """
+        query = {"event_id": event_id}
+        if keep_start_utc is not None and keep_end_utc is not None:
+            query["_id"] = {"$nin": self.granules_for(keep_start_utc, keep_end_utc)}
+        await self.collection.delete_many(query)
+
+    async def _reap_if_orphaned(self, lock_doc: dict) -> bool:
+        """
+        Removes every lock of a holder whose event was never written, e.g. after a crash
+        between reserving and inserting the event. Locks younger than the grace period are
+        left alone because their booking may still be in flight.
+
+        Returns:
+            bool: True if the holder's locks were removed and a retry is worthwhile.
+        """
+        grace_cutoff = datetime.utcnow() - timedelta(seconds=settings.SLOT_LOCK_ORPHAN_GRACE_SECONDS)
+        if lock_doc["created_at"] >= grace_cutoff:
+            return False
+        await self.collection.delete_many({"event_id": lock_doc["event_id"]})
+        return True
@@ -0,0 +1,97 @@
+import json
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.log_config import logger
+from app.database.redis import get_redis
+from app.schemas.user import UserPublic
+from app.utils.cache import TTLCache
+
+
+class UserCache:
+    """
+    Caches authenticated users by their token subject (email), so that most requests
+    are authenticated without a MongoDB round trip. Only the public profile is cached,
+    so password hashes never leave MongoDB.
+
+    Entries are kept in process and, if Redis is configured, in Redis as well, which
+    lets workers share a single lookup per user. Every write to a user document must
+    call `invalidate`. Another worker's in-process copy cannot be invalidated, so with
+    Redis it only lives for USER_CACHE_LOCAL_TTL_SECONDS.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, local_ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.local_ttl_seconds = local_ttl_seconds
+        self._local = TTLCache(max_entries, ttl_seconds)
+        # Bumped on every invalidation, so a lookup that raced with an update is never stored.
+        self._version = 0
+
+    @staticmethod
+    def _redis_key(email: str) -> str:
+        return f"user:{email}"
+
+    def _local_ttl(self) -> float:
+        return self.local_ttl_seconds if get_redis() is not None else self.ttl_seconds
+
+    def version(self) -> int:
+        """Returns the invalidation counter; capture it before reading the database."""
+        return self._version
+
+    async def get(self, email: str) -> Optional[UserPublic]:
+        """Returns the cached user, or None on a miss."""
+        user = self._local.get(email)
+        if user is not None:
+            return user
+
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(self._redis_key(email))
+        except Exception as e:
+            logger.warning(f"User cache lookup in Redis failed: {e}")
+            return None
+        if raw is None:
+            return None
+        user = UserPublic(**json.loads(raw))
+        self._local.set(email, user, ttl_seconds=self._local_ttl())
+        return user
+
+    async def set(self, user: UserPublic, version: int) -> None:
+        """Stores a user read from the database, unless it was invalidated since `version` was captured."""
+        if version != self._version:
+            return
+        self._local.set(user.email, user, ttl_seconds=self._local_ttl())
+
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(self._redis_key(user.email), user.model_dump_json(by_alias=True), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"User cache write to Redis failed: {e}")
+
+    async def invalidate(self, email: str) -> None:
+        """Drops a user after their document has changed."""
+        self._version += 1
+        self._local.pop(email)
+
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.delete(self._redis_key(email))
+        except Exception as e:
+            logger.warning(f"User cache invalidation in Redis failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the size of the in-process tier."""
+        return self._local.stats()
+
+
+user_cache = UserCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    local_ttl_seconds=settings.USER_CACHE_LOCAL_TTL_SECONDS,
+)
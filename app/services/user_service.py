@@ -2,6 +2,7 @@ from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.schemas.user import UserUpdate, UserInDB
 from app.core.exceptions import UserNotFoundException
+from app.services.user_cache import user_cache
 
 class UserService:
     """Service to handle user-related operations."""
@@ -37,5 +38,7 @@ class UserService:
 
         if not user_doc:
             raise UserNotFoundException()
-            
+
+        if update_data:
+            await user_cache.invalidate(user_doc["email"])
         return UserInDB(**user_doc)
\ No newline at end of file
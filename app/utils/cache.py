@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    A small in-process cache with least-recently-used eviction and a per-entry time-to-live.
+
+    Entries expire `ttl_seconds` after they were written. When the cache is full, the
+    least recently read or written entry is evicted. It is meant to be used from the
+    event loop, so no locking is performed.
+
+    `on_evict`, if given, is called with the key of every entry dropped because it
+    expired or was evicted (not for `pop` or `clear`).
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, on_evict: Optional[Callable[[Hashable], None]] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value, or None if it is missing or has expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            if self.on_evict is not None:
+                self.on_evict(key)
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Stores a value, evicting the least recently used entries if the cache is full.
+        `ttl_seconds` overrides the cache's time-to-live for this entry.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted_key)
+
+    def pop(self, key: Hashable) -> None:
+        """Removes a single entry if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
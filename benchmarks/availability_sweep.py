@@ -0,0 +1,110 @@
+"""
+Microbenchmark of the slot search behind find_available_slots.
+
+Times the path the tool ships (merge_busy_blocks, then one DayAvailability bitmap per
+company working day and its slot_starts) against the previous approach, which checked
+every candidate slot against every busy block with `any(...)`, and against the interval
+sweep in app/agent/utils/conflict_detector.py that the bitmap is tested against. Runs
+10 to 10,000 busy blocks over two weeks of working days; all three must return the same slots.
+
+Run from the project root:
+
+    python -m benchmarks.availability_sweep
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from app.agent.utils.availability_bitmap import DayAvailability
+from app.agent.utils.conflict_detector import Interval, find_slot_starts, merge_busy_blocks
+
+# 10:00 to 18:00 in Kolkata, for two weeks.
+FIRST_DAY_START = datetime(2026, 1, 5, 4, 30, tzinfo=timezone.utc)
+WORKING_DAY = timedelta(hours=8)
+DAYS = 14
+WORKING_WINDOWS = [
+    (FIRST_DAY_START + timedelta(days=day), FIRST_DAY_START + timedelta(days=day) + WORKING_DAY)
+    for day in range(DAYS)
+]
+DURATION = timedelta(minutes=30)
+STEP = timedelta(minutes=5)
+RESOLUTION = timedelta(minutes=5)
+BUFFER = timedelta(minutes=15)
+EVENT_COUNTS = (10, 100, 1000, 10000)
+REPEATS = 3
+
+
+def pairwise_slot_starts(blocks: List[Interval]) -> List[datetime]:
+    """The previous O(slots x events) check."""
+    slot_starts = []
+    for day_start, day_end in WORKING_WINDOWS:
+        slot_start = day_start
+        while slot_start + DURATION <= day_end:
+            if not any(slot_start < end and slot_start + DURATION > start for start, end in blocks):
+                slot_starts.append(slot_start)
+            slot_start += STEP
+    return slot_starts
+
+
+def sweep_slot_starts(blocks: List[Interval]) -> List[datetime]:
+    merged = merge_busy_blocks(blocks)
+    return [
+        slot_start
+        for day_start, day_end in WORKING_WINDOWS
+        for slot_start in find_slot_starts(merged, day_start, day_end, DURATION, STEP)
+    ]
+
+
+def bitmap_slot_starts(blocks: List[Interval]) -> List[datetime]:
+    """What find_available_slots does on a cache miss, for every day of the window."""
+    merged = merge_busy_blocks(blocks)
+    return [
+        slot_start
+        for day_start, day_end in WORKING_WINDOWS
+        for slot_start in DayAvailability.from_busy_blocks(merged, day_start, day_end, RESOLUTION).slot_starts(DURATION, STEP)
+    ]
+
+
+def busy_blocks(count: int, rng: random.Random) -> List[Interval]:
+    """Meetings spread over the working days (on the 5-minute grid), widened by the buffer."""
+    day_steps = WORKING_DAY // STEP
+    blocks = []
+    for _ in range(count):
+        day_start, _ = rng.choice(WORKING_WINDOWS)
+        start = day_start + rng.randrange(day_steps) * STEP
+        end = start + timedelta(minutes=rng.choice([5, 15, 30]))
+        blocks.append((start - BUFFER, end + BUFFER))
+    return blocks
+
+
+def best_of(func, blocks: List[Interval]) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func(blocks)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    rng = random.Random(1)
+    print(f"{'events':>8} {'pairwise ms':>12} {'sweep ms':>10} {'bitmap ms':>10} {'speedup':>8} {'slots':>6}")
+    for count in EVENT_COUNTS:
+        blocks = busy_blocks(count, rng)
+        expected = pairwise_slot_starts(blocks)
+        slots = bitmap_slot_starts(blocks)
+        assert slots == expected, f"bitmap disagrees with the pairwise check for {count} events"
+        assert sweep_slot_starts(blocks) == expected, f"sweep disagrees with the pairwise check for {count} events"
+
+        pairwise_time = best_of(pairwise_slot_starts, blocks)
+        sweep_time = best_of(sweep_slot_starts, blocks)
+        bitmap_time = best_of(bitmap_slot_starts, blocks)
+        print(
+            f"{count:>8} {pairwise_time * 1e3:>12.2f} {sweep_time * 1e3:>10.2f} {bitmap_time * 1e3:>10.2f} "
+            f"{pairwise_time / bitmap_time:>7.1f}x {len(slots):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Login storm benchmark of the password hasher in app/core/security.py.
+
+Runs a burst of simultaneous password verifications while a simulated chat stream
+emits a token every 10 ms, first with bcrypt called inline on the event loop (as the
+login endpoint used to do) and then through password_hasher, and reports how late
+the chat tokens arrive in each case. Finally it fires more logins than
+PASSWORD_HASH_MAX_PENDING allows and counts the ones turned away.
+
+Run from the project root, with the usual .env:
+
+    python -m benchmarks.login_storm --logins 40
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from app.core.config import settings
+from app.core.exceptions import AuthenticationBusyException
+from app.core.security import get_password_hash, password_hasher, verify_password
+
+PASSWORD = "correct horse battery staple"
+TOKEN_INTERVAL_SECONDS = 0.01
+
+
+async def chat_stream(stop: asyncio.Event, lags: List[float]) -> None:
+    """Emits a token every TOKEN_INTERVAL_SECONDS and records how late each one is."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TOKEN_INTERVAL_SECONDS)
+        lags.append(time.perf_counter() - started - TOKEN_INTERVAL_SECONDS)
+
+
+async def storm(mode: str, logins: int, hashed: str) -> None:
+    """Verifies `logins` passwords at once, inline or through the hasher, next to a chat stream."""
+    stop = asyncio.Event()
+    lags: List[float] = []
+    stream = asyncio.create_task(chat_stream(stop, lags))
+    await asyncio.sleep(5 * TOKEN_INTERVAL_SECONDS)
+
+    async def login() -> bool:
+        if mode == "inline":
+            return verify_password(PASSWORD, hashed)
+        return await password_hasher.verify(PASSWORD, hashed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await stream
+
+    lags.sort()
+    print(
+        f"{mode:8s} {logins} logins in {elapsed:.2f}s; chat token lag "
+        f"p50={statistics.median(lags) * 1e3:.1f}ms p99={lags[int(len(lags) * 0.99) - 1] * 1e3:.1f}ms "
+        f"max={lags[-1] * 1e3:.0f}ms"
+    )
+
+
+async def main(logins: int) -> None:
+    started = time.perf_counter()
+    hashed = get_password_hash(PASSWORD)
+    print(f"one bcrypt hash: {(time.perf_counter() - started) * 1e3:.0f}ms, {settings.PASSWORD_HASH_MAX_WORKERS} workers")
+
+    await storm("inline", logins, hashed)
+    await storm("executor", logins, hashed)
+
+    overload = password_hasher.max_pending * 2
+    results = await asyncio.gather(
+        *(password_hasher.verify(PASSWORD, hashed) for _ in range(overload)), return_exceptions=True
+    )
+    rejected = sum(isinstance(result, AuthenticationBusyException) for result in results)
+    print(f"{overload} simultaneous logins with max_pending={password_hasher.max_pending}: {rejected} rejected")
+    print(password_hasher.snapshot())
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40, help="number of simultaneous logins")
+    asyncio.run(main(parser.parse_args().logins))
@@ -0,0 +1,96 @@
+"""
+Concurrency benchmark of the slot locks in app/services/slot_reservation_service.py.
+
+Fires hundreds of simultaneous bookings of random, mostly overlapping slots in one
+working day at a scratch database on MONGO_URI, the way confirm_and_book_event does
+it (reserve the granules, then insert the event), and then checks that no two booked
+events are closer than MEETING_BUFFER_MINUTES. The scratch database is dropped afterwards.
+
+Run from the project root, with the usual .env:
+
+    python -m benchmarks.slot_reservations --bookings 500
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.slot_reservation_service import SlotReservationService
+
+DAY_START = datetime(2030, 1, 7, 4, 30, tzinfo=timezone.utc)
+SLOT_STARTS_PER_DAY = 8 * 60 // 5
+DURATIONS_MINUTES = (15, 30, 60)
+
+
+async def book(db: AsyncIOMotorDatabase, rng: random.Random, latencies: List[float]) -> bool:
+    """Books one random slot. Returns True if it was booked."""
+    reservations = SlotReservationService(db)
+    event_id = ObjectId()
+    start_utc = DAY_START + timedelta(minutes=5 * rng.randrange(SLOT_STARTS_PER_DAY))
+    end_utc = start_utc + timedelta(minutes=rng.choice(DURATIONS_MINUTES))
+
+    started = time.perf_counter()
+    booked = await reservations.reserve(event_id, start_utc, end_utc)
+    if booked:
+        await db.get_collection("events").insert_one({
+            "_id": event_id, "start_time_utc": start_utc, "end_time_utc": end_utc, "slot_locked": True,
+        })
+    latencies.append(time.perf_counter() - started)
+    return booked
+
+
+def count_overlaps(events: List[Tuple[datetime, datetime]]) -> int:
+    """Counts the pairs of events that are closer to each other than the meeting buffer."""
+    buffer = timedelta(minutes=settings.MEETING_BUFFER_MINUTES)
+    events = sorted(events)
+    overlaps = 0
+    for i, (start, end) in enumerate(events):
+        for other_start, other_end in events[i + 1:]:
+            if other_start >= end + buffer:
+                break
+            overlaps += 1
+    return overlaps
+
+
+async def main(bookings: int) -> None:
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db_name = f"{settings.DATABASE_NAME}_slot_lock_bench"
+    await client.drop_database(db_name)
+    db = client.get_database(db_name)
+    try:
+        rng = random.Random(7)
+        latencies: List[float] = []
+        started = time.perf_counter()
+        results = await asyncio.gather(*(book(db, rng, latencies) for _ in range(bookings)))
+        elapsed = time.perf_counter() - started
+
+        events = [
+            (doc["start_time_utc"], doc["end_time_utc"])
+            async for doc in db.get_collection("events").find({}, {"start_time_utc": 1, "end_time_utc": 1})
+        ]
+        latencies.sort()
+        print(f"{bookings} concurrent bookings in {elapsed:.2f}s ({bookings / elapsed:.0f} bookings/s)")
+        print(f"booked: {sum(results)}, refused: {bookings - sum(results)}")
+        print(
+            f"latency p50={statistics.median(latencies) * 1e3:.1f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1e3:.1f}ms max={latencies[-1] * 1e3:.1f}ms"
+        )
+        overlaps = count_overlaps(events)
+        print(f"overlapping pairs: {overlaps}")
+        assert overlaps == 0, "the slot locks let overlapping bookings through"
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=500, help="number of simultaneous bookings")
+    asyncio.run(main(parser.parse_args().bookings))
@@ -0,0 +1,74 @@
+import os
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+# The settings are read at import time; tests only need placeholders for the required ones.
+for name, value in {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "DATABASE_NAME": "booking_agent",
+    "CALENDAR_ID": "test-calendar",
+    "GOOGLE_CREDENTIALS_BASE64": "e30=",
+    "GOOGLE_API_KEY": "test",
+    "SERPER_API_KEY": "test",
+    "JWT_SECRET_KEY": "test",
+    "ALLOWED_FRONTEND_URLS": "[]",
+    # Test runs log to stdout only, leaving the working tree clean.
+    "LOG_FILE": "",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.database.mongodb import db_manager, ensure_indexes
+from tests.fake_calendar import FakeCalendar
+
+
+@pytest.fixture
+def fake_calendar(monkeypatch):
+    """A running fake Calendar API, with GOOGLE_CALENDAR_API_ENDPOINT pointing at it."""
+    calendar = FakeCalendar()
+    calendar.start()
+    monkeypatch.setattr(settings, "GOOGLE_CALENDAR_API_ENDPOINT", calendar.endpoint)
+    yield calendar
+    calendar.stop()
+
+
+@pytest.fixture(scope="session")
+def mongo_uri():
+    """The MongoDB server for tests, TEST_MONGO_URI or MONGO_URI. Tests using it are skipped when it is not reachable."""
+    uri = os.environ.get("TEST_MONGO_URI", settings.MONGO_URI)
+    probe = MongoClient(uri, serverSelectionTimeoutMS=1000)
+    try:
+        probe.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"MongoDB is not reachable at {uri}")
+    finally:
+        probe.close()
+    return uri
+
+
+@pytest.fixture
+def scratch_db(mongo_uri, monkeypatch):
+    """
+    Opens a throwaway database (with the application's indexes) on the `mongo_uri`
+    server, installed as the application's database.
+
+    Usage: `async with scratch_db() as db: ...`, inside the test's event loop.
+    """
+    @asynccontextmanager
+    async def open_db():
+        client = AsyncIOMotorClient(mongo_uri)
+        database = client.get_database(f"{settings.DATABASE_NAME}_test_{uuid4().hex[:8]}")
+        monkeypatch.setattr(db_manager, "database", database)
+        try:
+            await ensure_indexes(database)
+            yield database
+        finally:
+            await client.drop_database(database.name)
+            client.close()
+
+    return open_db
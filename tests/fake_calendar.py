@@ -0,0 +1,227 @@
+"""
+A local fake of the Google Calendar v3 events API, for tests that point
+GOOGLE_CALENDAR_API_ENDPOINT at it.
+
+It serves `events.list` the way Google does for sync: full listings and
+incremental diffs (including cancelled events) from a `syncToken`, paged with
+`maxResults`/`pageToken`, and 410 Gone for sync tokens that have expired.
+Events can be inserted, read, updated, patched and deleted, one request at a
+time or in a multipart batch request. Inserting an id that is already taken
+answers 409 Conflict, and API errors can be injected with `fail_next`.
+"""
+import json
+import re
+import threading
+import uuid
+from datetime import datetime, timedelta
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+_EVENTS_PATH = re.compile(r"^/calendar/v3/calendars/(?P<calendar_id>[^/]+)/events(?:/(?P<event_id>[^/]+))?$")
+_BATCH_PATH = "/batch/calendar/v3"
+_REASONS = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 409: "Conflict",
+    410: "Gone", 429: "Too Many Requests", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+_UPDATED_EPOCH = datetime(2020, 1, 1)
+
+
+class FakeCalendar:
+    """The calendar's state, and the HTTP server exposing it."""
+
+    def __init__(self):
+        self.events: Dict[str, Dict] = {}
+        # Every change as (sequence number, event id). A sync token is "<generation>:<sequence number
+        # it covers>"; expiring the tokens starts a new generation.
+        self._changes: List[Tuple[int, str]] = []
+        self._sequence = 0
+        self._generation = 0
+        self._cursors: Dict[str, Tuple[List[Dict], str]] = {}
+        self._lock = threading.Lock()
+        # (method, path, query) of every request, and the status of every reply. Batched
+        # requests are listed individually, after their batch request.
+        self.requests: List[Tuple[str, str, Dict[str, List[str]]]] = []
+        self.statuses: List[int] = []
+        # The number of requests carried by each batch request.
+        self.batch_sizes: List[int] = []
+        # Error statuses to answer the next API requests with, in order.
+        self._failures: List[int] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def endpoint(self) -> str:
+        """The value for GOOGLE_CALENDAR_API_ENDPOINT."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/calendar/v3/"
+
+    def start(self) -> None:
+        calendar = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                calendar._handle(self)
+
+            do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # --- Changes made "on Google" ---
+
+    def put_event(self, event_id: str, start: datetime, end: datetime, summary: str = "Meeting") -> Dict:
+        """Creates or moves an event (naive datetimes are UTC)."""
+        with self._lock:
+            event = {
+                "id": event_id,
+                "status": "confirmed",
+                "summary": summary,
+                "start": {"dateTime": start.isoformat() + ("Z" if start.tzinfo is None else "")},
+                "end": {"dateTime": end.isoformat() + ("Z" if end.tzinfo is None else "")},
+            }
+            self._record(event)
+            return event
+
+    def cancel_event(self, event_id: str) -> None:
+        """Deletes an event; incremental syncs report it as cancelled."""
+        with self._lock:
+            self._record({**self.events[event_id], "status": "cancelled"})
+
+    def forget_event(self, event_id: str) -> None:
+        """Drops an event without a trace in the change history, as if it was purged long ago."""
+        with self._lock:
+            del self.events[event_id]
+
+    def expire_sync_tokens(self) -> None:
+        """Makes every sync token issued so far answer 410 Gone."""
+        with self._lock:
+            self._generation += 1
+
+    def fail_next(self, *statuses: int) -> None:
+        """Answers the next API requests (batched ones individually) with these error statuses."""
+        with self._lock:
+            self._failures.extend(statuses)
+
+    def _record(self, event: Dict) -> None:
+        self._sequence += 1
+        updated = _UPDATED_EPOCH + timedelta(milliseconds=self._sequence)
+        event["updated"] = updated.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        self.events[event["id"]] = event
+        self._changes.append((self._sequence, event["id"]))
+
+    # --- HTTP ---
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        length = int(request.headers.get("Content-Length") or 0)
+        content = request.rfile.read(length) if length else b""
+        if urlparse(request.path).path == _BATCH_PATH:
+            self.requests.append((request.command, _BATCH_PATH, {}))
+            status = 200
+            content_type, payload = self._batch(request.headers["Content-Type"], content)
+        else:
+            status, body = self._dispatch(request.command, request.path, content)
+            content_type, payload = "application/json; charset=UTF-8", json.dumps(body).encode() if body else b""
+
+        self.statuses.append(status)
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(payload)))
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def _dispatch(self, method: str, target: str, content: bytes) -> Tuple[int, Optional[Dict]]:
+        """Serves one (possibly batched) API request."""
+        url = urlparse(target)
+        query = parse_qs(url.query)
+        self.requests.append((method, url.path, query))
+        match = _EVENTS_PATH.match(url.path)
+        if not match:
+            return 404, _error(404, "notFound", "Not Found")
+        body = json.loads(content) if content else {}
+        event_id = match.group("event_id")
+        with self._lock:
+            if self._failures:
+                status = self._failures.pop(0)
+                return status, _error(status, "backendError", _REASONS.get(status, "Error"))
+            if event_id is None:
+                if method == "GET":
+                    return self._list(query)
+                if method == "POST" and body.get("id") in self.events:
+                    return 409, _error(409, "duplicate", "The requested identifier already exists.")
+                if method == "POST":
+                    event = {**body, "id": body.get("id") or uuid.uuid4().hex, "status": "confirmed"}
+                    self._record(event)
+                    return 200, dict(event)
+            elif event_id not in self.events or self.events[event_id]["status"] == "cancelled":
+                return 404, _error(404, "notFound", "Not Found")
+            elif method == "GET":
+                return 200, dict(self.events[event_id])
+            elif method in ("PUT", "PATCH"):
+                base = self.events[event_id] if method == "PATCH" else {}
+                event = {**base, **body, "id": event_id, "status": "confirmed"}
+                self._record(event)
+                return 200, dict(event)
+            elif method == "DELETE":
+                self._record({**self.events[event_id], "status": "cancelled"})
+                return 204, None
+        return 400, _error(400, "badRequest", f"Unsupported request: {method} {url.path}")
+
+    def _batch(self, content_type: str, content: bytes) -> Tuple[str, bytes]:
+        """Serves a multipart/mixed batch request; returns the reply's content type and body."""
+        message = BytesParser().parsebytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + content)
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for part in message.get_payload():
+            # Each part is an HTTP request: the request line, then its headers and body as a MIME message.
+            request_line, _, request_message = part.get_payload(decode=True).partition(b"\n")
+            method, target = request_line.decode().split(" ")[:2]
+            request_body = BytesParser().parsebytes(request_message).get_payload(decode=True)
+            status, reply = self._dispatch(method, target, request_body)
+            reply_body = json.dumps(reply) if reply else ""
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(reply_body)}\r\n\r\n{reply_body}\r\n"
+            )
+        self.batch_sizes.append(len(parts))
+        return f"multipart/mixed; boundary={boundary}", ("".join(parts) + f"--{boundary}--\r\n").encode()
+
+    def _list(self, query: Dict[str, List[str]]) -> Tuple[int, Dict]:
+        page_size = int(query.get("maxResults", ["250"])[0])
+        page_token = query.get("pageToken", [None])[0]
+        if page_token is not None:
+            items, next_sync_token = self._cursors.pop(page_token)
+        else:
+            sync_token = query.get("syncToken", [None])[0]
+            if sync_token is None:
+                items = [event for event in self.events.values() if event["status"] != "cancelled"]
+            elif not sync_token.startswith(f"{self._generation}:"):
+                return 410, _error(410, "fullSyncRequired", "Sync token is no longer valid, a full sync is required.")
+            else:
+                covered = int(sync_token.split(":")[1])
+                changed = {event_id for sequence, event_id in self._changes if sequence > covered}
+                items = [self.events[event_id] for event_id in changed if event_id in self.events]
+            items = sorted(items, key=lambda event: event["updated"])
+            next_sync_token = f"{self._generation}:{self._sequence}"
+
+        page = {"kind": "calendar#events", "items": [dict(event) for event in items[:page_size]]}
+        if len(items) > page_size:
+            token = f"page-{len(self._cursors)}-{self._sequence}-{len(items)}"
+            self._cursors[token] = (items[page_size:], next_sync_token)
+            page["nextPageToken"] = token
+        else:
+            page["nextSyncToken"] = next_sync_token
+        return 200, page
+
+
+def _error(code: int, reason: str, message: str) -> Dict:
+    return {"error": {"code": code, "message": message, "errors": [{"domain": "global", "reason": reason, "message": message}]}}
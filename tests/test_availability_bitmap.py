@@ -0,0 +1,94 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.agent.utils.availability_bitmap import DayAvailability
+from app.agent.utils.conflict_detector import find_slot_starts, merge_busy_blocks
+
+# 10:00 to 18:00 in Kolkata.
+DAY_START = datetime(2030, 1, 7, 4, 30, tzinfo=timezone.utc)
+DAY_END = DAY_START + timedelta(hours=8)
+RESOLUTION = timedelta(minutes=5)
+STEP = timedelta(minutes=30)
+BUFFER = timedelta(minutes=15)
+
+
+def at(minutes: int) -> datetime:
+    """`minutes` after the start of working hours."""
+    return DAY_START + timedelta(minutes=minutes)
+
+
+def bitmap_and_sweep(blocks, duration, step=STEP):
+    """Slot starts from the bitmap and from the interval sweep, for the same busy blocks."""
+    merged = merge_busy_blocks(blocks)
+    bitmap = DayAvailability.from_busy_blocks(merged, DAY_START, DAY_END, RESOLUTION).slot_starts(duration, step)
+    return bitmap, find_slot_starts(merged, DAY_START, DAY_END, duration, step)
+
+
+def random_meetings(rng: random.Random, count: int, grid_minutes: int):
+    """Meetings on a `grid_minutes` grid around the working day, widened by the buffer."""
+    blocks = []
+    for _ in range(count):
+        start = at(-60 + grid_minutes * rng.randrange(600 // grid_minutes))
+        end = start + timedelta(minutes=grid_minutes * rng.randint(1, 12))
+        blocks.append((start - BUFFER, end + BUFFER))
+    return blocks
+
+
+@pytest.mark.parametrize("duration_minutes", [5, 15, 30, 60, 120])
+def test_aligned_durations_match_the_sweep(duration_minutes):
+    rng = random.Random(duration_minutes)
+    for _ in range(200):
+        blocks = random_meetings(rng, rng.randint(0, 8), grid_minutes=5)
+        bitmap, sweep = bitmap_and_sweep(blocks, timedelta(minutes=duration_minutes), step=timedelta(minutes=5))
+        assert bitmap == sweep
+
+
+@pytest.mark.parametrize("duration_minutes", [1, 7, 22, 47])
+def test_non_aligned_durations_match_the_sweep_for_aligned_meetings(duration_minutes):
+    rng = random.Random(duration_minutes)
+    for _ in range(200):
+        blocks = random_meetings(rng, rng.randint(0, 8), grid_minutes=5)
+        bitmap, sweep = bitmap_and_sweep(blocks, timedelta(minutes=duration_minutes))
+        assert bitmap == sweep
+
+
+def test_non_aligned_meetings_are_rounded_outwards():
+    # 11:07 to 11:38, busy from 10:52 with the buffer. A 22-minute slot at 10:30 ends at
+    # 10:52 and fits, but the bitmap rounds the busy time out to 10:50 and the slot up to 10:55.
+    blocks = [(at(67) - BUFFER, at(98) + BUFFER)]
+    bitmap, sweep = bitmap_and_sweep(blocks, timedelta(minutes=22), step=timedelta(minutes=5))
+    assert set(sweep) - set(bitmap) == {at(30)}
+    assert set(bitmap) < set(sweep)
+
+    rng = random.Random(3)
+    for _ in range(200):
+        blocks = random_meetings(rng, rng.randint(0, 8), grid_minutes=1)
+        bitmap, sweep = bitmap_and_sweep(blocks, timedelta(minutes=rng.choice([15, 30, 45])))
+        assert set(bitmap) <= set(sweep)
+
+
+def test_busy_blocks_crossing_the_working_hour_edges():
+    blocks = [(at(-90), at(40)), (at(450), at(600))]
+    bitmap, sweep = bitmap_and_sweep(blocks, timedelta(minutes=30), step=timedelta(minutes=5))
+    assert bitmap == sweep
+    assert bitmap[0] == at(40)
+    assert bitmap[-1] == at(420)
+
+
+def test_blocks_outside_the_working_day_are_ignored():
+    blocks = [(at(-600), at(-300)), (at(-30), at(0)), (at(480), at(540)), (at(900), at(960))]
+    bitmap, sweep = bitmap_and_sweep(blocks, timedelta(minutes=30))
+    assert bitmap == sweep == [at(minutes) for minutes in range(0, 451, 30)]
+
+
+def test_fully_busy_day_has_no_slots():
+    bitmap, sweep = bitmap_and_sweep([(at(-10), at(490))], timedelta(minutes=30))
+    assert bitmap == sweep == []
+
+
+def test_duration_longer_than_any_gap_has_no_slots():
+    blocks = [(at(minutes), at(minutes + 30)) for minutes in range(60, 480, 120)]
+    bitmap, sweep = bitmap_and_sweep(blocks, timedelta(minutes=120))
+    assert bitmap == sweep == []
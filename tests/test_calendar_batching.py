@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from googleapiclient.errors import HttpError
+
+from app.services.calendar_service import CalendarService
+
+START, END = datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10)
+BOUNDS = {"start": {"dateTime": "2030-01-07T09:00:00Z"}, "end": {"dateTime": "2030-01-07T10:00:00Z"}}
+
+
+@pytest.fixture
+def calendar_service(fake_calendar):
+    service = CalendarService(max_workers=2)
+    service.batcher.window_seconds = 0.05
+    yield service
+    service.shutdown()
+
+
+def test_concurrent_writes_share_one_batch_request(fake_calendar, calendar_service):
+    async def scenario():
+        bodies = [{"id": f"event{index}", "summary": f"Meeting {index}", **BOUNDS} for index in range(5)]
+        return await asyncio.gather(*(calendar_service.insert_event(body) for body in bodies))
+
+    results = asyncio.run(scenario())
+
+    assert fake_calendar.batch_sizes == [5]
+    assert [result["summary"] for result in results] == [f"Meeting {index}" for index in range(5)]
+    assert set(fake_calendar.events) == {f"event{index}" for index in range(5)}
+    assert calendar_service.metrics.snapshot()["batch"]["count"] == 1
+
+
+def test_batch_fans_out_each_callers_error(fake_calendar, calendar_service):
+    fake_calendar.put_event("existing", START, END)
+
+    async def scenario():
+        return await asyncio.gather(
+            calendar_service.patch_event("existing", {"summary": "Renamed"}),
+            calendar_service.delete_event("missing"),
+            calendar_service.delete_event("existing"),
+            return_exceptions=True,
+        )
+
+    patched, missing, deleted = asyncio.run(scenario())
+
+    assert fake_calendar.batch_sizes == [3]
+    assert patched["summary"] == "Renamed"
+    assert isinstance(missing, HttpError) and missing.resp.status == 404
+    assert deleted is None
+    assert fake_calendar.events["existing"]["status"] == "cancelled"
+
+
+def test_lone_write_is_sent_without_a_batch(fake_calendar, calendar_service):
+    result = asyncio.run(calendar_service.insert_event({"id": "alone", "summary": "Alone", **BOUNDS}))
+
+    assert result["id"] == "alone"
+    assert fake_calendar.batch_sizes == []
+    assert fake_calendar.requests[-1][0] == "POST"
@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services.calendar_mirror import CalendarMirror
+from app.services.calendar_service import CalendarService
+from app.services.slot_reservation_service import SlotReservationService
+
+# Whole hours, so that event times survive the round trip through MongoDB unchanged.
+TOMORROW = (datetime.utcnow() + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return TOMORROW.replace(hour=hour, minute=minute)
+
+
+@pytest.fixture
+def mirror(fake_calendar, monkeypatch):
+    # A small page size makes every sync span several pages.
+    monkeypatch.setattr(settings, "CALENDAR_MIRROR_PAGE_SIZE", 2)
+    calendar_service = CalendarService(max_workers=1)
+    yield CalendarMirror(calendar_service)
+    calendar_service.shutdown()
+
+
+async def mirrored(db):
+    """The mirrored events, as {google_event_id: (start, end)}."""
+    return {
+        doc["google_event_id"]: (doc["start_time_utc"], doc["end_time_utc"])
+        async for doc in db.get_collection("events").find({"google_event_id": {"$type": "string"}})
+    }
+
+
+async def insert_booking(db, google_event_id, start, end, **fields):
+    """Inserts an app-created event holding its slot locks, as confirm_and_book_event does."""
+    event_id = ObjectId()
+    assert await SlotReservationService(db).reserve(event_id, start, end)
+    await db.get_collection("events").insert_one({
+        "_id": event_id, "google_event_id": google_event_id, "owner_user_id": ObjectId(),
+        "title": "Booked", "start_time_utc": start, "end_time_utc": end,
+        "slot_locked": True, "sync_version": 0, **fields,
+    })
+    return event_id
+
+
+async def lock_granules(db, event_id):
+    return sorted([doc["_id"] async for doc in db.get_collection("slot_locks").find({"event_id": event_id})])
+
+
+def test_incremental_sync_and_full_resync_after_410(fake_calendar, mirror, scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            for index, hour in enumerate((9, 10, 11)):
+                fake_calendar.put_event(f"g{index}", at(hour), at(hour, 30))
+
+            assert await mirror.sync() == {"updated": 3, "deleted": 0, "unchanged": 0}
+            assert set(await mirrored(db)) == {"g0", "g1", "g2"}
+            assert (await db.get_collection("events").find_one({"google_event_id": "g0"}))["owner_user_id"] is None
+
+            # Only the changes since the stored sync token are pulled.
+            fake_calendar.put_event("g1", at(13), at(14))
+            fake_calendar.cancel_event("g2")
+            fake_calendar.put_event("g3", at(15), at(16))
+            requests_before = len(fake_calendar.requests)
+            assert await mirror.sync() == {"updated": 2, "deleted": 1, "unchanged": 0}
+            assert "syncToken" in fake_calendar.requests[requests_before][2]
+            events = await mirrored(db)
+            assert set(events) == {"g0", "g1", "g3"}
+            assert events["g1"] == (at(13), at(14))
+
+            # An expired token falls back to a full sync, which also removes the events
+            # that disappeared from Google without an incremental change.
+            fake_calendar.forget_event("g3")
+            fake_calendar.put_event("g4", at(17), at(18))
+            fake_calendar.expire_sync_tokens()
+            counts = await mirror.sync()
+            assert 410 in fake_calendar.statuses
+            assert counts["deleted"] == 1
+            assert set(await mirrored(db)) == {"g0", "g1", "g4"}
+            state = await db.get_collection("sync_state").find_one({})
+            assert state["full_sync"] is True
+
+            # The new token works again.
+            assert await mirror.sync() == {"updated": 0, "deleted": 0, "unchanged": 0}
+
+    asyncio.run(scenario())
+
+
+def test_full_sync_removes_only_unseen_synced_events(fake_calendar, mirror, scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            fake_calendar.put_event("kept", at(9), at(10))
+            gone_id = await insert_booking(db, "gone", at(11), at(12))
+            # A booking whose outbox job has not reached Google yet is newer than Google's state.
+            await insert_booking(db, "pending", at(13), at(14), sync={"op": "create"})
+            # Events older than the synced range are not part of the full listing.
+            old_start = TOMORROW - timedelta(days=settings.CALENDAR_MIRROR_LOOKBACK_DAYS + 5)
+            await insert_booking(db, "old", old_start, old_start + timedelta(hours=1))
+
+            counts = await mirror.sync()
+
+            assert counts["deleted"] == 1
+            assert set(await mirrored(db)) == {"kept", "pending", "old"}
+            assert await lock_granules(db, gone_id) == []
+
+    asyncio.run(scenario())
+
+
+def test_moved_event_moves_its_slot_locks(fake_calendar, mirror, scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            reservations = SlotReservationService(db)
+            moved_id = await insert_booking(db, "moved", at(9), at(10), google_updated="2000-01-01T00:00:00.000Z")
+            blocked_id = await insert_booking(db, "blocked", at(11), at(12), google_updated="2000-01-01T00:00:00.000Z")
+            await insert_booking(db, "holder", at(15), at(16), google_updated="2000-01-01T00:00:00.000Z")
+
+            # "moved" goes to a free slot; "blocked" onto the time held by "holder".
+            fake_calendar.put_event("moved", at(13), at(14))
+            fake_calendar.put_event("blocked", at(15), at(16))
+            fake_calendar.put_event("holder", at(15), at(16))
+
+            await mirror.sync()
+
+            moved = await db.get_collection("events").find_one({"_id": moved_id})
+            assert (moved["start_time_utc"], moved["end_time_utc"]) == (at(13), at(14))
+            assert moved["slot_locked"] is True
+            expected = [granule.replace(tzinfo=None) for granule in reservations.granules_for(at(13), at(14))]
+            assert await lock_granules(db, moved_id) == expected
+
+            blocked = await db.get_collection("events").find_one({"_id": blocked_id})
+            assert blocked["start_time_utc"] == at(15)
+            assert blocked["slot_locked"] is False
+            assert await lock_granules(db, blocked_id) == []
+
+    asyncio.run(scenario())
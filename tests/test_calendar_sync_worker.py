@@ -0,0 +1,268 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.agent.tools.calendar_tools import delete_event, list_events
+from app.core.config import settings
+from app.services.calendar_service import CalendarService
+from app.services.calendar_sync_worker import CalendarSyncWorker, new_sync_job
+from app.services.slot_reservation_service import SlotReservationService
+
+START, END = datetime(2030, 1, 7, 9), datetime(2030, 1, 7, 10)
+OWNER = ObjectId()
+CURRENT_USER = {"id": str(OWNER), "email": "owner@example.com", "timezone": "UTC"}
+
+
+@pytest.fixture
+def calendar_service(fake_calendar):
+    service = CalendarService(max_workers=2)
+    # Every push is sent on its own, so the fake sees one request per call.
+    service.batcher.window_seconds = 0
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def worker(calendar_service):
+    return CalendarSyncWorker(calendar_service)
+
+
+async def insert_booking(db, op="create", start=START, end=END, **fields):
+    """Inserts a booking with a due outbox job, as the booking tools do. Returns its Google event id."""
+    event_id = ObjectId()
+    assert await SlotReservationService(db).reserve(event_id, start, end)
+    await db.get_collection("events").insert_one({
+        "_id": event_id, "google_event_id": str(event_id), "owner_user_id": OWNER,
+        "title": "Sync", "description": "Call booked by owner@example.com",
+        "start_time_utc": start, "end_time_utc": end, "original_timezone": "UTC",
+        "status": "pending", "slot_locked": True, "sync": new_sync_job(op), "sync_version": 0, **fields,
+    })
+    return str(event_id)
+
+
+async def booking(db, google_event_id):
+    return await db.get_collection("events").find_one({"google_event_id": google_event_id})
+
+
+def api_calls(fake_calendar, google_event_id):
+    """The methods of the requests made for one event, in order (every insert counts, as its id is in the body)."""
+    return [method for method, path, _ in fake_calendar.requests if path.endswith(f"/events/{google_event_id}")
+            or (method == "POST" and path.endswith("/events"))]
+
+
+def test_create_job_is_pushed_and_cleared(fake_calendar, worker, scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            google_event_id = await insert_booking(db)
+
+            assert await worker.drain_once() == 1
+
+            assert fake_calendar.events[google_event_id]["summary"] == "Sync"
+            assert fake_calendar.events[google_event_id]["start"]["dateTime"] == "2030-01-07T09:00:00+00:00"
+            doc = await booking(db, google_event_id)
+            assert doc["status"] == "confirmed"
+            assert "sync" not in doc
+            assert await worker.drain_once() == 0
+
+    asyncio.run(scenario())
+
+
+def test_insert_that_already_landed_becomes_a_patch(fake_calendar, worker, scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            google_event_id = await insert_booking(db, title="Renamed")
+            # An earlier attempt created the event, but its acknowledgement was lost.
+            fake_calendar.put_event(google_event_id, START, END, summary="Sync")
+
+            assert await worker.drain_once() == 1
+
+            assert 409 in fake_calendar.statuses
+            assert api_calls(fake_calendar, google_event_id) == ["POST", "PATCH"]
+            assert fake_calendar.events[google_event_id]["summary"] == "Renamed"
+            assert (await booking(db, google_event_id))["status"] == "confirmed"
+
+    asyncio.run(scenario())
+
+
+def test_a_job_is_leased_to_one_worker(fake_calendar, calendar_service, worker, scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            events = db.get_collection("events")
+            google_event_id = await insert_booking(db)
+
+            other = CalendarSyncWorker(calendar_service)
+            assert sorted(await asyncio.gather(worker.drain_once(), other.drain_once())) == [0, 1]
+            assert api_calls(fake_calendar, google_event_id) == ["POST"]
+
+            # A job leased by a worker that died is claimed again once the lease expires.
+            later = timedelta(hours=3)
+            leased_id = await insert_booking(db, op="update", start=START + later, end=END + later)
+            await events.update_one(
+                {"google_event_id": leased_id}, {"$set": {"sync.locked_until": datetime.utcnow() + timedelta(minutes=1)}}
+            )
+            assert await worker.drain_once() == 0
+            await events.update_one(
+                {"google_event_id": leased_id}, {"$set": {"sync.locked_until": datetime.utcnow() - timedelta(seconds=1)}}
+            )
+            fake_calendar.put_event(leased_id, START + later, END + later)
+            assert await worker.drain_once() == 1
+            assert (await booking(db, leased_id))["status"] == "confirmed"
+
+    asyncio.run(scenario())
+
+
+def test_event_changed_during_its_push_is_pushed_again(fake_calendar, calendar_service, worker, scratch_db, monkeypatch):
+    async def scenario():
+        async with scratch_db() as db:
+            events = db.get_collection("events")
+            google_event_id = await insert_booking(db)
+            insert_event = calendar_service.insert_event
+
+            async def insert_then_rename(body):
+                result = await insert_event(body)
+                # update_event runs while the insert is in flight.
+                await events.update_one(
+                    {"google_event_id": google_event_id},
+                    {"$set": {"title": "Renamed", "sync": new_sync_job("create")}, "$inc": {"sync_version": 1}},
+                )
+                return result
+
+            monkeypatch.setattr(calendar_service, "insert_event", insert_then_rename)
+            assert await worker.drain_once() == 1
+
+            doc = await booking(db, google_event_id)
+            assert doc["sync"]["op"] == "update"
+            assert doc["sync"]["locked_until"] is None
+            assert fake_calendar.events[google_event_id]["summary"] == "Sync"
+
+            assert await worker.drain_once() == 1
+            assert api_calls(fake_calendar, google_event_id) == ["POST", "PATCH"]
+            assert fake_calendar.events[google_event_id]["summary"] == "Renamed"
+            assert "sync" not in await booking(db, google_event_id)
+
+    asyncio.run(scenario())
+
+
+def test_retryable_failures_back_off(fake_calendar, worker, scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            events = db.get_collection("events")
+            google_event_id = await insert_booking(db)
+            fake_calendar.fail_next(503)
+
+            before = datetime.utcnow()
+            assert await worker.drain_once() == 1
+
+            job = (await booking(db, google_event_id))["sync"]
+            assert job["attempts"] == 1
+            assert "503" in job["last_error"]
+            assert job["locked_until"] is None
+            backoff = (job["next_attempt_at"] - before).total_seconds()
+            base = settings.CALENDAR_SYNC_BACKOFF_BASE_SECONDS
+            assert 0.5 * base - 0.01 <= backoff <= base + 1
+            # Not due yet.
+            assert await worker.drain_once() == 0
+
+            await events.update_one({"google_event_id": google_event_id}, {"$set": {"sync.next_attempt_at": before}})
+            assert await worker.drain_once() == 1
+            assert (await booking(db, google_event_id))["status"] == "confirmed"
+
+    asyncio.run(scenario())
+
+
+def test_failed_jobs_are_given_up(fake_calendar, worker, scratch_db, monkeypatch):
+    monkeypatch.setattr(settings, "CALENDAR_SYNC_MAX_ATTEMPTS", 2)
+
+    async def scenario():
+        async with scratch_db() as db:
+            events = db.get_collection("events")
+
+            # A request Google rejects is not retried.
+            rejected_id = await insert_booking(db)
+            fake_calendar.fail_next(400)
+            assert await worker.drain_once() == 1
+            doc = await booking(db, rejected_id)
+            assert doc["status"] == "sync_failed"
+            assert doc["sync"]["attempts"] == 1
+            assert await worker.drain_once() == 0
+
+            # Retryable errors are given up after CALENDAR_SYNC_MAX_ATTEMPTS.
+            later = timedelta(hours=3)
+            flaky_id = await insert_booking(db, start=START + later, end=END + later)
+            fake_calendar.fail_next(503, 503)
+            assert await worker.drain_once() == 1
+            await events.update_one({"google_event_id": flaky_id}, {"$set": {"sync.next_attempt_at": datetime.utcnow()}})
+            assert await worker.drain_once() == 1
+            doc = await booking(db, flaky_id)
+            assert doc["status"] == "sync_failed"
+            assert doc["sync"]["attempts"] == 2
+            assert flaky_id not in fake_calendar.events
+
+    asyncio.run(scenario())
+
+
+def test_delete_is_queued_and_pushed(fake_calendar, worker, scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            google_event_id = await insert_booking(db)
+            assert await worker.drain_once() == 1
+            requests_before = len(fake_calendar.requests)
+
+            result = await delete_event.ainvoke({"event_id": google_event_id, "current_user": CURRENT_USER})
+
+            # The turn does not wait for Google, and the slot is free right away.
+            assert "deleted successfully" in result
+            assert len(fake_calendar.requests) == requests_before
+            assert await list_events.ainvoke({"current_user": CURRENT_USER}) == []
+            assert await db.get_collection("slot_locks").count_documents({}) == 0
+            assert await SlotReservationService(db).reserve(ObjectId(), START, END)
+            again = await delete_event.ainvoke({"event_id": google_event_id, "current_user": CURRENT_USER})
+            assert again.startswith("Error")
+
+            assert await worker.drain_once() == 1
+            assert api_calls(fake_calendar, google_event_id)[-1] == "DELETE"
+            assert fake_calendar.events[google_event_id]["status"] == "cancelled"
+            assert await booking(db, google_event_id) is None
+
+    asyncio.run(scenario())
+
+
+def test_delete_of_an_event_that_never_reached_google(fake_calendar, worker, scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            google_event_id = await insert_booking(db)
+            await delete_event.ainvoke({"event_id": google_event_id, "current_user": CURRENT_USER})
+
+            assert await worker.drain_once() == 1
+
+            assert 404 in fake_calendar.statuses
+            assert await booking(db, google_event_id) is None
+
+    asyncio.run(scenario())
+
+
+def test_delete_during_a_create_push_is_not_lost(fake_calendar, calendar_service, worker, scratch_db, monkeypatch):
+    async def scenario():
+        async with scratch_db() as db:
+            google_event_id = await insert_booking(db)
+            insert_event = calendar_service.insert_event
+
+            async def insert_then_delete(body):
+                result = await insert_event(body)
+                await delete_event.ainvoke({"event_id": google_event_id, "current_user": CURRENT_USER})
+                return result
+
+            monkeypatch.setattr(calendar_service, "insert_event", insert_then_delete)
+            assert await worker.drain_once() == 1
+
+            doc = await booking(db, google_event_id)
+            assert doc["deleted"] is True
+            assert doc["sync"]["op"] == "delete"
+
+            assert await worker.drain_once() == 1
+            assert fake_calendar.events[google_event_id]["status"] == "cancelled"
+            assert await booking(db, google_event_id) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,94 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from app.api.calendar_webhook import router
+from app.core.config import settings
+from app.core.error_handler import custom_exception_handler
+from app.core.exceptions import BaseAPIException
+from app.database.mongodb import db_manager
+from app.services.calendar_watch_service import calendar_watch_service
+
+TOKEN = "webhook-token"
+CHANNEL_ID, PREVIOUS_CHANNEL_ID = "channel-2", "channel-1"
+
+
+@pytest.fixture
+def notifications(mongo_uri, monkeypatch):
+    """
+    Yields (client, notify_calls): a TestClient for the webhook, mounted as in app.main, with a
+    scratch database whose stored watch channel is CHANNEL_ID (renewed from PREVIOUS_CHANNEL_ID),
+    and the list that records every wake-up of the mirror.
+    """
+    monkeypatch.setattr(settings, "CALENDAR_WEBHOOK_TOKEN", TOKEN)
+    notify_calls = []
+    monkeypatch.setattr(calendar_watch_service.mirror, "notify", lambda: notify_calls.append(True))
+
+    database_name = f"{settings.DATABASE_NAME}_test_{uuid4().hex[:8]}"
+    seed_client = MongoClient(mongo_uri)
+    seed_client[database_name]["sync_state"].insert_one({
+        "_id": calendar_watch_service._state_id(),
+        "channel_id": CHANNEL_ID,
+        "previous_channel_id": PREVIOUS_CHANNEL_ID,
+    })
+    # Created here but first used on the TestClient's event loop.
+    app_client = AsyncIOMotorClient(mongo_uri)
+    monkeypatch.setattr(db_manager, "database", app_client.get_database(database_name))
+
+    app = FastAPI()
+    app.add_exception_handler(BaseAPIException, custom_exception_handler)
+    app.include_router(router, prefix="/api")
+    try:
+        with TestClient(app) as client:
+            yield client, notify_calls
+    finally:
+        app_client.close()
+        seed_client.drop_database(database_name)
+        seed_client.close()
+
+
+def notify(client, resource_state="exists", channel_id=CHANNEL_ID, token=TOKEN):
+    """Posts a synthetic push notification, the way Google sends them: headers only, no body."""
+    headers = {"X-Goog-Channel-ID": channel_id, "X-Goog-Resource-State": resource_state}
+    if token is not None:
+        headers["X-Goog-Channel-Token"] = token
+    return client.post("/api/calendar/notifications", headers=headers)
+
+
+@pytest.mark.parametrize("token", [None, "", "wrong-token"])
+def test_wrong_or_missing_token_is_forbidden(notifications, token):
+    client, notify_calls = notifications
+    assert notify(client, token=token).status_code == 403
+    assert notify_calls == []
+
+
+def test_unknown_channel_is_ignored(notifications):
+    client, notify_calls = notifications
+    response = notify(client, channel_id="someone-elses-channel")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ignored"}
+    assert notify_calls == []
+
+
+def test_sync_handshake_does_not_wake_the_mirror(notifications):
+    client, notify_calls = notifications
+    response = notify(client, resource_state="sync")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ignored"}
+    assert notify_calls == []
+
+
+def test_change_wakes_the_mirror(notifications):
+    client, notify_calls = notifications
+    response = notify(client, resource_state="exists")
+    assert response.status_code == 200
+    assert response.json() == {"status": "accepted"}
+    assert notify_calls == [True]
+
+    # The channel being replaced keeps delivering until it is closed.
+    assert notify(client, channel_id=PREVIOUS_CHANNEL_ID).json() == {"status": "accepted"}
+    assert len(notify_calls) == 2
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+import pytz
+
+from app.agent.utils.intent_router import classify_intent
+
+# A Wednesday, 17:30 in Kolkata.
+NOW = pytz.UTC.localize(datetime(2026, 10, 21, 12, 0))
+TIMEZONE = "Asia/Kolkata"
+
+
+def classify(text, pending_action=None):
+    return classify_intent(text, TIMEZONE, pending_action, now=NOW)
+
+
+def test_list_events_for_a_day():
+    intent = classify("show my meetings tomorrow please")
+    assert intent.name == "list_events"
+    assert intent.args == {"start_time": "2026-10-22T00:00:00", "end_time": "2026-10-23T00:00:00"}
+
+
+def test_list_upcoming_events():
+    intent = classify("list my events")
+    assert intent.name == "list_events"
+    assert intent.args == {}
+
+
+def test_find_available_slots():
+    intent = classify("am I free on friday for 45 minutes?")
+    assert intent.name == "find_available_slots"
+    assert intent.args == {"date": "2026-10-23", "user_timezone": TIMEZONE, "duration_minutes": 45}
+
+
+def test_is_there_an_opening_with_filler():
+    intent = classify("is there any free slot tomorrow for half an hour")
+    assert intent.name == "find_available_slots"
+    assert intent.args["duration_minutes"] == 30
+
+
+@pytest.mark.parametrize("text", [
+    # A week is not a single day.
+    "list my events next week",
+    "what's on my calendar this week",
+    "any openings next week for 30 minutes",
+    # Someone else's calendar, or words the router does not understand.
+    "is John free tomorrow for 1 hour",
+    "is the boardroom available on friday for 30 minutes",
+    "show my events tomorrow with the sales team",
+    # More than one duration or date.
+    "am I free tomorrow for 30 minutes or 45 minutes",
+    "am I free tomorrow or friday for 30 minutes",
+    # Anything that changes the calendar.
+    "book 30 minutes tomorrow if I'm free",
+])
+def test_falls_back_to_the_agent(text):
+    assert classify(text) is None
+
+
+def test_delete_request_needs_an_event_id():
+    assert classify("delete event abc123xyz9").args == {"event_id": "abc123xyz9"}
+    assert classify("cancel my meeting tomorrow") is None
+
+
+def test_pending_action_only_accepts_a_confirmation_or_a_decline():
+    pending_action = {"tool": "delete_event", "args": {"event_id": "abc123xyz9"}, "title": "Sync"}
+    assert classify("yes, go ahead", pending_action).name == "confirm"
+    assert classify("no thanks", pending_action).name == "decline"
+    assert classify("list my events", pending_action) is None
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services.slot_reservation_service import SlotReservationService
+
+DAY = datetime(2030, 1, 7, tzinfo=timezone.utc)
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return DAY.replace(hour=hour, minute=minute)
+
+
+async def book(db, start, end):
+    """Reserves the slot and writes the event, as confirm_and_book_event does. Returns the event id or None."""
+    event_id = ObjectId()
+    if not await SlotReservationService(db).reserve(event_id, start, end):
+        return None
+    await db.get_collection("events").insert_one({
+        "_id": event_id, "google_event_id": str(event_id),
+        "start_time_utc": start, "end_time_utc": end, "slot_locked": True,
+    })
+    return event_id
+
+
+async def locks_of(db, event_id):
+    return await db.get_collection("slot_locks").count_documents({"event_id": event_id})
+
+
+def test_only_one_of_overlapping_bookings_succeeds(scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            # Different starts and lengths, all overlapping 10:20 to 10:30.
+            slots = [(at(10, minute), at(10, minute) + timedelta(minutes=length))
+                     for minute in (0, 5, 10, 15, 20) for length in (15, 30, 45)
+                     if minute + length > 20]
+            booked = await asyncio.gather(*(book(db, start, end) for start, end in slots))
+
+            winners = [event_id for event_id in booked if event_id]
+            assert len(winners) == 1
+            assert await db.get_collection("slot_locks").count_documents({}) == await locks_of(db, winners[0])
+
+    asyncio.run(scenario())
+
+
+def test_bookings_inside_the_buffer_are_rejected(scratch_db, monkeypatch):
+    monkeypatch.setattr(settings, "MEETING_BUFFER_MINUTES", 15)
+
+    async def scenario():
+        async with scratch_db() as db:
+            assert await book(db, at(10), at(10, 30))
+
+            assert await book(db, at(10, 40), at(11)) is None
+            assert await book(db, at(9, 20), at(9, 50)) is None
+            # Exactly one buffer away on either side.
+            assert await book(db, at(10, 45), at(11, 15))
+            assert await book(db, at(9, 15), at(9, 45))
+
+    asyncio.run(scenario())
+
+
+def test_stale_orphan_locks_are_reaped(scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            reservations = SlotReservationService(db)
+            locks = db.get_collection("slot_locks")
+            # Locks of bookings whose event was never written, e.g. after a crash.
+            stale, fresh = ObjectId(), ObjectId()
+            stale_at = datetime.utcnow() - timedelta(seconds=settings.SLOT_LOCK_ORPHAN_GRACE_SECONDS + 60)
+            await locks.insert_many([
+                {"_id": granule, "event_id": stale, "created_at": stale_at}
+                for granule in reservations.granules_for(at(10), at(10, 30))
+            ])
+            await locks.insert_many([
+                {"_id": granule, "event_id": fresh, "created_at": datetime.utcnow()}
+                for granule in reservations.granules_for(at(14), at(14, 30))
+            ])
+
+            assert await book(db, at(10), at(10, 30))
+            assert await locks_of(db, stale) == 0
+
+            # A young orphan may still be a booking in flight.
+            assert await book(db, at(14), at(14, 30)) is None
+            assert await locks_of(db, fresh) > 0
+
+    asyncio.run(scenario())
+
+
+def test_a_failed_reservation_rolls_back_its_inserted_granules(scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            reservations = SlotReservationService(db)
+            holder = await book(db, at(11), at(11, 30))
+            holder_locks = await locks_of(db, holder)
+
+            # The ordered insert gets through 10:00 to 10:55 before hitting the holder's first granule.
+            event_id = ObjectId()
+            assert not await reservations.reserve(event_id, at(10), at(12))
+            assert await locks_of(db, event_id) == 0
+            assert await locks_of(db, holder) == holder_locks
+
+            # The freed granules can be booked again.
+            assert await book(db, at(10), at(10, 30))
+
+    asyncio.run(scenario())
+
+
+def test_a_rescheduled_event_keeps_its_own_granules(scratch_db):
+    async def scenario():
+        async with scratch_db() as db:
+            reservations = SlotReservationService(db)
+            event_id = await book(db, at(10), at(10, 30))
+
+            # Moving 15 minutes later overlaps the event's own locks only.
+            assert await reservations.reserve(event_id, at(10, 15), at(10, 45))
+            await reservations.release(event_id, at(10, 15), at(10, 45))
+            expected = [granule.replace(tzinfo=None) for granule in reservations.granules_for(at(10, 15), at(10, 45))]
+            held = [doc["_id"] async for doc in db.get_collection("slot_locks").find({"event_id": event_id}).sort("_id", 1)]
+            assert held == expected
+
+    asyncio.run(scenario())
@@ -0,0 +1,115 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytz
+
+from app.agent.utils.time_parser import find_time_references, resolve_time_phrase
+
+# A Wednesday.
+NOW = pytz.UTC.localize(datetime(2026, 10, 21, 12, 0))
+
+
+def resolve(phrase, timezone="UTC", now=NOW):
+    reference = resolve_time_phrase(phrase, timezone, now)
+    return reference.date if reference else None
+
+
+@pytest.mark.parametrize("phrase, expected", [
+    ("friday", date(2026, 10, 23)),
+    ("this friday", date(2026, 10, 23)),
+    ("coming friday", date(2026, 10, 23)),
+    ("next friday", date(2026, 10, 30)),
+    ("next monday", date(2026, 10, 26)),
+    ("wednesday", date(2026, 10, 28)),
+    ("this wednesday", date(2026, 10, 21)),
+    ("next wednesday", date(2026, 10, 28)),
+    ("next week", date(2026, 10, 26)),
+])
+def test_weekdays(phrase, expected):
+    assert resolve(phrase) == expected
+
+
+def test_next_weekday_on_a_sunday_is_in_the_following_week():
+    sunday = pytz.UTC.localize(datetime(2026, 10, 25, 12, 0))
+    assert resolve("next monday", now=sunday) == date(2026, 10, 26)
+    assert resolve("next sunday", now=sunday) == date(2026, 11, 1)
+
+
+@pytest.mark.parametrize("text", [
+    "I may need 2 weeks",
+    "I may 2 weeks",
+    "those 2 may work for me",
+    "I may be 15 minutes late",
+    "I may 15 minutes late",
+])
+def test_may_as_a_verb_is_not_a_date(text):
+    assert find_time_references(text, "UTC", NOW) == []
+
+
+@pytest.mark.parametrize("phrase", ["may 2", "May 2nd", "2nd May", "2 of may"])
+def test_may_with_a_day_number_is_a_date(phrase):
+    assert resolve(phrase) == date(2027, 5, 2)
+
+
+def test_today_is_the_date_in_the_users_timezone():
+    # 02:00 UTC on Wednesday is still Tuesday evening in New York, and already Wednesday morning in Kolkata.
+    early_utc = pytz.UTC.localize(datetime(2026, 10, 21, 2, 0))
+    assert resolve("today", "America/New_York", early_utc) == date(2026, 10, 20)
+    assert resolve("tomorrow", "America/New_York", early_utc) == date(2026, 10, 21)
+    assert resolve("today", "Asia/Kolkata", early_utc) == date(2026, 10, 21)
+
+    # 20:00 UTC is already the next day in Kolkata.
+    late_utc = pytz.UTC.localize(datetime(2026, 10, 21, 20, 0))
+    assert resolve("today", "Asia/Kolkata", late_utc) == date(2026, 10, 22)
+    assert resolve("friday", "Asia/Kolkata", late_utc) == date(2026, 10, 23)
+
+
+def test_day_window_is_bounded_by_local_midnights():
+    reference = resolve_time_phrase("tomorrow", "Asia/Kolkata", NOW)
+    assert reference.window_start.isoformat() == "2026-10-22T00:00:00+05:30"
+    assert reference.window_end.isoformat() == "2026-10-23T00:00:00+05:30"
+    assert reference.window_start.astimezone(pytz.UTC) == pytz.UTC.localize(datetime(2026, 10, 21, 18, 30))
+
+
+def test_spring_forward_day_is_23_hours_long():
+    # Clocks in New York go from 02:00 to 03:00 on Sunday, March 8 2026.
+    saturday = pytz.UTC.localize(datetime(2026, 3, 7, 15, 0))
+    reference = resolve_time_phrase("tomorrow", "America/New_York", saturday)
+    assert reference.date == date(2026, 3, 8)
+    assert reference.window_start.isoformat() == "2026-03-08T00:00:00-05:00"
+    assert reference.window_end.isoformat() == "2026-03-09T00:00:00-04:00"
+    assert reference.window_end - reference.window_start == timedelta(hours=23)
+
+    morning = resolve_time_phrase("tomorrow morning", "America/New_York", saturday)
+    assert morning.window_start.isoformat() == "2026-03-08T09:00:00-04:00"
+    assert morning.window_end - morning.window_start == timedelta(hours=3)
+
+
+def test_fall_back_day_is_25_hours_long():
+    # Clocks in New York go from 02:00 back to 01:00 on Sunday, November 1 2026.
+    saturday = pytz.UTC.localize(datetime(2026, 10, 31, 15, 0))
+    reference = resolve_time_phrase("sunday", "America/New_York", saturday)
+    assert reference.date == date(2026, 11, 1)
+    assert reference.window_start.isoformat() == "2026-11-01T00:00:00-04:00"
+    assert reference.window_end.isoformat() == "2026-11-02T00:00:00-05:00"
+    assert reference.window_end - reference.window_start == timedelta(hours=25)
+
+    afternoon = resolve_time_phrase("sunday afternoon", "America/New_York", saturday)
+    assert afternoon.window_start.isoformat() == "2026-11-01T12:00:00-05:00"
+
+
+def test_now_is_converted_to_the_users_timezone_across_a_dst_change():
+    # 03:30 UTC on November 1 is 23:30 EDT on October 31: still Saturday in New York.
+    now = pytz.UTC.localize(datetime(2026, 11, 1, 3, 30))
+    assert resolve("today", "America/New_York", now) == date(2026, 10, 31)
+    # 06:30 UTC is 01:30 EST, after the clocks went back.
+    now = pytz.UTC.localize(datetime(2026, 11, 1, 6, 30))
+    assert resolve("today", "America/New_York", now) == date(2026, 11, 1)
+
+
+def test_parts_of_the_day_narrow_the_window():
+    references = find_time_references("Can we do friday afternoon or the morning of May 3?", "UTC", NOW)
+    assert [(r.text, r.date, r.part_of_day) for r in references] == [
+        ("friday afternoon", date(2026, 10, 23), "afternoon"),
+        ("morning of May 3", date(2027, 5, 3), "morning"),
+    ]
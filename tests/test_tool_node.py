@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+# The graph module opens the conversation checkpointer's backend on import.
+pytest.importorskip("langgraph.checkpoint.mongodb.aio")
+
+from app.agent import graph
+from app.agent.tools.registry import SideEffect, ToolSpec
+
+CURRENT_USER = {"id": "user-1", "email": "owner@example.com", "timezone": "UTC"}
+
+
+def tool_state(*names):
+    """An agent state whose last message calls the named tools, without arguments."""
+    tool_calls = [{"name": name, "args": {}, "id": f"call-{index}"} for index, name in enumerate(names)]
+    return {"messages": [AIMessage(content="", tool_calls=tool_calls)], "current_user": CURRENT_USER}
+
+
+def error_of(message):
+    return json.loads(message.content)["error"]
+
+
+@pytest.fixture
+def slow_tools(monkeypatch):
+    """Registers a slow write, a slow read and a quick read tool; yields the names of the calls that finished."""
+    finished = []
+
+    @tool
+    async def slow_write() -> str:
+        """Writes slowly."""
+        await asyncio.sleep(0.2)
+        finished.append("slow_write")
+        return "written"
+
+    @tool
+    async def slow_read() -> str:
+        """Reads slowly."""
+        await asyncio.sleep(0.2)
+        finished.append("slow_read")
+        return "read"
+
+    @tool
+    async def quick_read() -> str:
+        """Reads quickly."""
+        finished.append("quick_read")
+        return "read"
+
+    for spec in (
+        ToolSpec(slow_write, SideEffect.WRITE, timeout_seconds=0.05, needs_user=False),
+        ToolSpec(slow_read, SideEffect.READ, timeout_seconds=0.05, needs_user=False),
+        ToolSpec(quick_read, SideEffect.READ, timeout_seconds=1, needs_user=False),
+    ):
+        monkeypatch.setitem(graph.TOOL_REGISTRY, spec.name, spec)
+    yield finished
+
+
+def test_unknown_tool_is_reported_to_the_model():
+    async def scenario():
+        return await graph.custom_tool_node(tool_state("no_such_tool"), {})
+
+    [message] = asyncio.run(scenario())["messages"]
+
+    assert message.status == "error"
+    assert message.tool_call_id == "call-0"
+    assert error_of(message) == "unknown_tool"
+    assert "list_events" in json.loads(message.content)["message"]
+
+
+def test_slow_write_is_detached_and_finishes(slow_tools):
+    async def scenario():
+        result = await graph.custom_tool_node(tool_state("slow_write", "quick_read"), {})
+        # The write outlived its timeout but was not cancelled.
+        assert slow_tools == ["quick_read"]
+        [call] = graph._detached_tool_calls
+        assert await call == "written"
+        return result
+
+    write_message, read_message = asyncio.run(scenario())["messages"]
+
+    assert error_of(write_message) == "tool_outcome_unknown"
+    assert read_message.content == "read"
+    assert slow_tools == ["quick_read", "slow_write"]
+    assert not graph._detached_tool_calls
+
+
+def test_slow_read_is_cancelled(slow_tools):
+    async def scenario():
+        result = await graph.custom_tool_node(tool_state("slow_read"), {})
+        await asyncio.sleep(0.3)
+        return result
+
+    [message] = asyncio.run(scenario())["messages"]
+
+    assert error_of(message) == "tool_timeout"
+    assert slow_tools == []
+    assert not graph._detached_tool_calls